@@ -9,10 +9,50 @@ Created on Sat Dec 13 11:30:02 2025
 # P08_QUANTUM_RESISTANT_CBDC/src_pqc/lattice_crypto.py
 
 import numpy as np
+import hashlib
 import json
 import os # ファイルシステムの操作のために追加
+import struct
 
-def generate_lwe_parameters(n_dim=256, m_dim=512, q_mod=3329, sigma_noise=1.5):
+# 公開行列 A は 32 バイトのシードから SHAKE-128 で必要な行だけ展開する（A そのものは保存しない）
+SEED_BYTES = 32
+PK_MAGIC = b'LWEPK1'
+PK_HEADER = struct.Struct('<6sIII')  # マジック, n, m, q
+
+def sample_uniform(seed, nonce, count, q_mod):
+    """
+    SHAKE-128(seed || nonce) の出力から、Z_q 上の一様な整数を count 個取り出す（棄却サンプリング）。
+    2 バイトずつ読み、q のビット数で切った値のうち q 未満のものだけを使う。
+
+    Args:
+        seed (bytes): 32 バイトのシード。
+        nonce (bytes): 行などを区別する追加のバイト列。
+        count (int): 必要な個数。
+        q_mod (int): モジュラス（2^16 未満）。
+
+    Returns:
+        np.ndarray: 形状 (count,) の int64。
+    """
+    mask = (1 << q_mod.bit_length()) - 1
+    xof = hashlib.shake_128(seed + nonce)
+    n_bytes = 2 * (count * (mask + 1) // q_mod + 32)  # 期待される必要量より少し多め（偶数バイト）
+    while True:
+        cand = np.frombuffer(xof.digest(n_bytes), dtype='<u2') & mask
+        cand = cand[cand < q_mod]
+        if len(cand) >= count:
+            return cand[:count].astype(np.int64)
+        n_bytes *= 2  # 足りなければ、同じ出力列をより長く読み直す
+
+def iter_rows(seed, n_dim, m_dim, q_mod):
+    """公開行列 A の行を1行ずつ展開して返す（A 全体はメモリに置かない）"""
+    for i in range(n_dim):
+        yield sample_uniform(seed, struct.pack('<I', i), m_dim, q_mod)
+
+def expand_matrix(seed, n_dim, m_dim, q_mod):
+    """シードから公開行列 A（n x m）全体を展開する"""
+    return np.stack(list(iter_rows(seed, n_dim, m_dim, q_mod)))
+
+def generate_lwe_parameters(n_dim=256, m_dim=512, q_mod=3329, sigma_noise=1.5, seed=None):
     """
     LWE (Learning With Errors) 問題に基づいた格子暗号のパラメータを定義する。
     
@@ -21,9 +61,10 @@ def generate_lwe_parameters(n_dim=256, m_dim=512, q_mod=3329, sigma_noise=1.5):
         m_dim (int): サンプル数 (m)。
         q_mod (int): モジュラス q (通常は小さな素数)。
         sigma_noise (float): ノイズ e の標準偏差。
+        seed (bytes): 公開行列 A のシード（省略すると os.urandom で選ぶ）。
         
     Returns:
-        dict: LWE問題の定義に必要なパラメータ。
+        dict: LWE問題の定義に必要なパラメータ（統計）と、公開鍵 {'seed', 'b'}、秘密鍵 s。
     """
     print("\n--- 1. LWE (Learning With Errors) パラメータ定義 ---")
     
@@ -32,9 +73,9 @@ def generate_lwe_parameters(n_dim=256, m_dim=512, q_mod=3329, sigma_noise=1.5):
     print(f" モジュラス q: {q_mod}")
     print(f" ノイズ標準偏差 sigma: {sigma_noise}")
     
-    # 2. 公開鍵行列 A の生成
-    # Aは Z_q 上でランダムに選ばれる (n x m 行列)
-    A = np.random.randint(0, q_mod, size=(n_dim, m_dim))
+    # 2. 公開鍵行列 A のシード
+    # Aは Z_q 上でランダムに選ばれる (n x m 行列) が、保存・配布するのは 32 バイトのシードだけ
+    seed = os.urandom(SEED_BYTES) if seed is None else seed
     
     # 3. 秘密鍵ベクトル s の生成 (短いベクトル)
     # sは短いランダムな整数ベクトル (m x 1)
@@ -46,25 +87,68 @@ def generate_lwe_parameters(n_dim=256, m_dim=512, q_mod=3329, sigma_noise=1.5):
     e = np.round(np.random.normal(0, sigma_noise, size=(n_dim, 1))).astype(int)
     
     # 5. 公開ベクトル b の計算: b = A * s + e (mod q)
-    b = (A @ s + e) % q_mod
+    # A の行をシードから1行ずつ展開し、その場で内積をとる
+    b = np.empty((n_dim, 1), dtype=np.int64)
+    for i, row in enumerate(iter_rows(seed, n_dim, m_dim, q_mod)):
+        if i == 0:
+            A_sample = row[:5].tolist()
+        b[i, 0] = (row @ s[:, 0] + e[i, 0]) % q_mod
     
     # 6. 公開鍵と秘密鍵の定義
-    # 公開鍵 PK = (A, b)
+    # 公開鍵 PK = (seed, b)  ※ A = expand_matrix(seed, n, m, q)
     # 秘密鍵 SK = s
     
     # 保存用のパラメータ辞書を構築
     return {
         'n': n_dim, 'm': m_dim, 'q': q_mod, 'sigma': sigma_noise,
-        'A_shape': A.shape, 's_shape': s.shape, 'b_shape': b.shape,
-        'A_sample': A[0, :5].tolist(),  # 行列Aの最初の数要素のサンプル
+        'A_shape': (n_dim, m_dim), 's_shape': s.shape, 'b_shape': b.shape,
+        'A_sample': A_sample,  # 行列Aの最初の数要素のサンプル
         's_sample': s[:5, 0].tolist(), # 秘密ベクトルsの最初の数要素のサンプル
         'b_sample': b[:5, 0].tolist(), # 公開ベクトルbの最初の数要素のサンプル
+        'public_key': {'seed': seed, 'b': b[:, 0]},
+        'secret_key': s[:, 0],
     }
 
-def save_lattice_parameters(params, filename='../data/lattice_params.json'):
+def save_public_key(filename, public_key, n_dim, m_dim, q_mod):
+    """
+    公開鍵 (seed, b) をバイナリで保存する。
+    形式: ヘッダー（マジック, n, m, q）、シード 32 バイト、b の各要素を q のビット数で詰めた列。
+    """
+    nbits = q_mod.bit_length()
+    b = np.asarray(public_key['b'], dtype=np.int64)
+    bits = (b[:, None] >> np.arange(nbits)) & 1
+    with open(filename, 'wb') as f:
+        f.write(PK_HEADER.pack(PK_MAGIC, n_dim, m_dim, q_mod))
+        f.write(public_key['seed'])
+        f.write(np.packbits(bits.astype(np.uint8).ravel(), bitorder='little').tobytes())
+    return os.path.getsize(filename)
+
+def load_public_key(filename):
+    """
+    save_public_key で保存した公開鍵を読み込む。
+
+    Returns:
+        dict: n, m, q, seed (bytes), b (np.ndarray)。A は expand_matrix(seed, n, m, q) で復元できる。
     """
-    生成されたパラメータをJSONファイルに保存する。
+    with open(filename, 'rb') as f:
+        magic, n_dim, m_dim, q_mod = PK_HEADER.unpack(f.read(PK_HEADER.size))
+        if magic != PK_MAGIC:
+            raise ValueError(f"'{filename}' は公開鍵ファイルではありません")
+        seed = f.read(SEED_BYTES)
+        packed = np.frombuffer(f.read(), dtype=np.uint8)
+    nbits = q_mod.bit_length()
+    bits = np.unpackbits(packed, bitorder='little')[:n_dim * nbits].reshape(n_dim, nbits)
+    b = (bits.astype(np.int64) << np.arange(nbits)).sum(axis=1)
+    return {'n': n_dim, 'm': m_dim, 'q': q_mod, 'seed': seed, 'b': b}
+
+def save_lattice_parameters(params, filename='../data/lattice_params.json', key_filename=None):
+    """
+    生成されたパラメータの統計をJSONファイルに、公開鍵 (seed, b) をバイナリファイルに保存する。
     ファイルパスにディレクトリーが存在しない場合、自動的に作成する。
+    秘密鍵は保存しない。
+
+    Args:
+        key_filename (str): 公開鍵の保存先（既定は filename の拡張子を '_pk.bin' に変えたもの）。
     """
     # ディレクトリーパスを取得し、存在しない場合は作成
     dirname = os.path.dirname(filename)
@@ -73,8 +157,21 @@ def save_lattice_parameters(params, filename='../data/lattice_params.json'):
         os.makedirs(dirname)
         print(f"(注意: ディレクトリ '{dirname}' を自動作成しました。)")
     
+    # 鍵そのもの（bytes / ndarray）はJSONにせず、統計と公開鍵ファイルの情報だけを書く
+    stats = {k: v for k, v in params.items() if k not in ('public_key', 'secret_key')}
+    if 'public_key' in params:
+        key_filename = key_filename or os.path.splitext(filename)[0] + '_pk.bin'
+        size = save_public_key(key_filename, params['public_key'], params['n'], params['m'], params['q'])
+        stats.update({
+            'seed': params['public_key']['seed'].hex(),
+            'public_key_file': os.path.basename(key_filename),
+            'public_key_bytes': size,
+            'dense_A_bytes': params['n'] * params['m'] * 8,  # A を int64 のまま保存した場合
+        })
+        print(f"\n=> 公開鍵 (seed, b) を '{key_filename}' に保存しました ({size} バイト)。")
+    
     with open(filename, 'w') as f:
-        json.dump(params, f, indent=4)
+        json.dump(stats, f, indent=4)
     print(f"\n=> 格子パラメータ統計を '{filename}' に保存しました。")
     
 def simulate_key_generation(n_dim=256, m_dim=512, q_mod=3329):
@@ -87,7 +184,8 @@ def simulate_key_generation(n_dim=256, m_dim=512, q_mod=3329):
     params = generate_lwe_parameters(n_dim, m_dim, q_mod)
     
     # 公開鍵の要素表示
-    print(f"\n 公開鍵 PK = (A, b)")
+    print(f"\n 公開鍵 PK = (seed, b)  ※ A はシードから SHAKE-128 で展開")
+    print(f"  シード: {params['public_key']['seed'].hex()}")
     print(f"  行列 A の一部 (Z_{q_mod} 上): {params['A_sample']}...")
     print(f"  ベクトル b の一部 (A*s+e): {params['b_sample']}...")
     
@@ -103,6 +201,16 @@ def simulate_key_generation(n_dim=256, m_dim=512, q_mod=3329):
     # データ保存
     save_lattice_parameters(params)
     
+    # 保存した公開鍵を読み戻し、シードから展開した A で b - A s が小さなノイズになることを確かめる
+    pk = load_public_key('../data/lattice_params_pk.bin')
+    A = expand_matrix(pk['seed'], pk['n'], pk['m'], pk['q'])
+    e = (pk['b'] - A @ params['secret_key']) % q_mod
+    e = np.where(e > q_mod // 2, e - q_mod, e)
+    print(f"\n 読み戻した公開鍵: b が一致 {bool((pk['b'] == params['public_key']['b']).all())}, "
+          f"b - A s の最大ノイズ {int(np.abs(e).max())}")
+    print(f" 公開鍵のサイズ: {os.path.getsize('../data/lattice_params_pk.bin')} バイト "
+          f"(A を int64 で持つと {A.nbytes} バイト)")
+    
 if __name__ == '__main__':
     # DilithiumなどのPQC標準に近いパラメータ設定で実行
     simulate_key_generation(n_dim=256, m_dim=512, q_mod=3329)
\ No newline at end of file
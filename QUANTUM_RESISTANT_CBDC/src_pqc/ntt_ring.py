@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Nov  5 09:41:27 2026
+
+@author: iwamura
+"""
+
+# P08_QUANTUM_RESISTANT_CBDC/src_pqc/ntt_ring.py
+#
+# 多項式環 R_q = Z_q[X]/(X^256 + 1)（q = 3329、Kyber と同じ）の上の Module-LWE。
+# 素朴な LWE は 256x512 の密な整数行列 A を作り、A @ s を O(n m) で計算する
+# （lattice_crypto.generate_lwe_parameters は A をシードから1行ずつ展開するが、計算量は同じ O(n m)）。
+# ここでは A を k×k 個の多項式として持ち、数論変換（NTT）で
+#   - 多項式の積を、NTT 領域での各点ごとの積（2次の因子ごとの積）に変え、
+#   - 回転因子は最初に表として1回だけ計算し、
+#   - 多項式の束（末尾の軸が係数、それ以外は任意のバッチ軸）をまとめて変換する。
+# 鍵生成・暗号化の計算量は O(k^2 n log n) になる。
+#
+# q - 1 = 3328 は 512 で割り切れないので、X^256 + 1 は1次式まで分解できない。
+# Kyber と同じく 7 段の NTT で 128 個の2次式 X^2 - ζ^(2 br(i) + 1) に分け、積はその2次式ごとに行う。
+
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+
+from lattice_crypto import SEED_BYTES, generate_lwe_parameters, sample_uniform
+
+Q = 3329
+N = 256
+ZETA = 17  # Z_q の 1 の原始 256 乗根
+F_INV = pow(128, -1, Q)  # 逆変換の最後に掛ける 128^{-1} mod q
+
+
+def bitrev7(i):
+    """7ビットのビット反転"""
+    return int(f"{i:07b}"[::-1], 2)
+
+
+# 回転因子の表（Kyber の参照実装と同じ並び）
+ZETAS = np.array([pow(ZETA, bitrev7(i), Q) for i in range(128)], dtype=np.int64)
+GAMMAS = np.array([pow(ZETA, 2 * bitrev7(i) + 1, Q) for i in range(128)], dtype=np.int64)
+
+
+def ntt(a):
+    """
+    多項式（係数は末尾の軸）を NTT 領域へ変換する。
+
+    Args:
+        a (np.ndarray): 形状 (..., 256) の係数。
+
+    Returns:
+        np.ndarray: 形状 (..., 256) の NTT 表現（0 ≤ 値 < q）。
+    """
+    a = np.array(a, dtype=np.int64) % Q
+    batch = a.shape[:-1]
+    k, length = 1, 128
+    while length >= 2:
+        blocks = N // (2 * length)
+        v = a.reshape(batch + (blocks, 2, length))  # a のビュー（書き込みは a に反映される）
+        t = ZETAS[k:k + blocks, None] * v[..., 1, :] % Q
+        v[..., 1, :] = (v[..., 0, :] - t) % Q
+        v[..., 0, :] = (v[..., 0, :] + t) % Q
+        k += blocks
+        length //= 2
+    return a
+
+
+def intt(a):
+    """NTT 領域から係数表現へ戻す（ntt の逆変換）。"""
+    a = np.array(a, dtype=np.int64) % Q
+    batch = a.shape[:-1]
+    k, length = 127, 2
+    while length <= 128:
+        blocks = N // (2 * length)
+        v = a.reshape(batch + (blocks, 2, length))
+        z = ZETAS[k - blocks + 1:k + 1][::-1, None]
+        t = v[..., 0, :].copy()
+        v[..., 0, :] = (t + v[..., 1, :]) % Q
+        v[..., 1, :] = z * (v[..., 1, :] - t) % Q
+        k -= blocks
+        length *= 2
+    return a * F_INV % Q
+
+
+def basemul(a_hat, b_hat):
+    """
+    NTT 領域での積。係数を2つずつ組にし、各組を X^2 - γ_i を法とする1次式の積として計算する。
+    a_hat, b_hat はブロードキャスト可能な形状 (..., 256)。
+    """
+    a = a_hat.reshape(a_hat.shape[:-1] + (128, 2))
+    b = b_hat.reshape(b_hat.shape[:-1] + (128, 2))
+    a0, a1, b0, b1 = a[..., 0], a[..., 1], b[..., 0], b[..., 1]
+    c = np.empty(np.broadcast_shapes(a.shape, b.shape), dtype=np.int64)
+    c[..., 0] = (a0 * b0 + a1 * b1 % Q * GAMMAS) % Q
+    c[..., 1] = (a0 * b1 + a1 * b0) % Q
+    return c.reshape(c.shape[:-2] + (N,))
+
+
+def poly_mul(a, b):
+    """R_q での多項式の積（NTT 経由、O(n log n)）"""
+    return intt(basemul(ntt(a), ntt(b)))
+
+
+def poly_mul_schoolbook(a, b):
+    """R_q での多項式の積の定義どおりの計算（O(n^2)、検算用）"""
+    full = np.convolve(np.asarray(a, dtype=np.int64) % Q, np.asarray(b, dtype=np.int64) % Q)
+    full = np.concatenate([full, np.zeros(1, dtype=np.int64)])
+    # X^256 = -1 なので、256 次以上の係数は符号を変えて折り返す
+    return (full[:N] - full[N:]) % Q
+
+
+def matvec(A_hat, s_hat):
+    """
+    NTT 領域での行列とベクトルの積 t_i = Σ_j A_ij s_j。
+
+    Args:
+        A_hat (np.ndarray): 形状 (k, k, 256)。
+        s_hat (np.ndarray): 形状 (..., k, 256)（先頭はバッチ軸）。
+
+    Returns:
+        np.ndarray: 形状 (..., k, 256)。
+    """
+    return basemul(A_hat, s_hat[..., None, :, :]).sum(axis=-2) % Q
+
+
+def inner(t_hat, r_hat):
+    """NTT 領域での内積 Σ_j t_j r_j（形状 (..., k, 256) → (..., 256)）"""
+    return basemul(t_hat, r_hat).sum(axis=-2) % Q
+
+
+def cbd(eta, shape, rng):
+    """中心二項分布 B_eta（値は -eta..eta、分散 eta/2）に従う小さな係数"""
+    bits = rng.integers(0, 2, size=(2, eta) + tuple(shape), dtype=np.int8)
+    return bits[0].sum(axis=0, dtype=np.int64) - bits[1].sum(axis=0, dtype=np.int64)
+
+
+def matrix_from_seed(seed, k):
+    """
+    公開行列 A を NTT 領域でシードから展開する（一様な多項式の NTT も一様なので、変換は要らない）。
+    A_ij は SHAKE-128(seed || j || i) の棄却サンプリング（Kyber と同じ添字の並び）。
+    """
+    return np.array([[sample_uniform(seed, bytes([j, i]), N, Q) for j in range(k)] for i in range(k)])
+
+
+def keygen(k=2, eta=2, rng=None, seed=None):
+    """
+    Module-LWE の鍵を生成する。t = A s + e（A は k×k の多項式行列、s, e は小さな係数の多項式ベクトル）。
+
+    Args:
+        k (int): モジュールの階数（k=2 で格子の次元 512、Kyber512 相当）。
+        eta (int): 秘密鍵とノイズの中心二項分布のパラメータ。
+        seed (bytes): 公開行列 A のシード（省略すると os.urandom で選ぶ）。
+
+    Returns:
+        tuple: (公開鍵 {'seed', 'A_hat', 't_hat'}, 秘密鍵 s_hat)。A_hat と t_hat は NTT 領域。
+            保存・配布するのは seed と t_hat だけでよい（A_hat は matrix_from_seed で復元できる）。
+    """
+    rng = rng or np.random.default_rng()
+    seed = os.urandom(SEED_BYTES) if seed is None else seed
+    A_hat = matrix_from_seed(seed, k)
+    s_hat = ntt(cbd(eta, (k, N), rng))
+    e_hat = ntt(cbd(eta, (k, N), rng))
+    t_hat = (matvec(A_hat, s_hat) + e_hat) % Q
+    return {'seed': seed, 'A_hat': A_hat, 't_hat': t_hat}, s_hat
+
+
+def encrypt(pk, messages, eta=2, rng=None):
+    """
+    256 ビットのメッセージの束をまとめて暗号化する。
+        u = A^T r + e1,  v = t^T r + e2 + round(q/2) m
+
+    Args:
+        pk (dict): keygen の公開鍵。
+        messages (np.ndarray): 形状 (B, 256) または (256,) の 0/1。
+
+    Returns:
+        tuple: (u, v)。形状 (B, k, 256) と (B, 256)（係数表現）。
+    """
+    rng = rng or np.random.default_rng()
+    A_hat, t_hat = pk['A_hat'], pk['t_hat']
+    k = A_hat.shape[0]
+    m = np.asarray(messages, dtype=np.int64)
+    batch = m.shape[:-1]
+    r_hat = ntt(cbd(eta, batch + (k, N), rng))
+    u = (intt(matvec(A_hat.swapaxes(0, 1), r_hat)) + cbd(eta, batch + (k, N), rng)) % Q
+    v = (intt(inner(t_hat, r_hat)) + cbd(eta, batch + (N,), rng) + m * ((Q + 1) // 2)) % Q
+    return u, v
+
+
+def decrypt(s_hat, u, v):
+    """v - s^T u を q/2 に近いか 0 に近いかで 1/0 に戻す"""
+    w = (v - intt(inner(s_hat, ntt(u)))) % Q
+    return ((2 * w + Q // 2) // Q) % 2
+
+
+def to_dense(A_hat):
+    """
+    NTT 領域の多項式行列を、同じ写像を表す (k n)×(k n) の密な整数行列に直す（検算・比較用）。
+    多項式 a を掛ける写像は、負巡回行列 M[i, j] = a[i-j]（i ≥ j）、-a[n+i-j]（i < j）。
+    """
+    A = intt(A_hat)
+    k = A.shape[0]
+    i, j = np.meshgrid(np.arange(N), np.arange(N), indexing='ij')
+    sign = np.where(i >= j, 1, -1)
+    dense = np.empty((k * N, k * N), dtype=np.int64)
+    for p in range(k):
+        for r in range(k):
+            dense[p * N:(p + 1) * N, r * N:(r + 1) * N] = sign * A[p, r][(i - j) % N] % Q
+    return dense
+
+
+def _best_time(fn, repeats):
+    best = np.inf
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def benchmark(k=2, batch=1000, repeats=5, seed=0):
+    """
+    NTT による鍵生成・暗号化と、密な行列の経路（乱数で作った密な A での A s と、
+    同じ次元 k n の密な A^T r）の時間を比べる。
+    シードから A を1行ずつ展開する lattice_crypto.generate_lwe_parameters の時間も測る。
+
+    Returns:
+        dict: 各処理の最短時間 [s]。
+    """
+    rng = np.random.default_rng(seed)
+    pk, s_hat = keygen(k, rng=rng)
+    messages = rng.integers(0, 2, size=(batch, N))
+    dim = k * N
+
+    def dense_keygen():
+        A = np.random.randint(0, Q, size=(dim // 2, dim))
+        s = np.random.randint(-1, 2, size=dim)
+        return A @ s % Q
+
+    def seeded_keygen():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_lwe_parameters(n_dim=dim // 2, m_dim=dim)
+
+    A_dense = to_dense(pk['A_hat'])
+    r_dense = rng.integers(-1, 2, size=(batch, dim))
+    result = {
+        'ntt_keygen': _best_time(lambda: keygen(k, rng=rng), repeats),
+        'dense_keygen': _best_time(dense_keygen, repeats),
+        'seeded_keygen': _best_time(seeded_keygen, repeats),
+        'ntt_encrypt': _best_time(lambda: encrypt(pk, messages, rng=rng), repeats) / batch,
+        'dense_encrypt': _best_time(lambda: r_dense @ A_dense % Q, repeats) / batch,
+    }
+    u, v = encrypt(pk, messages, rng=rng)
+    result['decrypt_ok'] = bool((decrypt(s_hat, u, v) == messages).all())
+    return result
+
+
+if __name__ == '__main__':
+    print("\n--- 1. NTT の検算 ---")
+    rng = np.random.default_rng(0)
+    a, b = rng.integers(0, Q, size=(2, N))
+    print(f" 逆変換で元に戻る: {bool((intt(ntt(a)) == a).all())}")
+    print(f" NTT の積 = 定義どおりの積: {bool((poly_mul(a, b) == poly_mul_schoolbook(a, b)).all())}")
+    pk, s_hat = keygen(2, rng=rng)
+    s = intt(s_hat).reshape(-1)
+    t_dense = (to_dense(pk['A_hat']) @ np.where(s > Q // 2, s - Q, s)) % Q
+    e = (intt(pk['t_hat']).reshape(-1) - t_dense) % Q
+    print(f" t - A s（密な行列で計算）が小さなノイズ: {bool((np.minimum(e, Q - e) <= 2).all())}")
+
+    print("\n--- 2. 鍵生成・暗号化の時間（Module-LWE k=2、格子の次元 512） ---")
+    r = benchmark()
+    print(f" 鍵生成: NTT {r['ntt_keygen'] * 1e3:.2f} ms / 密な行列 (256x512) {r['dense_keygen'] * 1e3:.2f} ms"
+          f" / シードから展開 (256x512) {r['seeded_keygen'] * 1e3:.2f} ms")
+    print(f" 暗号化 (1通あたり、1000通の束): NTT {r['ntt_encrypt'] * 1e6:.1f} us"
+          f" / 密な行列 (512x512) {r['dense_encrypt'] * 1e6:.1f} us")
+    print(f" 復号の確認: {r['decrypt_ok']}")
@@ -6,16 +6,27 @@ Created on Mon Dec 29 15:22:50 2025
 @author: iwamura
 """
 
-import subprocess
+import os
+import sys
 
-# Maxima実行
-subprocess.run(["maxima", "--very-quiet", "-r", 'load("austerity.mac")$'])
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from maxima_bridge import sandbox
 
-# 辞書型として読み込み
-results = {}
-with open("bridge.dat", "r") as f:
-    for line in f:
-        key, val = line.strip().split(":")
-        results[key] = float(val)
+HERE = os.path.dirname(os.path.abspath(__file__))
 
-print(f"財務局への回答：ブーメラン境界線は {results['threshold_d']} です。")
\ No newline at end of file
+def compute_threshold(params=None):
+    """austerity.mac をジョブ専用ディレクトリで実行し、bridge.dat の内容を辞書で返す"""
+    # Maxima実行（常駐ワーカー経由、出力はジョブごとの作業ディレクトリへ）
+    out = sandbox.run_mac(os.path.join(HERE, "austerity.mac"), ["bridge.dat"], params=params)
+
+    # 辞書型として読み込み
+    results = {}
+    for line in out["bridge.dat"].splitlines():
+        if line.strip():
+            key, val = line.strip().split(":")
+            results[key] = float(val)
+    return results
+
+if __name__ == "__main__":
+    results = compute_threshold()
+    print(f"財務局への回答：ブーメラン境界線は {results['threshold_d']} です。")
@@ -6,24 +6,33 @@ Created on Mon Dec 29 16:13:05 2025
 @author: iwamura
 """
 
-import subprocess
+import io
+import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 
-def run_reform_simulation():
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from maxima_bridge import sandbox, sweep
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def simulate_reform(params=None):
+    """reform.mac をジョブ専用ディレクトリで実行し、比較用データ込みの DataFrame を返す"""
     # --- STEP 1: Maximaを実行してデータを生成 ---
-    print("Maxima running: Calculating the 'Fiscal Freedom' roadmap...")
-    subprocess.run(["maxima", "--very-quiet", "-r", 'load("reform.mac")$'])
+    out = sandbox.run_mac(os.path.join(HERE, "reform.mac"), ["reform_results.csv"], params=params)
 
     # --- STEP 2: 生成されたCSVを読み込む (ここが引き渡し) ---
-    df = pd.read_csv("reform_results.csv")
-    
+    df = pd.read_csv(io.StringIO(out["reform_results.csv"]))
+
     # --- STEP 3: 比較用の「ザイム真理教（緊縮）」データを作成 ---
     # 成長率1%固定、負担率35%固定
     df['zaimu_gdp'] = 550.0 * (1.01 ** df['year'])
     df['zaimu_tax'] = df['zaimu_gdp'] * 0.35
     df['zaimu_cum_tax'] = df['zaimu_tax'].cumsum()
+    return df
 
+def plot_reform(df):
     # --- STEP 4: 可視化 ---
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
 
@@ -54,6 +63,18 @@ def run_reform_simulation():
     plt.tight_layout()
     plt.show()
 
+def run_reform_simulation(params=None):
+    print("Maxima running: Calculating the 'Fiscal Freedom' roadmap...")
+    df = simulate_reform(params)
+    plot_reform(df)
+    return df
+
+def sweep_reform(r_targets, processes=None):
+    """目標負担率ごとの試算をプロセス並列で実行し、20年後の累計税収を返す"""
+    frames = sweep.run_jobs(simulate_reform, [{"params": {"r_target": r}} for r in r_targets],
+                            processes=processes)
+    return {r: df['cumulative_tax'].iloc[-1] for r, df in zip(r_targets, frames)}
+
 # 実行
 if __name__ == "__main__":
     run_reform_simulation()
\ No newline at end of file
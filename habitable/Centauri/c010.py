@@ -2,7 +2,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import os
-import subprocess
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from maxima_bridge import pool
+from maxima_bridge.symeval import SymbolicEvaluator
 
 # ===== 日本語フォント自動検出 =====
 def setup_japanese_font():
@@ -69,20 +73,17 @@ print("許容限界以内:", if t_wh_total < t_limit then "Yes" else "No");
 
 # Maxima連成: Maximaを実行
 try:
-    proc = subprocess.run(
-        ['maxima', '--very-quiet', '-r', maxima_code],
-        capture_output=True, text=True, timeout=30
-    )
-    maxima_output = proc.stdout
+    maxima_output = pool.run(maxima_code, timeout=30)
     print("Maxima連成結果:")
     print(maxima_output)
 except FileNotFoundError:
     print("Maximaがインストールされていません。Pythonで代替計算します。")
-    import sympy as sp
-    t_min = 0.005
-    t_comfort = 0.020
-    t_limit = 0.100
-    t_wh_total = 0.0001 + 0.0005 + 0.0 + 0.0005
+    # maxima_code の定義をそのままプロセス内で評価
+    haptic = SymbolicEvaluator(maxima_code)
+    t_min = haptic.evaluate("t_min")
+    t_comfort = haptic.evaluate("t_comfort")
+    t_limit = haptic.evaluate("t_limit")
+    t_wh_total = haptic.evaluate("t_wh_total")
     print(f"人間の触覚知覚閾値:")
     print(f"最小検知時間: {t_min*1000:.1f} ms")
     print(f"快適な応答時間: {t_comfort*1000:.1f} ms")
@@ -2,9 +2,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import os
-import subprocess
+import sys
 import json
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from maxima_bridge import pool
+from maxima_bridge.symeval import SymbolicEvaluator
+
 # ===== 日本語フォント自動検出 =====
 def setup_japanese_font():
     jp_font_candidates = [
@@ -59,26 +63,20 @@ sensitivity: -p * x^(p-1) * (E0 - Emin);
 print("感度係数:", sensitivity);
 """
 
+# 同じ定義をプロセス内でも評価できるようにしておく（Maxima不在時・配列評価用）
+simp = SymbolicEvaluator(maxima_code)
+
 # Maxima連成: Maximaを実行して結果を取得
 try:
-    proc = subprocess.run(
-        ['maxima', '--very-quiet', '-r', maxima_code],
-        capture_output=True, text=True, timeout=30
-    )
-    maxima_output = proc.stdout
+    maxima_output = pool.run(maxima_code, timeout=30)
     print("Maxima連成結果:")
     print(maxima_output)
 except FileNotFoundError:
     print("Maximaがインストールされていません。Pythonで代替計算します。")
-    # Maxima連成: Pythonで代替計算（sympy使用）
-    import sympy as sp
-    x_sym, E0_sym, Emin_sym, p_sym = sp.symbols('x E0 Emin p')
-    K_x_sym = Emin_sym + (E0_sym - Emin_sym) * x_sym**p_sym
-    K_x_val = float(K_x_sym.subs({x_sym: 0.5, E0_sym: 71e9, Emin_sym: 1e-9, p_sym: 3}))
-    print(f"SIMP補間によるヤング率: {K_x_val:.2e} [Pa]")
-    sensitivity_sym = sp.diff(K_x_sym, x_sym)
-    sens_val = float(sensitivity_sym.subs({x_sym: 0.5, E0_sym: 71e9, Emin_sym: 1e-9, p_sym: 3}))
-    print(f"感度係数: {sens_val:.2e}")
+    # Maxima連成: maxima_code の定義をそのままプロセス内で評価
+    print(f"SIMP補間によるヤング率: {simp.evaluate('K_x'):.2e} [Pa]")
+    print(f"目標体積: {simp.evaluate('V_x')} [m^3]")
+    print(f"感度係数: {simp.evaluate('sensitivity'):.2e}")
 
 # --- Maxima .macファイル出力 ---
 mac_content = """/* C106: 3Dプリンタ出力可能な構造部材の最適化 */
@@ -131,11 +129,11 @@ x_min = 0.01
 # 設計変数の範囲
 x_vals = np.linspace(x_min, 1.0, 100)
 
-# SIMP補間
-K_x = Emin + (E0 - Emin) * x_vals**p
+# SIMP補間（maxima_code と同じ式を配列で評価）
+K_x = simp.evaluate("K_x", x=x_vals)
 
 # 感度
-sensitivity = -p * x_vals**(p-1) * (E0 - Emin)
+sensitivity = simp.evaluate("sensitivity", x=x_vals)
 
 # 体積制約
 V_x = f_vol * np.ones_like(x_vals)
@@ -2,9 +2,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import os
-import subprocess
+import sys
 import sympy as sp
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from maxima_bridge import pool
+from maxima_bridge.symeval import SymbolicEvaluator
+
 # ===== 日本語フォント自動検出 =====
 def setup_japanese_font():
     jp_font_candidates = [
@@ -80,37 +84,28 @@ print("10年後のOリング応力:", sigma_val / 1e6, "[MPa]");
 print("応力保持率:", sigma_val / sigma0 * 100, "[%]");
 """
 
+# 同じ定義をプロセス内でも評価できるようにしておく（Maxima不在時用）
+seal = SymbolicEvaluator(maxima_code)
+
 # Maximaを実行（連成の証拠）
 maxima_executed = False
 try:
-    proc = subprocess.run(
-        ['maxima', '--very-quiet', '-r', maxima_code],
-        capture_output=True, text=True, timeout=30
-    )
-    maxima_output = proc.stdout
+    maxima_output = pool.run(maxima_code, timeout=30)
     print("\n【Maxima連成】Maxima実行結果:")
     print(maxima_output)
     maxima_executed = True
 except FileNotFoundError:
     print("\n【Maxima連成】Maximaがインストールされていません。sympyで代替計算します。")
-    # sympyで数値計算
-    C0_val = 1.0e-6
-    D_val = 1.0e-12
-    t_val = 3600*24*365*10
-    M_val = float(2 * C0_val * sp.sqrt(D_val * t_val / sp.pi).evalf())
+    # maxima_code の定義をそのまま sympy で NumPy 関数に変換して評価
+    M_val = seal.evaluate("M_val")
     print(f"【sympy代替計算】10年後のアウトガス量: {M_val:.2e} [mol/m^2]")
     
-    r_val = 0.5e-3
-    delta_p_val = 1.013e5
-    eta_val = 1.8e-5
-    L_val = 2.0e-3
-    Q_val = float((sp.pi * r_val**4 * delta_p_val) / (8 * eta_val * L_val))
+    Q_val = seal.evaluate("Q_val")
     print(f"漏れ率: {Q_val:.2e} [m^3/s]")
+    print(f"1年あたりの漏れ量: {Q_val * 3600 * 24 * 365:.2e} [m^3]")
     
-    sigma0_val = 5.0e6
-    tau_val = 3600*24*365*20
-    t_ring_val = 3600*24*365*10
-    sigma_val = float(sigma0_val * sp.exp(-t_ring_val / tau_val))
+    sigma0_val = seal.evaluate("sigma0")
+    sigma_val = seal.evaluate("sigma_val")
     print(f"10年後のOリング応力: {sigma_val/1e6:.2f} [MPa]")
     print(f"応力保持率: {sigma_val/sigma0_val*100:.1f} [%]")
 
@@ -133,9 +128,7 @@ years = np.linspace(0, 50, 100)
 t_sec = years * 365 * 24 * 3600
 
 # 1. アウトガス量の時間変化
-C0_np = 1.0e-6
-D_np = 1.0e-12
-M_t_np = 2 * C0_np * np.sqrt(D_np * t_sec / np.pi)
+M_t_np = seal.evaluate("M", t=t_sec)
 
 # 2. 漏れ率（温度依存性）
 temperatures = np.array([-100, -50, 0, 25, 50, 100])
@@ -144,15 +137,11 @@ eta0 = 1.8e-5
 T0 = 298.15
 S = 110.4
 eta_T = eta0 * (T_K/T0)**1.5 * (T0 + S) / (T_K + S)
-r_np = 0.5e-3
-delta_p_np = 1.013e5
-L_np = 2.0e-3
-Q_T_np = (np.pi * r_np**4 * delta_p_np) / (8 * eta_T * L_np)
+Q_T_np = seal.evaluate("Q", eta=eta_T)  # r, delta_p, L は maxima_code の値を使う
 
 # 3. Oリング応力緩和
-sigma0_np = 5.0e6
-tau_np = 3600*24*365*20
-sigma_t_np = sigma0_np * np.exp(-t_sec / tau_np)
+sigma0_np = seal.evaluate("sigma0")
+sigma_t_np = seal.evaluate("sigma", t=t_sec)
 
 # 4. シール材質比較
 materials = {
@@ -11,27 +11,28 @@ import numpy as np
 import matplotlib.pyplot as plt
 import os
 import sys
-import importlib
 
-# 実行ディレクトリをパスに追加
-sys.path.append(os.getcwd())
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+from maxima_bridge import codecache, pycodegen
 
 def run_simulation():
-    # Maxima出力ファイルのロード
-    if not os.path.exists("penrose_params.py"):
-        print("Error: penrose_params.py が存在しません。先に Maxima を実行してください。")
+    # Maxima出力ファイルのロード（task1007.mac が変わった時だけ再導出する）
+    try:
+        penrose_params = codecache.load_generated(os.path.join(HERE, "task1007.mac"), "penrose_params.py",
+                                                  postprocess=pycodegen.optimize_source,
+                                                  extra=pycodegen.BACKEND_VERSION)
+    except FileNotFoundError:
+        print("Error: penrose_params.py が存在せず、Maxima も見つかりません。")
         return
 
-    import penrose_params
-    importlib.reload(penrose_params)
-
     # パラメータ設定: スピン a/M (0 to 0.999)
     M = 1.0
     a_values = np.linspace(0, 0.999, 100)
     
     # 利得計算
     try:
-        gains = [penrose_params.get_max_gain(M, a) for a in a_values]
+        gains = penrose_params.get_max_gain(M, a_values)
     except Exception as e:
         print(f"Calculation Error: {e}")
         return
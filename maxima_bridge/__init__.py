@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Maxima連成用の共通モジュール群
+
+各課題ディレクトリのスクリプトから、リポジトリ直下をパスに追加して
+`from maxima_bridge import pool` のように読み込む。
+"""
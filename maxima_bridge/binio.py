@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:40:05 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/binio.py
+#
+# Python ⇔ Maxima 間の浮動小数点配列の一括受け渡し。
+# 数値を "[...]" の文字列リテラルに埋め込み、printf で1要素ずつ書き戻して
+# float(x) で再パースする方式は、10^5〜10^6 サンプルでは文字列処理が支配的になる。
+# ここでは固定のバイナリ形式（ヘッダ無し、リトルエンディアンの8バイト IEEE 754）の
+# 一時ファイルを介し、Maxima側は numericalio の read_binary_list / write_binary_data で
+# 要素ごとの書式化を行わずに読み書きする。
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import pool as _pool
+
+DTYPE = np.dtype("<f8")
+DEFAULT_CHUNK = 1 << 16  # 1チャンクあたりの要素数
+
+# numericalio の既定は msb なので、NumPy側の '<f8' に合わせて lsb を指定する
+MAXIMA_HEADER = """if not fboundp(read_binary_list) then load("numericalio")$
+assume_external_byte_order(lsb)$"""
+
+
+def _maxima_string(path):
+    return '"' + path.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_array(path, values, chunk_size=DEFAULT_CHUNK):
+    """配列を固定バイナリ形式で書き出す（変換用の一時配列は chunk_size 要素ずつ）。"""
+    values = np.asarray(values).ravel()
+    with open(path, "wb") as f:
+        for lo in range(0, values.size, chunk_size):
+            np.ascontiguousarray(values[lo:lo + chunk_size], dtype=DTYPE).tofile(f)
+
+
+def read_array(path):
+    """固定バイナリ形式のファイルを1次元の float64 配列として読み込む。"""
+    return np.fromfile(path, dtype=DTYPE)
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK):
+    """固定バイナリ形式のファイルを chunk_size 要素ずつ読み出す。"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = np.fromfile(f, dtype=DTYPE, count=chunk_size)
+            if chunk.size == 0:
+                return
+            yield chunk
+
+
+def maxima_read(var, path):
+    """バイナリファイルを Maxima のリスト変数へ読み込むコード片。"""
+    return f"{var} : read_binary_list({_maxima_string(path)})$"
+
+
+def maxima_write(var, path):
+    """Maxima の浮動小数点リストをバイナリファイルへ書き出すコード片。"""
+    return f"write_binary_data({var}, {_maxima_string(path)})$"
+
+
+def map_arrays(body, inputs, output, chunk_size=DEFAULT_CHUNK, pool=None, workdir=None, timeout=600.0):
+    """
+    同じ長さの入力配列をチャンクに分けてMaximaへ渡し、出力リストを配列で回収する。
+
+    各チャンクでは inputs の各キーが Maxima のリスト変数として定義された状態で body を実行し、
+    変数 output（float のリスト）をバイナリで書き戻させる。チャンクはプールの空きワーカーへ
+    並行に割り当てる。
+
+    Args:
+        body (str): 出力リストを計算するMaximaコード。
+        inputs (dict): Maxima変数名 → 1次元配列。
+        output (str): 結果を格納するMaxima変数名。
+        chunk_size (int): 1回の要求で渡す要素数。
+        pool (MaximaPool): 使用するプール（既定は共通プール）。
+        workdir (str): 一時ファイルを置くディレクトリ（既定はシステムの一時ディレクトリ）。
+        timeout (float): 1チャンクあたりの応答待ちの上限 [s]。
+
+    Returns:
+        np.ndarray: 連結された出力配列 (float64)。
+    """
+    pool = pool or _pool.get_pool()
+    arrays = {name: np.asarray(values).ravel() for name, values in inputs.items()}
+    sizes = {a.size for a in arrays.values()}
+    if len(sizes) != 1:
+        raise ValueError(f"入力配列の長さが揃っていません: { {k: a.size for k, a in arrays.items()} }")
+    n = sizes.pop()
+    out = np.empty(n, dtype=DTYPE)
+
+    tmpdir = tempfile.mkdtemp(prefix="mxbin_", dir=workdir)
+
+    def run_chunk(index, lo, hi):
+        lines = [MAXIMA_HEADER]
+        for name, values in arrays.items():
+            fname = f"{name}_{index}.f64"
+            write_array(os.path.join(tmpdir, fname), values[lo:hi], chunk_size)
+            lines.append(maxima_read(name, fname))
+        out_name = f"{output}_{index}.f64"
+        lines.append(body)
+        lines.append(maxima_write(output, out_name))
+        log = pool.run("\n".join(lines), cwd=tmpdir, timeout=timeout)
+
+        out_path = os.path.join(tmpdir, out_name)
+        result = read_array(out_path) if os.path.exists(out_path) else np.empty(0, dtype=DTYPE)
+        if result.size != hi - lo:
+            raise _pool.MaximaError(
+                f"チャンク {index}: {hi - lo} 要素を期待しましたが {result.size} 要素でした\n{log}")
+        out[lo:hi] = result
+
+    try:
+        bounds = [(i, lo, min(lo + chunk_size, n)) for i, lo in enumerate(range(0, n, chunk_size))]
+        with ThreadPoolExecutor(max_workers=pool.size) as ex:
+            for future in [ex.submit(run_chunk, *b) for b in bounds]:
+                future.result()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return out
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:02:51 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/codecache.py
+#
+# Maximaが生成するPythonモジュール（noiman/formula.py, habitable/penrose_params.py など）の
+# 内容ハッシュ付きキャッシュ。
+# .mac のソースとパラメータのハッシュをキーに、導出結果を __mxcache__/<名前>_<ハッシュ>.py として
+# 保存し、バイトコードもバージョンごとに残す。導出が変わらない限り Maxima の再実行も
+# importlib.reload も行わない。
+
+import hashlib
+import importlib.util
+import json
+import os
+import py_compile
+import shutil
+import sys
+
+from . import pool as _pool
+from .sandbox import define_params
+
+CACHE_DIRNAME = "__mxcache__"
+
+# プロセス内で読み込み済みのモジュール（キャッシュファイルのパス → モジュール）
+_LOADED = {}
+
+
+def source_hash(mac_path, params=None, extra=""):
+    """.mac ソース・パラメータ・付加情報から SHA-256 を計算する。"""
+    h = hashlib.sha256()
+    with open(mac_path, "rb") as f:
+        h.update(f.read())
+    h.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    h.update(extra.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _import_path(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # プロセスプールでの pickle に備えて sys.modules に登録しておく
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _generate(mac_path, output_path, params, pool, timeout):
+    """Maximaで .mac を実行し、output_path が新しく書き出されたことを確認する。"""
+    before = os.stat(output_path).st_mtime_ns if os.path.exists(output_path) else None
+    with open(mac_path, "r", encoding="utf-8") as f:
+        code = f.read()
+    # パラメータは .mac 本体より先に定義する
+    log = pool.run(define_params(params) + code, cwd=os.path.dirname(mac_path), timeout=timeout)
+    if not os.path.exists(output_path) or os.stat(output_path).st_mtime_ns == before:
+        raise _pool.MaximaError(f"{os.path.basename(mac_path)} が {output_path} を出力しませんでした\n{log}")
+
+
+def load_generated(mac_path, output, params=None, cache_dir=None, postprocess=None, extra="",
+                   pool=None, timeout=300.0):
+    """
+    Maximaで生成されるPythonモジュールを、内容ハッシュ付きキャッシュから読み込む。
+
+    Args:
+        mac_path (str): 生成元の .mac ファイル。
+        output (str): .mac が書き出すファイル名（.mac と同じディレクトリからの相対パス）。
+        params (dict): .mac の実行前に定義する Maxima 変数（ハッシュにも含める）。
+        cache_dir (str): キャッシュの置き場所（既定は .mac と同じディレクトリの __mxcache__）。
+        postprocess (callable): 生成されたソース文字列をキャッシュ前に変換する関数。
+        extra (str): ハッシュに加える付加情報（postprocess のバージョンなど）。
+        pool (MaximaPool): 使用するプール（既定は共通プール）。
+        timeout (float): Maxima の応答待ちの上限 [s]。
+
+    Returns:
+        module: 読み込まれたモジュール。
+    """
+    mac_path = os.path.abspath(mac_path)
+    mac_dir = os.path.dirname(mac_path)
+    output_path = os.path.join(mac_dir, output)
+    stem = os.path.splitext(os.path.basename(output))[0]
+
+    digest = source_hash(mac_path, params, extra)[:16]
+    cache_dir = cache_dir or os.path.join(mac_dir, CACHE_DIRNAME)
+    cached = os.path.join(cache_dir, f"{stem}_{digest}.py")
+    if cached in _LOADED:
+        return _LOADED[cached]
+    primary = cached
+
+    if not os.path.exists(cached):
+        try:
+            _generate(mac_path, output_path, params, pool or _pool.get_pool(), timeout)
+        except FileNotFoundError:
+            # Maximaが無い環境では、既存の生成物をそのまま使う（キーは生成物の内容から作る）
+            if not os.path.exists(output_path):
+                raise
+            print(f"(注意: Maximaが見つからないため、既存の {output} を使用します。)")
+            h = hashlib.sha256()
+            with open(output_path, "rb") as f:
+                h.update(f.read())
+            h.update(extra.encode("utf-8"))
+            digest = "out" + h.hexdigest()[:13]
+            cached = os.path.join(cache_dir, f"{stem}_{digest}.py")
+            if cached in _LOADED:
+                return _LOADED[cached]
+        if not os.path.exists(cached):
+            _store(output_path, cached, postprocess)
+
+    module = _import_path(cached, f"{stem}_{digest}")
+    _LOADED[cached] = _LOADED[primary] = module
+    return module
+
+
+def _store(output_path, cached, postprocess):
+    """生成物を（必要なら変換して）キャッシュへ保存し、バイトコードを作っておく。"""
+    with open(output_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    if postprocess is not None:
+        source = postprocess(source)
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(source)
+    os.replace(tmp, cached)
+    py_compile.compile(cached, doraise=True)
+
+
+def clear(cache_dir):
+    """キャッシュディレクトリを削除する。"""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    for path in [p for p in _LOADED if os.path.dirname(p) == os.path.abspath(cache_dir)]:
+        del _LOADED[path]
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:31:17 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/mexpr.py
+#
+# Maximaの式文字列（string() の出力、または py_convert で np./math. に置換した後の文字列）を
+# SymPy の式へ変換する。
+
+import re
+import types
+
+import sympy as sp
+from sympy.parsing.sympy_parser import parse_expr
+
+# Maxima / NumPy / math の関数名 → SymPy
+_FUNCTIONS = {
+    "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
+    "asin": sp.asin, "acos": sp.acos, "atan": sp.atan, "atan2": sp.atan2,
+    "arcsin": sp.asin, "arccos": sp.acos, "arctan": sp.atan, "arctan2": sp.atan2,
+    "sinh": sp.sinh, "cosh": sp.cosh, "tanh": sp.tanh,
+    "exp": sp.exp, "log": sp.log, "sqrt": sp.sqrt, "abs": sp.Abs,
+    "erf": sp.erf, "erfc": sp.erfc, "gamma": sp.gamma,
+    "max": sp.Max, "min": sp.Min,
+}
+
+# np.cos(...) / math.sqrt(...) のような属性参照を受け付けるための名前空間
+_MODULE = types.SimpleNamespace(pi=sp.pi, e=sp.E, **_FUNCTIONS)
+
+_CONSTANTS = {"%pi": "pi", "%e": "E", "%i": "I", "%phi": "GoldenRatio", "%gamma": "EulerGamma"}
+_RESERVED = {"pi", "E", "I", "GoldenRatio", "EulerGamma"}
+_CONSTANT_RE = re.compile(r"%(pi|e|i|phi|gamma)\b")
+_BIGFLOAT_RE = re.compile(r"(\d)[bB]([+-]?\d)")
+
+
+def to_sympy(text, symbols=None):
+    """
+    Maximaの式文字列をSymPyの式に変換する。
+
+    Args:
+        text (str): "C0*erf(x/(2*sqrt(D*t)))" や "np.cos(omega)**2" などの式。
+        symbols (dict): 名前 → SymPy シンボル（既定では未知の名前は実数シンボルになる）。
+
+    Returns:
+        sympy.Expr: 変換された式。
+    """
+    text = _CONSTANT_RE.sub(lambda m: _CONSTANTS[m.group(0)], text)
+    text = _BIGFLOAT_RE.sub(r"\1e\2", text).replace("^", "**")
+    local = {"np": _MODULE, "numpy": _MODULE, "math": _MODULE}
+    local.update(_FUNCTIONS)
+    for name in set(re.findall(r"(?<![.\w])[A-Za-z_]\w*", text)) - set(local) - _RESERVED:
+        local[name] = sp.Symbol(name, real=True)
+    if symbols:
+        local.update(symbols)
+    return parse_expr(text, local_dict=local)
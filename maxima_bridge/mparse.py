@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 09:20:48 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/mparse.py
+#
+# Maximaが printf(stream, "~a", ...) や string() で書き出したリスト・行列を読み込むパーサ。
+# これまでは { } を [ ] に置換して eval(f.read()) していたため、ファイル全体の文字列と
+# 入れ子の Python リストを丸ごと抱える上に、任意のコードが実行できてしまっていた。
+# ここではファイルをチャンクごとに字句解析し、値は平坦な float 配列に、形状は階層ごとの
+# 要素数として記録するので、線形時間・入れ子リストを作らずに NumPy 配列が得られる。
+#
+# 対応する構文:
+#   [1, 2, 3] / {1, 2} / matrix([1, 2], [3, 4]) とその入れ子
+#   1, -2.5, 1.0e-5, 1.0b-5（bigfloat）, 1/3
+#   %pi, %e, %phi を含む四則演算と ^（例: 2*%pi/3, -%e^2）
+#   トップレベルに空白・カンマ区切りで並んだ値（printf(dest, "~f ", x) の出力）
+
+import array
+import math
+import os
+import re
+
+import numpy as np
+
+DEFAULT_CHUNK = 1 << 20  # 1回に読み込む文字数
+
+_NUM = r"-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+_TOKEN_RE = re.compile(r"""
+    (?P<flat>\[\s*(?:NUM\s*,\s*)*NUM\s*\])
+  | (?P<num>(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eEbB][+-]?[0-9]+)?)
+  | (?P<open>[\[{])
+  | (?P<close>[\]}])
+  | (?P<comma>,)
+  | (?P<name>%?[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<op>[-+*/^()])
+  | (?P<ws>\s+)
+  | (?P<bad>.)
+""".replace("NUM", _NUM), re.VERBOSE | re.DOTALL)
+
+_CONSTANTS = {"%pi": math.pi, "%e": math.e, "%phi": (1 + math.sqrt(5)) / 2}
+_CLOSERS = {"[": "]", "{": "}", "matrix": ")"}
+_DELIMITERS = re.compile(r"[\s,\[\]{}()]")
+_NON_INT = re.compile(r"[.eE]")
+
+
+class MaximaParseError(ValueError):
+    """Maximaの出力として解釈できない入力。"""
+
+
+def _tokenize(text, end=None):
+    for m in _TOKEN_RE.finditer(text, 0, len(text) if end is None else end):
+        kind = m.lastgroup
+        if kind == "bad":
+            raise MaximaParseError(f"解釈できない文字: {m.group()!r}")
+        yield kind, m.group()
+
+
+def iter_tokens(stream, chunk_size=DEFAULT_CHUNK):
+    """
+    テキストストリームを (種類, 文字列) のトークン列として読み出す。
+    数値がチャンクの境界で切れないよう、最後の区切り文字以降は次のチャンクへ持ち越す。
+    """
+    carry = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        text = carry + chunk
+        if not chunk:
+            yield from _tokenize(text)
+            return
+        last = None
+        for last in _DELIMITERS.finditer(text, max(0, len(text) - 256)):
+            pass
+        if last is None:
+            # 区切り文字の無い長い断片は、次のチャンクとつなげて読む
+            carry = text
+            continue
+        yield from _tokenize(text, last.end())
+        carry = text[last.end():]
+
+
+class _Scalar:
+    """スカラー式のトークン列を評価する再帰下降パーサ。"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def _next(self):
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        value = self._expr()
+        if self.pos != len(self.tokens):
+            raise MaximaParseError(f"式の途中に余分なトークン: {self._peek()!r}")
+        return value
+
+    def _expr(self):
+        value = self._term()
+        while self._peek() in ("+", "-"):
+            value = value + self._term() if self._next()[1] == "+" else value - self._term()
+        return value
+
+    def _term(self):
+        value = self._unary()
+        while self._peek() in ("*", "/"):
+            value = value * self._unary() if self._next()[1] == "*" else value / self._unary()
+        return value
+
+    def _unary(self):
+        if self._peek() == "-":
+            self._next()
+            return -self._unary()
+        if self._peek() == "+":
+            self._next()
+            return self._unary()
+        return self._power()
+
+    def _power(self):
+        base = self._atom()
+        if self._peek() == "^":
+            self._next()
+            return base ** self._unary()
+        return base
+
+    def _atom(self):
+        if self.pos >= len(self.tokens):
+            raise MaximaParseError("式が途中で終わっています")
+        kind, text = self._next()
+        if kind == "num":
+            return float(text.replace("b", "e").replace("B", "e"))
+        if kind == "name" and text in _CONSTANTS:
+            return _CONSTANTS[text]
+        if text == "(":
+            value = self._expr()
+            if self._peek() != ")":
+                raise MaximaParseError("括弧が閉じていません")
+            self._next()
+            return value
+        raise MaximaParseError(f"数値として解釈できないトークン: {text!r}")
+
+
+def parse_tokens(tokens, shape=None, dtype=None):
+    """
+    トークン列を NumPy 配列に変換する。
+
+    Args:
+        tokens (iterable): iter_tokens() の出力。
+        shape (tuple): 期待する形状（None の軸は任意の長さ）。一致しなければ MaximaParseError。
+        dtype: 出力の型（既定では、全要素が整数リテラルなら int64、それ以外は float64）。
+
+    Returns:
+        np.ndarray: 読み込んだ値。
+    """
+    values = array.array("d")
+    all_int = True
+    closers = []       # 開いている階層の閉じ記号
+    counts = [0]       # 階層ごとの子要素数（先頭はトップレベル）
+    dims = []          # 深さごとの要素数（最初に閉じた階層で決まり、以後は一致を検査する）
+    leaf_depth = None  # スカラーが現れる深さ
+    scalar = []        # 評価待ちのスカラー式のトークン
+    paren = 0          # スカラー式の中の括弧の深さ
+    pending_matrix = False
+
+    def flush():
+        nonlocal leaf_depth, all_int
+        if not scalar:
+            return
+        depth = len(closers)
+        if leaf_depth is None:
+            leaf_depth = depth
+        elif leaf_depth != depth:
+            raise MaximaParseError("リストと数値が同じ階層に混在しています")
+        if len(scalar) == 1 and scalar[0][0] == "num":
+            text = scalar[0][1]
+            all_int = all_int and text.isdigit()
+            values.append(float(text.replace("b", "e").replace("B", "e")))
+        elif len(scalar) == 2 and scalar[0][1] == "-" and scalar[1][0] == "num":
+            text = scalar[1][1]
+            all_int = all_int and text.isdigit()
+            values.append(-float(text.replace("b", "e").replace("B", "e")))
+        else:
+            all_int = False
+            values.append(_Scalar(scalar).parse())
+        counts[-1] += 1
+        scalar.clear()
+
+    for kind, text in tokens:
+        if kind == "ws" and (closers or paren or pending_matrix):
+            continue
+        if pending_matrix:
+            if text != "(":
+                raise MaximaParseError("matrix の後に ( がありません")
+            pending_matrix = False
+            closers.append(")")
+            counts.append(0)
+            continue
+        if kind == "flat":
+            # 数値だけの最内リスト（大きな出力の大半）はまとめて変換する
+            if scalar:
+                raise MaximaParseError(f"数値の直後にリストがあります: {text[:20]!r}")
+            items = text[1:-1].split(",")
+            depth = len(closers)
+            if leaf_depth is None:
+                leaf_depth = depth + 1
+            elif leaf_depth != depth + 1:
+                raise MaximaParseError("リストと数値が同じ階層に混在しています")
+            values.extend(map(float, items))
+            all_int = all_int and not _NON_INT.search(text)
+            if len(dims) <= depth:
+                dims.extend([None] * (depth + 1 - len(dims)))
+            if dims[depth] is None:
+                dims[depth] = len(items)
+            elif dims[depth] != len(items):
+                raise MaximaParseError(f"深さ {depth + 1} の要素数が揃っていません（{dims[depth]} と {len(items)}）")
+            counts[-1] += 1
+        elif kind == "open" or (kind == "name" and text == "matrix"):
+            if scalar:
+                raise MaximaParseError(f"数値の直後にリストがあります: {text!r}")
+            if kind == "name":
+                pending_matrix = True
+            else:
+                closers.append(_CLOSERS[text])
+                counts.append(0)
+        elif kind == "close" or (text == ")" and paren == 0):
+            flush()
+            if not closers or closers[-1] != text:
+                raise MaximaParseError(f"対応しない閉じ括弧: {text!r}")
+            closers.pop()
+            n = counts.pop()
+            depth = len(closers)
+            if len(dims) <= depth:
+                dims.extend([None] * (depth + 1 - len(dims)))
+            if dims[depth] is None:
+                dims[depth] = n
+            elif dims[depth] != n:
+                raise MaximaParseError(f"深さ {depth + 1} の要素数が揃っていません（{dims[depth]} と {n}）")
+            counts[-1] += 1
+        elif kind == "comma":
+            if paren:
+                raise MaximaParseError("括弧の中にカンマがあります")
+            flush()
+        elif kind == "ws":
+            # トップレベルでは空白も値の区切り（"1.0 -2.0 3.0" のような出力）
+            if not closers and not paren:
+                flush()
+        else:
+            if text == "(":
+                paren += 1
+            elif text == ")":
+                paren -= 1
+            scalar.append((kind, text))
+    flush()
+    if closers or pending_matrix or paren:
+        raise MaximaParseError("入力が途中で終わっています")
+
+    n_top = counts[0]
+    if leaf_depth == 0:
+        # トップレベルに並んだスカラー（1個なら0次元配列）
+        out_shape = () if n_top == 1 else (n_top,)
+    elif n_top == 0:
+        out_shape = (0,)
+    else:
+        out_shape = tuple(dims) if n_top == 1 else (n_top,) + tuple(dims)
+
+    result = np.frombuffer(values, dtype=np.float64) if len(values) else np.empty(0)
+    result = result.reshape(out_shape)
+    if dtype is None:
+        dtype = np.int64 if all_int and len(values) else np.float64
+    result = result.astype(dtype)
+
+    if shape is not None:
+        if len(shape) != result.ndim or any(s is not None and s != r for s, r in zip(shape, result.shape)):
+            raise MaximaParseError(f"形状が一致しません: 期待 {tuple(shape)}、実際 {result.shape}")
+    return result
+
+
+def loads(text, shape=None, dtype=None):
+    """Maximaの出力文字列を NumPy 配列に変換する。"""
+    return parse_tokens(_tokenize(text), shape=shape, dtype=dtype)
+
+
+def load(path, shape=None, dtype=None, chunk_size=DEFAULT_CHUNK):
+    """
+    Maximaが書き出したファイルをチャンクごとに読み込み、NumPy 配列に変換する。
+
+    Args:
+        path (str): ファイルパス。
+        shape (tuple): 期待する形状（None の軸は任意の長さ）。
+        dtype: 出力の型（既定は整数リテラルのみなら int64、それ以外は float64）。
+        chunk_size (int): 1回に読み込む文字数。
+    """
+    with open(os.fspath(path), "r", encoding="utf-8") as f:
+        return parse_tokens(iter_tokens(f, chunk_size), shape=shape, dtype=dtype)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:12:40 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/pool.py
+#
+# 常駐Maximaワーカーのプール。
+# これまでは呼び出しのたびに `maxima --very-quiet -r ...` を起動していたため、
+# パラメータ掃引では毎回Lispの起動とパッケージ読み込みのコストを払っていた。
+# ここではワーカーを起動したまま標準入出力で要求/応答をやり取りし、
+# 起動コストをワーカー1つにつき1回だけにする。
+
+import atexit
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+
+MAXIMA_COMMAND = os.environ.get("MAXIMA", "maxima")
+DEFAULT_PRELOAD = ("stringproc", "draw", "numericalio")
+
+# 応答の終端を示す目印（要求ごとに連番を付ける）
+_SENTINEL = "__maxima_bridge_done__"
+
+# スクリプト単体実行用の quit(); はワーカーを終了させてしまうので取り除く
+_QUIT_RE = re.compile(r"\bquit\s*\(\s*\)\s*[;$]")
+
+# プリロード直後の状態を記録し、要求ごとにユーザー定義だけを消去する
+_SNAPSHOT_CODE = """nolabels : true$
+_mb_keep : cons('_mb_keep, cons('_mb_keepf, copylist(values)))$
+_mb_keepf : map(op, functions)$"""
+
+_RESET_CODE = """for _v in values do if not member(_v, _mb_keep) then apply(kill, [_v])$
+for _f in functions do if not member(op(_f), _mb_keepf) then apply(kill, [op(_f)])$"""
+
+
+class MaximaError(RuntimeError):
+    """Maximaワーカーが異常終了した場合の例外。"""
+
+
+class MaximaTimeout(MaximaError):
+    """Maximaワーカーが制限時間内に応答しなかった場合の例外。"""
+
+
+def strip_quit(code):
+    """Maximaコードから quit(); / quit()$ を取り除く。"""
+    return _QUIT_RE.sub("", code)
+
+
+def _lisp_string(path):
+    return '"' + path.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class MaximaWorker:
+    """
+    標準入出力で対話する常駐Maximaプロセス1つ分。
+
+    Args:
+        preload (tuple): 起動時に load() しておくパッケージ名。
+        command (str): Maximaの実行ファイル名。
+        startup_timeout (float): 起動とプリロードの待ち時間 [s]。
+    """
+
+    def __init__(self, preload=DEFAULT_PRELOAD, command=MAXIMA_COMMAND, startup_timeout=60.0):
+        self.preload = tuple(preload)
+        self.command = command
+        self.startup_timeout = startup_timeout
+        self.proc = None
+        self._lines = None
+        self._seq = 0
+
+    def start(self):
+        """プロセスを起動し、パッケージをプリロードする。"""
+        # Maximaが無い場合は FileNotFoundError をそのまま呼び出し元へ返す
+        self.proc = subprocess.Popen(
+            [self.command, "--very-quiet"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace", bufsize=1,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self.proc.stdout, self._lines), daemon=True).start()
+
+        setup = "".join(f'load("{pkg}")$\n' for pkg in self.preload) + _SNAPSHOT_CODE
+        self._request(setup, self.startup_timeout)
+
+    @staticmethod
+    def _pump(stream, lines):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)  # EOF
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def close(self):
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.write("quit()$\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+        self.proc = None
+
+    def restart(self):
+        self.close()
+        self.start()
+
+    def _request(self, code, timeout):
+        self._seq += 1
+        tag = f"{_SENTINEL}{self._seq}"
+        payload = code.rstrip()
+        if payload and payload[-1] not in ";$":
+            payload += "$"
+        try:
+            self.proc.stdin.write(f'{payload}\nprint("{tag}")$ ?finish\\-output()$\n')
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise MaximaError(f"Maximaへの送信に失敗しました: {e}") from e
+
+        out = []
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                self.proc.kill()
+                self.proc.wait()
+                raise MaximaTimeout(f"Maximaが {timeout} 秒以内に応答しませんでした")
+            if line is None:
+                self.proc.wait()
+                raise MaximaError(f"Maximaプロセスが終了しました (code={self.proc.returncode})")
+            if tag in line:
+                head = line.split(tag)[0]
+                if head.strip():
+                    out.append(head)
+                return "".join(out)
+            out.append(line)
+
+    def run(self, code, cwd=None, timeout=60.0, reset=True):
+        """
+        Maximaコードを実行し、標準出力を文字列で返す。
+
+        Args:
+            code (str): 実行するMaximaコード。
+            cwd (str): openw() などの相対パスの基準ディレクトリ（既定は現在のディレクトリ）。
+            timeout (float): 応答待ちの上限 [s]。
+            reset (bool): 実行前に前回の要求で定義された変数・関数を消去するか。
+        """
+        cwd = os.path.abspath(cwd or os.getcwd())
+        prefix = ":lisp (setf *default-pathname-defaults* (pathname {}))\n".format(
+            _lisp_string(os.path.join(cwd, "")))
+        if reset:
+            prefix += _RESET_CODE + "\n"
+        return self._request(prefix + strip_quit(code), timeout)
+
+    def ping(self, timeout=5.0):
+        """ヘルスチェック: 空の要求に応答が返るか確認する。"""
+        if not self.alive():
+            return False
+        try:
+            self._request("", timeout)
+            return True
+        except MaximaError:
+            return False
+
+
+class MaximaPool:
+    """
+    常駐Maximaワーカーのプール。ワーカーは必要になった時点で最大 size 個まで起動する。
+
+    Args:
+        size (int): ワーカー数の上限（既定は環境変数 MAXIMA_POOL_SIZE、無ければCPU数）。
+        preload (tuple): 各ワーカーで起動時に load() するパッケージ。
+        command (str): Maximaの実行ファイル名。
+    """
+
+    def __init__(self, size=None, preload=DEFAULT_PRELOAD, command=MAXIMA_COMMAND):
+        self.size = size or int(os.environ.get("MAXIMA_POOL_SIZE", os.cpu_count() or 1))
+        self.preload = tuple(preload)
+        self.command = command
+        self._idle = queue.LifoQueue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = MaximaWorker(self.preload, self.command)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def _release(self, worker):
+        self._idle.put(worker)
+
+    def run(self, code, cwd=None, timeout=60.0, reset=True, retries=1):
+        """
+        空いているワーカーでMaximaコードを実行する。
+        ワーカーが落ちていれば再起動し、実行中に異常終了した場合は retries 回まで再試行する。
+        """
+        worker = self._acquire()
+        try:
+            for attempt in range(retries + 1):
+                if not worker.alive():
+                    worker.restart()
+                try:
+                    return worker.run(code, cwd=cwd, timeout=timeout, reset=reset)
+                except MaximaTimeout:
+                    # タイムアウトは再試行しない（同じ要求で再び詰まるだけなので）
+                    worker.close()
+                    raise
+                except MaximaError:
+                    if attempt == retries:
+                        worker.close()
+                        raise
+        finally:
+            self._release(worker)
+
+    def run_file(self, path, cwd=None, **kwargs):
+        """.mac ファイルを読み込んで実行する。相対パスは cwd を基準に解決する。"""
+        cwd = cwd or os.getcwd()
+        with open(os.path.join(cwd, path), "r", encoding="utf-8") as f:
+            code = f.read()
+        return self.run(code, cwd=cwd, **kwargs)
+
+    def health_check(self, timeout=5.0):
+        """
+        待機中のワーカーに ping を送り、応答しないものを再起動する。
+
+        Returns:
+            int: 正常に応答したワーカー数。
+        """
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        healthy = 0
+        for worker in idle:
+            if worker.ping(timeout):
+                healthy += 1
+            else:
+                try:
+                    worker.restart()
+                    healthy += 1
+                except (MaximaError, OSError):
+                    worker.close()
+            self._release(worker)
+        return healthy
+
+    def close(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers = []
+        self._idle = queue.LifoQueue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_POOL = None
+_POOL_PID = None
+
+
+def get_pool():
+    """プロセス共通のプールを返す（初回呼び出し時に生成）。"""
+    global _POOL, _POOL_PID
+    # fork された子プロセスでは親のワーカー（パイプ）を共有しないよう、新しいプールを作る
+    if _POOL is None or _POOL_PID != os.getpid():
+        _POOL = MaximaPool()
+        _POOL_PID = os.getpid()
+        atexit.register(_POOL.close)
+    return _POOL
+
+
+def run(code, **kwargs):
+    return get_pool().run(code, **kwargs)
+
+
+def run_file(path, **kwargs):
+    return get_pool().run_file(path, **kwargs)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:48:02 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/pycodegen.py
+#
+# py_convert の出力（Maximaの string() を np./math. 形式へ置換したもの）から、
+# 呼び出しあたりのコストが小さい NumPy 関数を生成するバックエンド。
+#
+#   - 引数に依存しない部分式（np.cos((13*np.pi)/36) など）はモジュール読み込み時に1回だけ計算する
+#   - 関数内の共通部分式（np.sin(epsilon), np.cos(omega)**2 など）は一時変数にまとめる
+#   - 戻り値に使われないローカル変数（未使用の Q_orb など）は出力しない
+#   - numexpr がインストールされていれば、同じ計算を numexpr で行う <関数名>_ne も生成する
+#
+# codecache.load_generated(..., postprocess=optimize_source, extra=BACKEND_VERSION) として使う。
+
+import ast
+
+import sympy as sp
+from sympy.printing.numpy import SciPyPrinter
+from sympy.printing.str import StrPrinter
+
+from .mexpr import to_sympy
+
+BACKEND_VERSION = "pycodegen-1"
+
+
+class _NumPyPrinter(SciPyPrinter):
+    """numpy.xxx を np.xxx と書き、特殊関数だけ scipy.special を使うプリンタ。"""
+
+    def _print_Pi(self, expr):
+        return "np.pi"
+
+    def _print_Exp1(self, expr):
+        return "np.e"
+
+    def doprint(self, expr, assign_to=None):
+        return super().doprint(expr, assign_to).replace("numpy.", "np.")
+
+
+class _NumExprPrinter(StrPrinter):
+    """numexpr.evaluate に渡す式文字列のプリンタ（対応外の関数があれば ValueError）。"""
+
+    _functions = {"sin": "sin", "cos": "cos", "tan": "tan", "asin": "arcsin", "acos": "arccos",
+                  "atan": "arctan", "sinh": "sinh", "cosh": "cosh", "tanh": "tanh",
+                  "exp": "exp", "log": "log", "sqrt": "sqrt", "Abs": "abs"}
+
+    def _print_Function(self, expr):
+        name = self._functions.get(type(expr).__name__)
+        if name is None:
+            raise ValueError(f"numexpr 非対応の関数: {type(expr).__name__}")
+        return f"{name}({', '.join(self._print(a) for a in expr.args)})"
+
+    _print_Abs = _print_Function
+
+    def _print_Rational(self, expr):
+        return repr(float(expr))
+
+    def _print_Pi(self, expr):
+        raise ValueError("定数はモジュール側に巻き上げ済みのはず")
+
+
+class _Function:
+    def __init__(self, name, args, expr):
+        self.name = name
+        self.args = args
+        self.expr = expr
+
+
+def _parse_module(source):
+    """生成モジュールから (関数名, 引数, 戻り値の式) を取り出す。対応外の構造なら None。"""
+    functions = []
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            continue
+        if not isinstance(node, ast.FunctionDef) or node.args.defaults or node.args.vararg \
+                or node.args.kwonlyargs or node.args.kwarg:
+            return None
+        names = [a.arg for a in node.args.args]
+        symbols = {n: sp.Symbol(n, real=True) for n in names}
+        env = dict(symbols)
+        result = None
+        for stmt in node.body:
+            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 \
+                    and isinstance(stmt.targets[0], ast.Name):
+                env[stmt.targets[0].id] = to_sympy(ast.unparse(stmt.value), env)
+            elif isinstance(stmt, ast.Return) and stmt.value is not None:
+                result = to_sympy(ast.unparse(stmt.value), env)
+                break
+            elif isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+                continue  # docstring
+            else:
+                return None
+        if result is None:
+            return None
+        functions.append(_Function(node.name, [symbols[n] for n in names], result))
+    return functions
+
+
+class _Hoister:
+    """引数に依存しない部分式をモジュールレベルの定数 _c0, _c1, ... に置き換える。"""
+
+    def __init__(self):
+        self.constants = {}  # 式 → シンボル
+        self.order = []
+
+    def _constant(self, expr):
+        if expr not in self.constants:
+            sym = sp.Symbol(f"_c{len(self.order)}")
+            self.constants[expr] = sym
+            self.order.append((sym, expr))
+        return self.constants[expr]
+
+    def __call__(self, expr, args):
+        if expr.is_Atom:
+            return expr
+        if not (expr.free_symbols & args):
+            return self._constant(expr)
+        if expr.is_Add or expr.is_Mul:
+            const, rest = expr.as_independent(*args, as_Add=expr.is_Add)
+            terms = (sp.Add if expr.is_Add else sp.Mul).make_args(rest)
+            rest = expr.func(*[self(t, args) for t in terms])
+            if const.is_Number:
+                return expr.func(const, rest)
+            return expr.func(self._constant(const), rest)
+        if expr.is_Pow and not (expr.exp.free_symbols & args):
+            # x**2 などの指数はそのまま残す
+            return sp.Pow(self(expr.base, args), expr.exp, evaluate=False)
+        return expr.func(*[self(a, args) for a in expr.args])
+
+
+def optimize_source(source):
+    """
+    Maximaが生成したPythonモジュールのソースを、CSE・定数巻き上げ済みのソースに書き換える。
+    解析できない構造のモジュールはそのまま返す。
+    """
+    functions = _parse_module(source)
+    if not functions:
+        return source
+
+    hoist = _Hoister()
+    bodies = []
+    for fn in functions:
+        expr = hoist(fn.expr, set(fn.args))
+        temps, (reduced,) = sp.cse([expr], symbols=sp.numbered_symbols("_t"), order="none")
+        bodies.append((fn, temps, reduced))
+
+    np_printer = _NumPyPrinter()
+    ne_printer = _NumExprPrinter()
+    lines = [
+        "# Generated by maxima_bridge.pycodegen from Maxima py_convert output.",
+        "import numpy as np",
+    ]
+    consts = [(sym, np_printer.doprint(expr)) for sym, expr in hoist.order]
+    if any("scipy." in code for _, code in consts) or \
+            any("scipy." in np_printer.doprint(e) for _, t, r in bodies for e in [r] + [x for _, x in t]):
+        lines.append("import scipy.special")
+    lines += [
+        "",
+        "try:",
+        "    import numexpr as ne",
+        "except ImportError:",
+        "    ne = None",
+        "",
+        "# 引数に依存しない定数（読み込み時に1回だけ計算）",
+    ]
+    lines += [f"{sym} = {code}" for sym, code in consts]
+
+    ne_fallbacks = []
+    for fn, temps, reduced in bodies:
+        signature = ", ".join(str(a) for a in fn.args)
+        lines += ["", "", f"def {fn.name}({signature}):"]
+        lines += [f"    {sym} = {np_printer.doprint(expr)}" for sym, expr in temps]
+        lines.append(f"    return {np_printer.doprint(reduced)}")
+
+        try:
+            ne_body = [f'    {sym} = ne.evaluate("{ne_printer.doprint(expr)}")' for sym, expr in temps]
+            ne_body.append(f'    return ne.evaluate("{ne_printer.doprint(reduced)}")')
+        except ValueError:
+            continue
+        lines += ["", "", f"def {fn.name}_ne({signature}):"]
+        lines += ne_body
+        ne_fallbacks.append(fn.name)
+
+    if ne_fallbacks:
+        lines += ["", "", "if ne is None:"]
+        lines += [f"    {name}_ne = {name}" for name in ne_fallbacks]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 10:05:37 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/sandbox.py
+#
+# Maximaと連成するジョブごとの作業ディレクトリ。
+# austerity.mac は bridge.dat、reform.mac は reform_results.csv をカレントディレクトリに
+# 固定名で書き出すため、同じスクリプトを2つ同時に走らせると互いの出力を上書きしてしまう。
+# ここではジョブごとに一意な一時ディレクトリを作り、そこを Maxima の作業ディレクトリにして
+# .mac を実行し、出力ファイルの内容を文字列として回収してからディレクトリを消す。
+
+import contextlib
+import os
+import shutil
+import tempfile
+
+from . import pool as _pool
+
+
+def define_params(params):
+    """パラメータを Maxima の定義文 `name : value$` の並びにする。"""
+    return "".join(f"{name} : {value}$\n" for name, value in (params or {}).items())
+
+
+@contextlib.contextmanager
+def job_dir(prefix="mxjob_", base=None, keep=False):
+    """
+    ジョブ専用の一時ディレクトリを作り、そのパスを返すコンテキストマネージャ。
+
+    Args:
+        prefix (str): ディレクトリ名の接頭辞（プロセスIDを付けて一意にする）。
+        base (str): 作成先（既定はシステムの一時ディレクトリ）。
+        keep (bool): True なら終了後も削除しない（デバッグ用）。
+    """
+    path = tempfile.mkdtemp(prefix=f"{prefix}{os.getpid()}_", dir=base)
+    try:
+        yield path
+    finally:
+        if not keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def run_mac(mac_path, outputs, params=None, pool=None, timeout=300.0, keep=False):
+    """
+    .mac をジョブ専用ディレクトリで実行し、出力ファイルの内容を返す。
+
+    Args:
+        mac_path (str): 実行する .mac ファイル。
+        outputs (sequence): .mac が書き出すファイル名（作業ディレクトリからの相対パス）。
+        params (dict): .mac の前に定義する Maxima 変数。
+        pool (MaximaPool): 使用するプール（既定は共通プール）。
+        timeout (float): 応答待ちの上限 [s]。
+        keep (bool): True なら作業ディレクトリを残す。
+
+    Returns:
+        dict: ファイル名 → 内容 (str)。
+    """
+    with open(mac_path, "r", encoding="utf-8") as f:
+        code = f.read()
+    pool = pool or _pool.get_pool()
+    with job_dir(prefix=os.path.splitext(os.path.basename(mac_path))[0] + "_", keep=keep) as wd:
+        log = pool.run(define_params(params) + code, cwd=wd, timeout=timeout)
+        results = {}
+        for name in outputs:
+            path = os.path.join(wd, name)
+            if not os.path.exists(path):
+                raise _pool.MaximaError(f"{os.path.basename(mac_path)} が {name} を出力しませんでした\n{log}")
+            with open(path, "r", encoding="utf-8") as f:
+                results[name] = f.read()
+    return results
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 10:41:12 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/sweep.py
+#
+# Maximaと連成するジョブをプロセスプールで並列に実行するドライバ。
+# 各ジョブは sandbox.run_mac / binio.map_arrays で自分専用の作業ディレクトリを使うので、
+# 同じスクリプトの計算を何十本同時に走らせても出力ファイルが衝突しない。
+# Maximaワーカーは子プロセスごとに pool_size 個だけ起動する（CPU の取り合いを避けるため）。
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _init_worker(pool_size):
+    # get_pool() は子プロセスで初めて呼ばれた時点でこの値を読む
+    os.environ["MAXIMA_POOL_SIZE"] = str(pool_size)
+
+
+def _call(fn, kwargs):
+    return fn(**kwargs)
+
+
+def run_jobs(fn, jobs, processes=None, pool_size=1):
+    """
+    fn(**job) を各ジョブについてプロセス並列で実行し、結果を jobs の順に返す。
+
+    Args:
+        fn (callable): モジュールレベルで定義された（pickle 可能な）関数。
+        jobs (sequence): fn に渡すキーワード引数の辞書の並び。
+        processes (int): プロセス数（既定は CPU 数とジョブ数の小さい方）。
+        pool_size (int): 子プロセスごとの Maxima ワーカー数。
+
+    Returns:
+        list: 各ジョブの戻り値。
+    """
+    jobs = list(jobs)
+    processes = processes or min(len(jobs), os.cpu_count() or 1)
+    if processes <= 1:
+        return [fn(**job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(pool_size,)) as ex:
+        return list(ex.map(_call, [fn] * len(jobs), jobs))
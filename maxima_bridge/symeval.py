@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:15:44 2026
+
+@author: iwamura
+"""
+
+# maxima_bridge/symeval.py
+#
+# Maximaを使わずにプロセス内で式を評価するための共通エバリュエータ。
+# .mac スクリプトと同じ定義文（`C(x,t) := ...;` や `K_x: ...;`）をそのまま受け取り、
+# SymPy で一度だけ NumPy 関数へ変換してキャッシュする。
+# erf 拡散・ポアズイユ漏れ・SIMP 補間・d=(T-R)/(T-P) のような単純な閉形式なら、
+# サブプロセスも一時ファイルも使わずに配列のまま評価できる。
+
+import functools
+import re
+from tokenize import TokenError
+
+import sympy as sp
+from sympy.core.function import AppliedUndef
+from sympy.logic.boolalg import Boolean
+
+from .mexpr import to_sympy
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_FUNCTION_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*\(([^()]*)\)\s*:=\s*(.+)$", re.DOTALL)
+_VALUE_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*:(?!=)\s*(.+)$", re.DOTALL)
+
+
+def _statements(code):
+    """コメントを除き、文字列の外にある ; / $ で文を区切る。"""
+    code = _COMMENT_RE.sub(" ", code)
+    current, in_string = [], False
+    for ch in code:
+        if ch == '"':
+            in_string = not in_string
+        if ch in ";$" and not in_string:
+            yield "".join(current).strip()
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        yield "".join(current).strip()
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(expr, args):
+    """式を NumPy 関数へ変換する（同じ式・引数の組は1回だけ）。"""
+    symbols = [sp.Symbol(a, real=True) for a in args]
+    try:
+        return sp.lambdify(symbols, expr, modules=["scipy", "numpy"])
+    except ImportError:
+        return sp.lambdify(symbols, expr, modules=["numpy", "math"])
+
+
+class SymbolicEvaluator:
+    """
+    Maximaの定義文を読み込み、プロセス内で評価するエバリュエータ。
+
+    `name(args) := 式` は関数、`name: 式` は値として登録する。
+    値は遅延評価で、evaluate() のキーワード引数で任意の変数を上書きできる。
+    関数の仮引数を省略した場合は、同名の値が定義されていればそれを使う。
+    解釈できない文（print, if, ループなど）は読み飛ばす。
+
+    Args:
+        code (str): Maximaコード（.mac の内容や maxima_code 文字列）。
+    """
+
+    def __init__(self, code=""):
+        self.functions = {}  # 名前 → (引数名のタプル, 式)
+        self.values = {}     # 名前 → 式
+        if code:
+            self.define(code)
+
+    @classmethod
+    def from_mac(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f.read())
+
+    def define(self, code):
+        """Maximaコード中の関数定義・値定義を登録する。"""
+        for stmt in _statements(code):
+            m = _FUNCTION_RE.match(stmt)
+            if m:
+                name, params, body = m.groups()
+                params = tuple(p.strip() for p in params.split(",") if p.strip())
+                expr = self._parse(body)
+                if expr is not None:
+                    self.functions[name] = (params, expr)
+                continue
+            m = _VALUE_RE.match(stmt)
+            if m:
+                name, body = m.groups()
+                expr = self._parse(body)
+                if expr is None:
+                    continue
+                # x: x + 1 のような自己参照は直前の値で即時に置き換える
+                sym = sp.Symbol(name, real=True)
+                if sym in expr.free_symbols and name in self.values:
+                    expr = expr.xreplace({sym: self.values[name]})
+                self.values[name] = expr
+        return self
+
+    def _parse(self, text):
+        calls = {name: sp.Function(name) for name in self.functions}
+        try:
+            expr = to_sympy(text, calls)
+        except (sp.SympifyError, SyntaxError, TypeError, AttributeError, TokenError):
+            return None
+        return expr if isinstance(expr, sp.Basic) and not isinstance(expr, Boolean) else None
+
+    def _expand_calls(self, expr):
+        """登録済み関数の呼び出しを本体で置き換える。"""
+        for _ in range(32):
+            calls = [c for c in expr.atoms(AppliedUndef) if c.func.__name__ in self.functions]
+            if not calls:
+                return expr
+            subs = {}
+            for call in calls:
+                params, body = self.functions[call.func.__name__]
+                subs[call] = body.xreplace({sp.Symbol(p, real=True): a for p, a in zip(params, call.args)})
+            expr = expr.xreplace(subs)
+        raise RecursionError("関数呼び出しの展開が深すぎます")
+
+    def _resolve(self, expr, keep):
+        """keep に含まれない変数を、登録済みの値で置き換える。"""
+        for _ in range(64):
+            expr = self._expand_calls(expr)
+            subs = {s: self.values[s.name] for s in expr.free_symbols
+                    if s.name in self.values and s.name not in keep}
+            if not subs:
+                return expr
+            expr = expr.xreplace(subs)
+        raise RecursionError(f"値の参照が循環しています: {expr}")
+
+    def expression(self, name, keep=()):
+        """名前に対応する SymPy 式（関数なら本体）を、keep 以外の値を代入した形で返す。"""
+        if name in self.functions:
+            params, body = self.functions[name]
+            # 省略された仮引数は、同名の値が定義されていればそれを使う
+            return self._resolve(body, set(keep) | {p for p in params if p not in self.values})
+        if name in self.values:
+            return self._resolve(self.values[name], set(keep))
+        raise KeyError(f"未定義の名前: {name}")
+
+    def function(self, name, args=None):
+        """
+        名前に対応する NumPy 関数を返す。
+
+        Args:
+            name (str): 関数名または値の名前。
+            args (sequence): 呼び出し時の引数名（既定は関数の仮引数）。
+        """
+        if args is None:
+            args = self.functions[name][0] if name in self.functions else ()
+        args = tuple(args)
+        expr = self.expression(name, keep=args)
+        missing = {s.name for s in expr.free_symbols} - set(args)
+        if missing:
+            raise ValueError(f"{name} の評価に必要な値が未定義です: {sorted(missing)}")
+        return _compile(expr, args)
+
+    def evaluate(self, name, **values):
+        """
+        名前に対応する式を評価する。キーワード引数で変数を与える（配列可）。
+
+        例: ev.evaluate("C", x=x_vals, t=t_year)、ev.evaluate("K_x", x=np.linspace(0, 1, 100))
+        """
+        args = tuple(sorted(values))
+        return self.function(name, args)(*(values[a] for a in args))
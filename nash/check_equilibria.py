@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:40:15 2026
+
+@author: iwamura
+"""
+
+# nash/check_equilibria.py
+#
+# equilibria.py の回帰確認。利得を正の定数倍・定数ずらししても均衡は変わらないので、
+# 乱数ゲームの利得を 1e-6〜1e6 倍しても、見つかる均衡の集合が変わらないことを確かめる
+# （連立方程式の特異判定を行列式の絶対値で行い、利得が小さいと均衡を取りこぼしていた不具合）。
+# 乱数ゲームは非退化なので、サポート列挙で見つかる均衡の数は奇数になることも確かめる。
+# python -O でも外れないよう、assert ではなく例外で失敗を知らせる。
+#
+# 使い方: python check_equilibria.py [ゲーム数]
+
+import sys
+
+import numpy as np
+
+from equilibria import equilibria, pure_equilibria
+
+SCALES = (1e-6, 1e-3, 1e3, 1e6)
+SHIFT = -7.5
+
+
+def _check(ok, message):
+    if not ok:
+        raise AssertionError(message)
+
+
+def _profiles(profiles):
+    return np.array([np.concatenate([x, y]) for x, y in profiles])
+
+
+def _same_profiles(P, Q, atol=1e-7):
+    """均衡の集合が（順序によらず）一致するか"""
+    if P.shape != Q.shape:
+        return False
+    return bool((np.abs(P[:, None] - Q[None]).max(2) < atol).any(1).all())
+
+
+def check_scale_invariance(games=100, max_size=7, seed=0):
+    """N, M ≤ max_size の乱数ゲームで、利得の拡大縮小とずらしに対して均衡の集合が変わらないことを確かめる。"""
+    rng = np.random.default_rng(seed)
+    counts = []
+    for g in range(games):
+        N, M = rng.integers(2, max_size + 1, size=2)
+        A, B = rng.random((2, N, M))
+        base = _profiles(equilibria(A, B, "support"))
+        _check(len(base) % 2 == 1, f"ゲーム {g}（{N}x{M}）: 均衡の数 {len(base)} が奇数ではありません")
+        pure = pure_equilibria(A, B)
+        for s in SCALES:
+            found = _profiles(equilibria(A * s + SHIFT, B * s + SHIFT, "support"))
+            _check(_same_profiles(found, base),
+                   f"ゲーム {g}（{N}x{M}）: 利得を {s:g} 倍すると均衡の集合が変わります"
+                   f"（{len(base)} 個 → {len(found)} 個）")
+            _check(pure_equilibria(A * s + SHIFT, B * s + SHIFT) == pure,
+                   f"ゲーム {g}（{N}x{M}）: 利得を {s:g} 倍すると純粋戦略の均衡が変わります")
+        counts.append(len(base))
+    print(f"{games} ゲーム（最大 {max_size}x{max_size}）: 利得を {SCALES} 倍しても均衡は不変"
+          f"（均衡の数 平均 {np.mean(counts):.2f}、最大 {max(counts)}）")
+
+
+if __name__ == "__main__":
+    check_scale_invariance(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
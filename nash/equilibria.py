@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov  2 10:07:33 2026
+
+@author: iwamura
+"""
+
+# nash/equilibria.py
+#
+# 任意の N×M 双行列ゲームのナッシュ均衡を求めるソルバー。
+# game.py / game1.py は 2x2 の囚人のジレンマを前提に (C,C)...(D,D) のラベルを決め打ちし、
+# 利得を足し合わせるだけだった。ここでは game_data.txt 形式（Maxima のリスト
+# [[[a11, b11], [a12, b12], ...], ...]）の利得行列を読み、
+#   - 小さなゲーム: サポート列挙で全ての均衡（サポートの組ごとの連立方程式を一括で解く）
+#   - 大きなゲーム: Lemke-Howson 法（落とすラベルを変えて複数の均衡を探す）
+# で均衡を求める。純粋戦略の均衡は最適反応のマスクから直接求める。
+
+import itertools
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from maxima_bridge import mparse
+
+TOL = 1e-9
+SUPPORT_LIMIT = 2_000_000  # サポート列挙で調べるサポートの組の上限（超えれば Lemke-Howson）
+_BATCH = 1 << 14           # 一度に解く連立方程式の数
+
+
+def load_game(path):
+    """
+    game_data.txt 形式のファイルから利得行列を読む。
+
+    Returns:
+        tuple: (A, B)。A[i, j] は行プレイヤー、B[i, j] は列プレイヤーの利得（形状 (N, M)）。
+    """
+    data = np.asarray(mparse.load(path.strip()), dtype=float)
+    if data.ndim != 3 or data.shape[2] != 2:
+        raise ValueError(f"{path} は N×M×2 の利得行列ではありません（形状 {data.shape}）")
+    return data[..., 0], data[..., 1]
+
+
+def strategy_labels(n):
+    """戦略名（2戦略なら協調 C / 裏切り D、それ以外は S1, S2, ...）"""
+    return ["C", "D"] if n == 2 else [f"S{i + 1}" for i in range(n)]
+
+
+def _normalize(M):
+    """
+    利得を [0, 1] に写す（正のアフィン変換なので均衡は変わらない）。
+    許容誤差 TOL などを利得の大きさによらない相対的な値として使うため、解く前にそろえる。
+    """
+    M = np.asarray(M, dtype=float)
+    span = M.max() - M.min()
+    return (M - M.min()) / (span if span > 0 else 1.0)
+
+
+def pure_equilibria(A, B):
+    """純粋戦略のナッシュ均衡 (i, j) の一覧（互いに最適反応になっているセル）"""
+    A, B = _normalize(A), _normalize(B)
+    best_row = A >= A.max(axis=0, keepdims=True) - TOL
+    best_col = B >= B.max(axis=1, keepdims=True) - TOL
+    return [tuple(map(int, ij)) for ij in np.argwhere(best_row & best_col)]
+
+
+def is_equilibrium(A, B, x, y, tol=1e-7):
+    """混合戦略の組 (x, y) がナッシュ均衡か（どの純粋戦略に逸脱しても得をしないか）"""
+    return bool((A @ y).max() <= x @ A @ y + tol and (x @ B).max() <= x @ B @ y + tol)
+
+
+def _indifference(M, k):
+    """
+    各行列 M[s]（k×k）に対し、M[s] p = v 1, sum(p) = 1 を満たす p の解を一括で求める。
+    特異な組は NaN を返す。行列式は利得の k 乗に比例するので、その絶対値では判定しない。
+    """
+    n = len(M)
+    K = np.zeros((n, k + 1, k + 1))
+    K[:, :k, :k] = M
+    K[:, :k, k] = -1.0
+    K[:, k, :k] = 1.0
+    rhs = np.zeros((n, k + 1))
+    rhs[:, k] = 1.0
+    out = np.full((n, k + 1), np.nan)
+    # |det K| を各行のノルムの積（Hadamard の上界）で割った比で判定する。行ごとの大きさによらず、
+    # LU 分解の丸め誤差程度（(k+1) eps）以下なら特異とみなす
+    hadamard = np.prod(np.linalg.norm(K, axis=2), axis=1)
+    ok = np.abs(np.linalg.det(K)) > (k + 1) * np.finfo(float).eps * hadamard
+    if ok.any():
+        out[ok] = np.linalg.solve(K[ok], rhs[ok][..., None])[..., 0]
+    return out[:, :k]
+
+
+def support_enumeration(A, B):
+    """
+    サポート列挙で全てのナッシュ均衡を求める（非退化ゲームを前提に、両者のサポートの大きさは等しい）。
+    大きさ k のサポートの組は一括で連立方程式を解き、非負性と最適反応の条件をまとめて判定する。
+
+    Returns:
+        list: (x, y) の組の一覧。
+    """
+    A, B = _normalize(A), _normalize(B)
+    N, M = A.shape
+    found = []
+    for k in range(1, min(N, M) + 1):
+        rows = np.array(list(itertools.combinations(range(N), k)))
+        cols = np.array(list(itertools.combinations(range(M), k)))
+        pairs = np.array(list(itertools.product(range(len(rows)), range(len(cols)))))
+        for lo in range(0, len(pairs), _BATCH):
+            I = rows[pairs[lo:lo + _BATCH, 0]]
+            J = cols[pairs[lo:lo + _BATCH, 1]]
+            # 列プレイヤーを無差別にする x（B[I, J]^T x = u）と、行プレイヤーを無差別にする y
+            x_I = _indifference(np.swapaxes(B[I[:, :, None], J[:, None, :]], 1, 2), k)
+            y_J = _indifference(A[I[:, :, None], J[:, None, :]], k)
+            ok = np.isfinite(x_I).all(1) & np.isfinite(y_J).all(1)
+            ok &= (x_I > -TOL).all(1) & (y_J > -TOL).all(1)
+            if not ok.any():
+                continue
+            I, J, x_I, y_J = I[ok], J[ok], x_I[ok], y_J[ok]
+            n = len(I)
+            x = np.zeros((n, N))
+            y = np.zeros((n, M))
+            x[np.arange(n)[:, None], I] = np.clip(x_I, 0, None)
+            y[np.arange(n)[:, None], J] = np.clip(y_J, 0, None)
+            # 最適反応の条件：サポートの外の戦略の方が得になってはいけない
+            Ay = y @ A.T
+            xB = x @ B
+            v = np.einsum("si,si->s", x, Ay)
+            u = np.einsum("sj,sj->s", xB, y)
+            ok = (Ay.max(1) <= v + 1e-7) & (xB.max(1) <= u + 1e-7)
+            found.extend(zip(x[ok], y[ok]))
+    return found
+
+
+def _pivot(T, basis, enter):
+    """
+    変数 enter を基底に入れ、最小比テストで出る変数を返す（同順位は行の添字の小さい方）。
+    """
+    col = T[:, enter]
+    pos = col > TOL
+    if not pos.any():
+        raise RuntimeError("Lemke-Howson: 非有界な方向に入りました（利得行列を確認してください）")
+    ratios = np.where(pos, T[:, -1] / np.where(pos, col, 1.0), np.inf)
+    r = int(np.argmin(ratios))
+    T[r] /= T[r, enter]
+    others = np.arange(len(T)) != r
+    T[others] -= np.outer(T[others, enter], T[r])
+    leaving, basis[r] = basis[r], enter
+    return leaving
+
+
+def lemke_howson(A, B, dropped_label=0, max_pivots=None):
+    """
+    Lemke-Howson 法で均衡を1つ求める。
+
+    変数の添字をラベルと同じにとる（行戦略 i のラベルは i、列戦略 j のラベルは N + j）。
+        P: B^T x + s = 1（x_i のラベル i、s_j のラベル N + j）
+        Q: r + A y = 1  （r_i のラベル i、y_j のラベル N + j）
+
+    Args:
+        dropped_label (int): 最初に落とすラベル（0 ≤ label < N + M）。
+
+    Returns:
+        tuple: (x, y)。
+    """
+    N, M = A.shape
+    # 利得を [1, 2] に写しても均衡は変わらない
+    A = _normalize(A) + 1.0
+    B = _normalize(B) + 1.0
+    TP = np.hstack([B.T, np.eye(M), np.ones((M, 1))])
+    TQ = np.hstack([np.eye(N), A, np.ones((N, 1))])
+    basis_P = list(range(N, N + M))
+    basis_Q = list(range(N))
+    max_pivots = max_pivots or 50 * (N + M) ** 2
+
+    enter = dropped_label
+    in_P = dropped_label < N
+    for _ in range(max_pivots):
+        leaving = _pivot(TP, basis_P, enter) if in_P else _pivot(TQ, basis_Q, enter)
+        if leaving == dropped_label:
+            break
+        enter, in_P = leaving, not in_P
+    else:
+        raise RuntimeError(f"Lemke-Howson: {max_pivots} 回のピボットで収束しませんでした")
+
+    x = np.zeros(N)
+    y = np.zeros(M)
+    for r, var in enumerate(basis_P):
+        if var < N:
+            x[var] = TP[r, -1]
+    for r, var in enumerate(basis_Q):
+        if var >= N:
+            y[var - N] = TQ[r, -1]
+    return x / x.sum(), y / y.sum()
+
+
+def _unique(profiles, decimals=8):
+    seen, out = set(), []
+    for x, y in profiles:
+        key = tuple(np.round(np.concatenate([x, y]), decimals))
+        if key not in seen:
+            seen.add(key)
+            out.append((x, y))
+    return out
+
+
+def equilibria(A, B, method="auto"):
+    """
+    ナッシュ均衡を求める。
+
+    Args:
+        method (str): "support"（全ての均衡）、"lemke_howson"（落とすラベルを全て試して
+            見つかった均衡）、"auto"（サポートの組が SUPPORT_LIMIT 以下ならサポート列挙）。
+
+    Returns:
+        list: 重複を除いた (x, y) の組の一覧。
+    """
+    A, B = _normalize(A), _normalize(B)
+    if method == "auto":
+        N, M = A.shape
+        n_pairs = sum(math.comb(N, k) * math.comb(M, k) for k in range(1, min(N, M) + 1))
+        method = "support" if n_pairs <= SUPPORT_LIMIT else "lemke_howson"
+    if method == "support":
+        return _unique(support_enumeration(A, B))
+    if method == "lemke_howson":
+        found = []
+        for label in range(sum(A.shape)):
+            x, y = lemke_howson(A, B, label)
+            if is_equilibrium(A, B, x, y):
+                found.append((x, y))
+        return _unique(found)
+    raise ValueError(f"未知の方法: {method}")
+
+
+def describe(A, B, profiles, labels=None):
+    """均衡を「戦略: 確率」と各プレイヤーの期待利得の文字列にする。"""
+    rows = labels or strategy_labels(A.shape[0])
+    cols = labels or strategy_labels(A.shape[1])
+    lines = []
+    for x, y in profiles:
+        sx = ", ".join(f"{rows[i]}={p:.3f}" for i, p in enumerate(x) if p > TOL)
+        sy = ", ".join(f"{cols[j]}={p:.3f}" for j, p in enumerate(y) if p > TOL)
+        lines.append(f"A: [{sx}]  B: [{sy}]  利得 ({x @ A @ y:.3f}, {x @ B @ y:.3f})")
+    return lines
+
+
+def benchmark(n=100, games=5, seed=0):
+    """
+    n×n の乱数ゲームで Lemke-Howson を、8×8 の乱数ゲームでサポート列挙を計測する。
+
+    Returns:
+        dict: 1ゲームあたりの平均時間 [s] と、見つかった均衡の数。
+    """
+    rng = np.random.default_rng(seed)
+    t_lh, n_lh = 0.0, 0
+    for _ in range(games):
+        A, B = rng.random((2, n, n))
+        t = time.perf_counter()
+        x, y = lemke_howson(A, B, 0)
+        t_lh += time.perf_counter() - t
+        n_lh += is_equilibrium(A, B, x, y)
+    t_se, n_se = 0.0, 0
+    for _ in range(games):
+        A, B = rng.random((2, 8, 8))
+        t = time.perf_counter()
+        n_se += len(equilibria(A, B, "support"))
+        t_se += time.perf_counter() - t
+    return {"lemke_howson_s": t_lh / games, "lemke_howson_ok": n_lh,
+            "support_8x8_s": t_se / games, "support_8x8_equilibria": n_se / games}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+        r = benchmark(n)
+        print(f"{n}x{n} 乱数ゲーム Lemke-Howson: 平均 {r['lemke_howson_s'] * 1e3:.1f} ms"
+              f"（均衡の確認 {r['lemke_howson_ok']}/5）")
+        print(f"8x8 乱数ゲーム サポート列挙: 平均 {r['support_8x8_s'] * 1e3:.1f} ms"
+              f"（全均衡 平均 {r['support_8x8_equilibria']:.1f} 個）")
+    else:
+        path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                 "game_data.txt")
+        A, B = load_game(path)
+        print(f"{A.shape[0]}x{A.shape[1]} ゲーム: 純粋戦略の均衡 {pure_equilibria(A, B)}")
+        for line in describe(A, B, equilibria(A, B)):
+            print("  " + line)
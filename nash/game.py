@@ -9,33 +9,41 @@ Created on Wed Dec 24 11:23:55 2025
 import sys
 import matplotlib.pyplot as plt
 
+import equilibria
+
 def solve_and_plot(file_name):
-    # ファイルからデータをインポート
-    with open(file_name.strip(), 'r') as f:
-        data = eval(f.read().replace("{", "[").replace("}", "]"))
-    
+    # ファイルからデータをインポート（任意の N×M の利得行列）
+    A, B = equilibria.load_game(file_name)
+    rows = equilibria.strategy_labels(A.shape[0])
+    cols = equilibria.strategy_labels(A.shape[1])
+
+    # ナッシュ均衡（混合戦略を含む全ての均衡、または大きなゲームでは Lemke-Howson で見つかったもの）
+    print(f"{A.shape[0]}x{A.shape[1]} ゲームのナッシュ均衡:")
+    for line in equilibria.describe(A, B, equilibria.equilibria(A, B)):
+        print("  " + line)
+    pure = set(equilibria.pure_equilibria(A, B))
+
     # 戦略名と社会利得の計算
-    labels = ['(C,C)', '(C,D)', '(D,C)', '(D,D)']
-    utilities = []
-    
-    for row in data:
-        for cell in row:
-            utilities.append(sum(cell))
+    cells = [(i, j) for i in range(A.shape[0]) for j in range(A.shape[1])]
+    labels = [f"({rows[i]},{cols[j]})" for i, j in cells]
+    utilities = [A[i, j] + B[i, j] for i, j in cells]
     
-    # Matplotlibを用いた可視化
-    plt.figure(figsize=(8, 5))
-    colors = ['skyblue', 'orange', 'orange', 'salmon']
+    # Matplotlibを用いた可視化（純粋戦略のナッシュ均衡は赤で示す）
+    plt.figure(figsize=(max(8, 0.6 * len(cells)), 5))
+    colors = ['salmon' if ij in pure else 'skyblue' for ij in cells]
     bars = plt.bar(labels, utilities, color=colors)
     
-    plt.title("Social Total Utility by Strategy")
+    plt.title("Social Total Utility by Strategy (red: pure Nash equilibrium)")
     plt.xlabel("Strategy Combination (Player A, Player B)")
     plt.ylabel("Total Utility (Sum)")
     plt.axhline(0, color='black', linewidth=0.8)
+    if len(cells) > 16:
+        plt.xticks(rotation=90)
     
     # 数値をバーの上に表示
     for bar in bars:
         yval = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2, yval - 0.5, yval, ha='center', va='top')
+        plt.text(bar.get_x() + bar.get_width()/2, yval - 0.5, f"{yval:g}", ha='center', va='top')
 
     plt.tight_layout()
     plt.show()
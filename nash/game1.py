@@ -9,17 +9,27 @@ Created on Wed Dec 24 15:55:57 2025
 import sys
 import matplotlib.pyplot as plt
 
+import equilibria
+
 def solve_and_plot(file_name):
-    with open(file_name.strip(), 'r') as f:
-        # Maximaのリスト形式をPythonリストに変換
-        data = eval(f.read().replace("{", "[").replace("}", "]"))
-    
-    labels = ['(C,C)\nOptimal', '(C,D)', '(D,C)', '(D,D)\nNash Eq.']
-    p1_scores = [cell[0] for row in data for cell in row]
-    social_scores = [sum(cell) for row in data for cell in row]
+    # Maximaのリスト形式を利得行列に変換（N×M の各セルに両者の利得）
+    A, B = equilibria.load_game(file_name)
+    rows = equilibria.strategy_labels(A.shape[0])
+    cols = equilibria.strategy_labels(A.shape[1])
+    cells = [(i, j) for i in range(A.shape[0]) for j in range(A.shape[1])]
+
+    # 社会的最適（総利得が最大のセル）と純粋戦略のナッシュ均衡をソルバーで判定する
+    p1_scores = [A[i, j] for i, j in cells]
+    social_scores = [A[i, j] + B[i, j] for i, j in cells]
+    best = max(social_scores)
+    pure = set(equilibria.pure_equilibria(A, B))
+    labels = []
+    for (i, j), social in zip(cells, social_scores):
+        tags = (["Optimal"] if social == best else []) + (["Nash Eq."] if (i, j) in pure else [])
+        labels.append("\n".join([f"({rows[i]},{cols[j]})"] + tags))
     
     x = range(len(labels))
-    fig, ax1 = plt.subplots(figsize=(10, 6))
+    fig, ax1 = plt.subplots(figsize=(max(10, 0.7 * len(labels)), 6))
 
     # 社会的総利得（棒グラフ）
     ax1.bar(x, social_scores, color='lightgray', label='Social Total Utility', alpha=0.5)
@@ -6,52 +6,178 @@ Created on Mon Dec 29 12:06:41 2025
 @author: iwamura
 """
 
-import subprocess
+import functools
 import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
-def get_maxima_results(R_val, T_list, P_list):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from maxima_bridge import binio, pool, sweep
+from maxima_bridge.symeval import SymbolicEvaluator
+
+# 境界線公式 d = (T-R)/(T-P)（Maximaとプロセス内評価で共通の定義）
+THRESHOLD_DEF = "d(t, p) := (t - R)/(t - p)"
+
+# 市場条件の抽出範囲（吊り上げ利得 T と報復後の利得 P）
+T_RANGE = (4.0, 10.0)
+P_RANGE = (-2.0, 2.0)
+
+def get_maxima_results(R_val, T_list, P_list, chunk_size=binio.DEFAULT_CHUNK):
     """Maximaを呼び出し、全サンプルの境界線dを計算させる"""
-    t_str = "[" + ",".join(map(str, T_list)) + "]"
-    p_str = "[" + ",".join(map(str, P_list)) + "]"
-    
-    script = f"""
-    R : {R_val};
-    T_list : {t_str};
-    P_list : {p_str};
-    /* 境界線公式 d = (T-R)/(T-P) を適用 */
-    d_list : map(lambda([t, p], float((t - R)/(t - p))), T_list, P_list);
-    
-    dest : openw("max_res.txt");
-    for x in d_list do (printf(dest, "~f ", x));
-    close(dest);
-    quit();
+    # サンプルは文字列に埋め込まず、バイナリの一時ファイルでチャンクごとに受け渡す
+    body = f"""
+    R : {R_val}$
+    {THRESHOLD_DEF}$
+    d_list : map(lambda([t, p], float(d(t, p))), T_list, P_list)$
     """
-    with open("process.mac", "w") as f: f.write(script)
-    
     try:
-        subprocess.run(["maxima", "--very-quiet", "-r", 'load("process.mac")$'], capture_output=True)
-        with open("max_res.txt", "r") as f:
-            return [float(x) for x in f.read().split()]
-    except:
-        return []
-
-# 1. パラメータ設定
-R = 3.0
-n_samples = 1000
-T_samples = np.random.uniform(4.0, 10.0, n_samples)
-P_samples = np.random.uniform(-2.0, 2.0, n_samples)
-
-# 2. 連成計算実行
-d_thresholds = get_maxima_results(R, T_samples, P_samples)
-
-if d_thresholds:
-    # 3. 中央値の市場を特定してシミュレーション
-    median_d = np.median(d_thresholds)
-    idx = (np.abs(np.array(d_thresholds) - median_d)).argmin()
-    T_mid, P_mid = T_samples[idx], P_samples[idx]
-    
+        return binio.map_arrays(body, {"T_list": T_list, "P_list": P_list}, "d_list",
+                                chunk_size=chunk_size)
+    except FileNotFoundError:
+        # Maximaが無い場合は、同じ定義をプロセス内で評価する
+        print("Maximaが見つからないため、プロセス内で境界線を計算します。")
+        ev = SymbolicEvaluator(f"R : {R_val}$ {THRESHOLD_DEF}$")
+        return ev.evaluate("d", t=np.asarray(T_list, dtype=float), p=np.asarray(P_list, dtype=float))
+    except (OSError, pool.MaximaError):
+        return np.array([])
+
+def sample_thresholds(R, n_samples=1000, seed=None):
+    """市場条件 (T, P) を一様に抽出し、各サンプルの境界線dを返す"""
+    rng = np.random.default_rng(seed)
+    T_samples = rng.uniform(*T_RANGE, n_samples)
+    P_samples = rng.uniform(*P_RANGE, n_samples)
+    return T_samples, P_samples, get_maxima_results(R, T_samples, P_samples)
+
+class ThresholdHistogram:
+    """
+    境界線 d の固定ビンのヒストグラム。標本を保持せずに足し込むので、何個足してもメモリは一定。
+    中央値などの分位点はビン内の線形補間で求める（誤差はビン幅以下）。
+    範囲外の標本は下側・上側の件数だけ数える。
+    """
+
+    def __init__(self, lo=0.0, hi=1.0, bins=1 << 16):
+        self.lo, self.hi = float(lo), float(hi)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.under = self.over = 0
+        self.total = 0.0  # 平均のための和
+
+    @property
+    def edges(self):
+        return np.linspace(self.lo, self.hi, len(self.counts) + 1)
+
+    @property
+    def n(self):
+        return int(self.counts.sum()) + self.under + self.over
+
+    def add(self, d):
+        d = d[np.isfinite(d)]
+        scale = len(self.counts) / (self.hi - self.lo)
+        idx = np.floor((d - self.lo) * scale).astype(np.int64)
+        below, above = idx < 0, idx >= len(self.counts)
+        self.under += int(below.sum())
+        self.over += int(above.sum())
+        self.counts += np.bincount(idx[~(below | above)], minlength=len(self.counts))
+        self.total += float(d.sum())
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.under += other.under
+        self.over += other.over
+        self.total += other.total
+        return self
+
+    def mean(self):
+        return self.total / self.n
+
+    def quantile(self, q):
+        """分位点（範囲外に落ちる分位点は lo / hi を返す）"""
+        cum = self.under + np.cumsum(self.counts)
+        target = q * self.n
+        i = int(np.searchsorted(cum, target))
+        if i >= len(self.counts):
+            return self.hi
+        prev = cum[i - 1] if i else self.under
+        if target <= prev:
+            return self.lo
+        width = (self.hi - self.lo) / len(self.counts)
+        return self.lo + width * (i + (target - prev) / self.counts[i])
+
+    def coarse(self, bins=40):
+        """描画用に、ビンをまとめた (counts, edges) を返す"""
+        cut = np.linspace(0, len(self.counts), bins + 1).round().astype(int)
+        return np.add.reduceat(self.counts, cut[:-1]), self.edges[cut]
+
+def monte_carlo_thresholds(R, n_samples=10**7, seed=None, chunk_size=1 << 20, bins=1 << 16):
+    """
+    Maximaを通さず、市場条件 (T, P) をチャンクごとに抽出して境界線dをNumPyで評価し、
+    ヒストグラムに足し込む（標本は残さない）。d は THRESHOLD_DEF と同じ定義から作る。
+
+    Returns:
+        ThresholdHistogram
+    """
+    rng = np.random.default_rng(seed)
+    d = SymbolicEvaluator(f"R : {R}$ {THRESHOLD_DEF}$").function("d")
+    hist = ThresholdHistogram(bins=bins)
+    for lo in range(0, n_samples, chunk_size):
+        n = min(chunk_size, n_samples - lo)
+        hist.add(d(rng.uniform(*T_RANGE, n), rng.uniform(*P_RANGE, n)))
+    return hist
+
+def monte_carlo_parallel(R, n_samples=10**8, seed=0, processes=None, **kw):
+    """monte_carlo_thresholds をプロセスごとに分けて実行し、ヒストグラムを合算する"""
+    processes = processes or os.cpu_count() or 1
+    sizes = [n_samples // processes + (i < n_samples % processes) for i in range(processes)]
+    seeds = np.random.SeedSequence(seed).spawn(processes)
+    jobs = [{"R": R, "n_samples": n, "seed": s, **kw} for n, s in zip(sizes, seeds) if n]
+    hists = sweep.run_jobs(monte_carlo_thresholds, jobs, processes=processes)
+    return functools.reduce(ThresholdHistogram.merge, hists)
+
+def median_market(R, median_d, n_candidates=10**5, seed=None):
+    """境界線dが中央値に最も近い市場条件 (T, P) を、新たに抽出した候補から選ぶ"""
+    rng = np.random.default_rng(seed)
+    T = rng.uniform(*T_RANGE, n_candidates)
+    P = rng.uniform(*P_RANGE, n_candidates)
+    idx = np.abs(SymbolicEvaluator(f"R : {R}$ {THRESHOLD_DEF}$").evaluate("d", t=T, p=P) - median_d).argmin()
+    return T[idx], P[idx]
+
+def sweep_thresholds(R_values, n_samples=1000, seed=0, processes=None):
+    """協調利得Rごとの境界線分布をプロセス並列で計算し、R → 中央値 の辞書を返す"""
+    jobs = [{"R": R, "n_samples": n_samples, "seed": seed + i} for i, R in enumerate(R_values)]
+    results = sweep.run_jobs(sample_thresholds, jobs, processes=processes)
+    return {R: float(np.median(d)) for R, (_, _, d) in zip(R_values, results) if len(d)}
+
+def main(argv=None):
+    """python rice.py（Maxima で 1,000 市場）／ python rice.py mc [標本数]（NumPy のモンテカルロ）"""
+    argv = sys.argv[1:] if argv is None else argv
+
+    # 1. パラメータ設定
+    R = 3.0
+    n_samples = 1000
+
+    if argv[:1] == ["mc"]:
+        # 2'. プロセス内モンテカルロ（標本は残さず、ヒストグラムと分位点だけを足し込む）
+        n_samples = int(float(argv[1])) if len(argv) > 1 else 10**7
+        hist = monte_carlo_parallel(R, n_samples)
+        median_d = hist.quantile(0.5)
+        T_mid, P_mid = median_market(R, median_d, seed=0)
+        counts, edges = hist.coarse(40)
+        source = "Monte Carlo"
+        print(f"{hist.n} 市場: 平均 d={hist.mean():.5f}, 四分位 "
+              f"{hist.quantile(0.25):.5f} / {median_d:.5f} / {hist.quantile(0.75):.5f}")
+    else:
+        # 2. 連成計算実行
+        T_samples, P_samples, d_thresholds = sample_thresholds(R, n_samples)
+        if not len(d_thresholds):
+            return
+
+        # 3. 中央値の市場を特定してシミュレーション
+        median_d = np.median(d_thresholds)
+        idx = (np.abs(d_thresholds - median_d)).argmin()
+        T_mid, P_mid = T_samples[idx], P_samples[idx]
+        counts, edges = np.histogram(d_thresholds, bins=40)
+        source = "Maxima"
+
     # 利得推移データ
     delta = 0.8 # 将来の重視度
     g_total, c_total = 0, 0
@@ -66,9 +192,9 @@ if d_thresholds:
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
 
     # ヒストグラム
-    ax1.hist(d_thresholds, bins=40, color='skyblue', edgecolor='black', alpha=0.7)
+    ax1.hist(edges[:-1], bins=edges, weights=counts, color='skyblue', edgecolor='black', alpha=0.7)
     ax1.axvline(median_d, color='red', linestyle='--', label=f'Median d={median_d:.3f}')
-    ax1.set_title("Distribution of Boomerang Thresholds (Maxima)")
+    ax1.set_title(f"Distribution of Boomerang Thresholds ({source}, n={n_samples:,})")
     ax1.set_xlabel("Required Discount Factor (d)")
     ax1.set_ylabel("Frequency")
     ax1.legend()
@@ -91,4 +217,7 @@ if d_thresholds:
     plt.tight_layout()
     plt.show()
 
-    print(f"解析完了: 中央値の市場条件 T={T_mid:.2f}, P={P_mid:.2f}, 閾値d={median_d:.4f}")
\ No newline at end of file
+    print(f"解析完了: 中央値の市場条件 T={T_mid:.2f}, P={P_mid:.2f}, 閾値d={median_d:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Nov  4 10:18:52 2026
+
+@author: iwamura
+"""
+
+# nash/spatial.py
+#
+# 格子上の進化ゲーム（空間囚人のジレンマ）。
+# game.py / equilibria.py は利得行列を静的に評価するだけで、協調が隣の市場へどう広がるかは見られない。
+# ここでは周期境界の格子の各セルが1つの戦略をとり、
+#   - 近傍との対戦の利得は、戦略ごとの指示関数と近傍の畳み込み（周期境界のシフト加算）で一括に求め、
+#   - 戦略の更新は「最良の近傍をまねる」「フェルミ則」「複製子（比例模倣）則」から選び、
+#   - 各世代の戦略の割合（協調率）を記録する。
+# 利得行列は game_data.txt（行プレイヤーの利得 A）をそのまま使う。格子は周期境界の縁をつけて持ち、
+# 近傍へのずれをコピーなしのビューで表す。作業領域は最初に確保するので、100 万セルの格子でも
+# 世代ごとの新たな確保はほとんどない。
+
+import os
+import sys
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+import equilibria
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+NEIGHBOURHOODS = {
+    "von_neumann": [(-1, 0), (1, 0), (0, -1), (0, 1)],
+    "moore": [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)],
+}
+RULES = ("imitate_best", "fermi", "replicator")
+
+
+def nowak_may(b):
+    """Nowak-May の弱い囚人のジレンマ（R=1, T=b, S=P=0）の利得行列"""
+    return np.array([[1.0, 0.0], [b, 0.0]])
+
+
+def fill_halo(Xp, r):
+    """
+    幅 r の縁をつけた配列 Xp の内部から、周期境界の縁（反対側の行・列）を埋める。
+    縁を一度埋めれば、近傍 (di, dj) へのずれは Xp のスライス（コピーなしのビュー）で表せる。
+    """
+    H, W = Xp.shape[0] - 2 * r, Xp.shape[1] - 2 * r
+    Xp[:r, r:r + W] = Xp[H:H + r, r:r + W]
+    Xp[H + r:, r:r + W] = Xp[r:2 * r, r:r + W]
+    # 列は縁の行も含めて写すので、四隅もここで埋まる
+    Xp[:, :r] = Xp[:, W:W + r]
+    Xp[:, W + r:] = Xp[:, r:2 * r]
+    return Xp
+
+
+def neighbour_view(Xp, r, di, dj):
+    """縁つきの配列 Xp から、各セルの近傍 (di, dj) の値を並べたビュー"""
+    H, W = Xp.shape[0] - 2 * r, Xp.shape[1] - 2 * r
+    return Xp[r + di:r + di + H, r + dj:r + dj + W]
+
+
+def _order_key(P, L, bits, out):
+    """
+    利得 P（float32）と戦略 L を、大小関係を保つ1つの整数 (P の順序ビット << 8) | L にまとめる。
+    負の浮動小数点数は符号以外のビットを反転すると、整数としての大小が値の大小と一致する。
+    """
+    raw = P.view(np.int32)
+    np.right_shift(raw, 31, out=bits)
+    bits &= 0x7fffffff
+    bits ^= raw
+    out[...] = bits
+    out <<= 8
+    out |= L
+    return out
+
+
+class SpatialGame:
+    """
+    周期境界の格子上の進化ゲーム。各セルは近傍の全セルと1回ずつ対戦し、利得の和で戦略を更新する。
+    戦略 0 を協調（C）とみなす（equilibria.strategy_labels と同じ並び）。
+
+    Args:
+        A (np.ndarray): 行プレイヤーの利得行列（k×k。対称ゲームとして、各セルが行プレイヤーの立場で使う）。
+        shape (tuple): 格子の形。
+        neighbourhood (str): "von_neumann"（4近傍）または "moore"（8近傍）。
+        rule (str): "imitate_best"（近傍と自分のうち利得最大の戦略をまねる）、
+            "fermi"（無作為な近傍の戦略を確率 1/(1+exp(-(Pj-Pi)/K)) でまねる）、
+            "replicator"（無作為な近傍の利得が高ければ、差に比例した確率でまねる）。
+        self_interaction (bool): 自分自身とも対戦する（Nowak-May の設定）。
+        K (float): フェルミ則の雑音の大きさ。
+        p_coop (float): 初期状態で協調するセルの割合（それ以外の戦略は等確率）。
+        seed (int): 乱数の種。
+        strategies (np.ndarray): 初期状態の戦略（省略すると p_coop で作る）。
+    """
+
+    def __init__(self, A, shape=(1000, 1000), neighbourhood="moore", rule="imitate_best",
+                 self_interaction=False, K=0.1, p_coop=0.5, seed=None, strategies=None):
+        A = np.asarray(A, dtype=np.float32)
+        if A.ndim != 2 or A.shape[0] != A.shape[1] or A.shape[0] > 127:
+            raise ValueError(f"空間ゲームには k×k（k ≤ 127）の利得行列が必要です（形状 {A.shape}）")
+        if rule not in RULES:
+            raise ValueError(f"未知の更新規則: {rule}（{', '.join(RULES)}）")
+        self.A, self.k, self.rule, self.K = A, A.shape[0], rule, K
+        self.offsets = list(NEIGHBOURHOODS[neighbourhood])
+        self.play_offsets = self.offsets + [(0, 0)] if self_interaction else self.offsets
+        self.r = r = max(max(abs(di), abs(dj)) for di, dj in self.offsets)
+        self.rng = np.random.default_rng(seed)
+
+        if strategies is None:
+            coop = self.rng.random(shape) < p_coop
+            others = self.rng.integers(1, self.k, shape) if self.k > 2 else 1
+            strategies = np.where(coop, 0, others)
+        H, W = shape
+        padded = (H + 2 * r, W + 2 * r)
+        # 戦略は縁つきの配列の内部に持つ（L はそのビュー）
+        self.Lp = np.zeros(padded, dtype=np.int8)
+        self.L = self.Lp[r:r + H, r:r + W]
+        self.L[...] = strategies
+        self.generation = 0
+
+        # 作業領域（ここで1回だけ確保する）
+        self.P = np.empty(shape, dtype=np.float32)
+        self.tmp = np.empty(shape, dtype=np.float32)
+        self.count = np.empty(shape, dtype=np.uint8)
+        self.seen = np.empty(shape, dtype=np.uint8)
+        self.ind = np.empty(padded, dtype=bool)
+        self.mask = np.empty(shape, dtype=bool)
+        if rule == "imitate_best":
+            self.bits = np.empty(shape, dtype=np.int32)
+            self.keyp = np.empty(padded, dtype=np.int64)
+            self.best = np.empty(shape, dtype=np.int64)
+        else:
+            self.Pp = np.empty(padded, dtype=np.float32)
+            self.Ln = np.empty(shape, dtype=np.int8)
+            # 縁つきの配列でのセル (i, j) の平坦な添字と、近傍ごとのずれ
+            rows = np.arange(r, r + H, dtype=np.int32)[:, None] * padded[1]
+            self.base = rows + np.arange(r, r + W, dtype=np.int32)[None, :]
+            self.jump = np.array([di * padded[1] + dj for di, dj in self.offsets], dtype=np.int32)
+        # 複製子則の規格化：1世代の利得差の最大値
+        self.phi = float(len(self.play_offsets) * (A.max() - A.min())) or 1.0
+
+    def payoffs(self):
+        """
+        各セルの利得の和 P_i = Σ_s A[x_i, s] n_s(i) を求める（n_s は近傍で戦略 s をとるセルの数）。
+        n_s は戦略 s の指示関数と近傍の畳み込み（縁つきの配列のビューの和）。最後の戦略の数は
+        近傍の大きさから引き算で求めるので、2戦略のゲームなら畳み込みは1回で済む。
+        """
+        L, P, count, seen, tmp, r = self.L, self.P, self.count, self.seen, self.tmp, self.r
+        fill_halo(self.Lp, r)
+        P[...] = 0
+        seen[...] = 0
+        for s in range(self.k):
+            if s < self.k - 1:
+                np.equal(self.Lp, s, out=self.ind)
+                count[...] = 0
+                for di, dj in self.play_offsets:
+                    count += neighbour_view(self.ind, r, di, dj)
+                seen += count
+            else:
+                np.subtract(len(self.play_offsets), seen, out=count)
+            np.take(self.A[:, s], L, out=tmp)
+            tmp *= count
+            P += tmp
+        return P
+
+    def _imitate_best(self):
+        """
+        自分と近傍のうち利得最大のセルの戦略をまねる。利得と戦略を1つの整数にまとめ、
+        近傍のビューとの np.maximum だけで最大を求める（同点なら自分、近傍どうしなら戦略の番号の大きい方）。
+        """
+        r, H, W = self.r, *self.L.shape
+        key = self.keyp[r:r + H, r:r + W]
+        _order_key(self.P, self.L, self.bits, key)
+        fill_halo(self.keyp, r)
+        np.bitwise_or(key, 0x80, out=self.best)
+        for di, dj in self.offsets:
+            np.maximum(self.best, neighbour_view(self.keyp, r, di, dj), out=self.best)
+        self.best &= 0x7f
+        np.copyto(self.L, self.best, casting='unsafe')
+
+    def _random_neighbour(self):
+        """セルごとに無作為な近傍を1つ選び、その利得を tmp、戦略を Ln に入れる"""
+        r, H, W = self.r, *self.L.shape
+        self.Pp[r:r + H, r:r + W] = self.P
+        fill_halo(self.Pp, r)
+        pick = self.rng.integers(0, len(self.offsets), self.L.shape, dtype=np.int8)
+        idx = self.jump.take(pick)
+        idx += self.base
+        self.Pp.take(idx, out=self.tmp)
+        self.Lp.take(idx, out=self.Ln)
+
+    def step(self, n=1):
+        """n 世代進める（全セルを同時に更新する）。"""
+        P, tmp = self.P, self.tmp
+        for _ in range(n):
+            self.payoffs()
+            if self.rule == "imitate_best":
+                self._imitate_best()
+                continue
+            self._random_neighbour()
+            # tmp ← 近傍の利得 - 自分の利得
+            tmp -= P
+            if self.rule == "fermi":
+                tmp *= -1.0 / self.K
+                np.clip(tmp, -50.0, 50.0, out=tmp)
+                np.exp(tmp, out=tmp)
+                tmp += 1.0
+                np.reciprocal(tmp, out=tmp)
+            else:
+                tmp *= 1.0 / self.phi
+            # 採用の判定（P は次の世代で計算し直すので、乱数の作業領域に使う）
+            self.rng.random(dtype=np.float32, out=P)
+            np.less(P, tmp, out=self.mask)
+            np.copyto(self.L, self.Ln, where=self.mask)
+        self.generation += n
+        return self.L
+
+    def fractions(self):
+        """各戦略をとるセルの割合"""
+        counts = [np.count_nonzero(self.L == s) for s in range(self.k - 1)]
+        return np.array(counts + [self.L.size - sum(counts)]) / self.L.size
+
+    def run(self, generations, record_every=1):
+        """
+        generations 世代進め、record_every 世代ごとの戦略の割合を返す。
+
+        Returns:
+            tuple: (世代の配列, 割合の配列（形状 (記録数, k)）)。最初の行は初期状態。
+        """
+        gens, history = [self.generation], [self.fractions()]
+        for _ in range(generations // record_every):
+            self.step(record_every)
+            gens.append(self.generation)
+            history.append(self.fractions())
+        return np.array(gens), np.array(history)
+
+
+def main(argv=None):
+    """python spatial.py [game_data.txt | T の値（Nowak-May）] [N] [世代数] [更新規則]"""
+    argv = sys.argv[1:] if argv is None else argv
+    source = argv[0] if len(argv) > 0 else os.path.join(HERE, "game_data.txt")
+    N = int(argv[1]) if len(argv) > 1 else 1000
+    generations = int(argv[2]) if len(argv) > 2 else 1000
+    rule = argv[3] if len(argv) > 3 else "imitate_best"
+
+    try:
+        b = float(source)
+    except ValueError:
+        A, _ = equilibria.load_game(source)
+        game = SpatialGame(A, (N, N), rule=rule, seed=0)
+        name = os.path.basename(source)
+    else:
+        # Nowak-May の設定（8近傍 + 自分自身、初期の協調率 0.9）
+        game = SpatialGame(nowak_may(b), (N, N), rule=rule, self_interaction=True, p_coop=0.9, seed=0)
+        name = f"Nowak-May b={b:g}"
+
+    t = time.perf_counter()
+    gens, history = game.run(generations, record_every=max(1, generations // 500))
+    elapsed = time.perf_counter() - t
+    print(f"{name}: {N}x{N} 格子, {rule}, {generations} 世代: {elapsed:.1f}s"
+          f"（{N * N * generations / elapsed / 1e6:.0f} M セル世代/s）, 最終の協調率 {history[-1, 0]:.4f}")
+
+    labels = equilibria.strategy_labels(game.k)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    view = game.L[:min(N, 300), :min(N, 300)]
+    ax1.imshow(view, cmap='coolwarm', vmin=0, vmax=game.k - 1, interpolation='nearest')
+    ax1.set_title(f"Strategies after {game.generation} generations (blue: {labels[0]})")
+    ax1.axis('off')
+    for s in range(game.k):
+        ax2.plot(gens, history[:, s], label=labels[s])
+    ax2.set_xlabel("Generation")
+    ax2.set_ylabel("Fraction")
+    ax2.set_ylim(0, 1)
+    ax2.set_title(f"Strategy Fractions ({name}, {rule})")
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.show()
+    return game, gens, history
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Nov  3 09:36:20 2026
+
+@author: iwamura
+"""
+
+# nash/tournament.py
+#
+# 繰り返し囚人のジレンマのトーナメント（Axelrod 型）を、多数の市場と割引因子について一括で回す。
+# rice.py は境界線 d = (T-R)/(T-P) の閉形式を求めたあと、中央値の市場1つについて
+# 「吊り上げ vs 協調」の 10 ラウンドを手で足し合わせていた。ここでは
+#   - 戦略（TFT, Grim, Pavlov, 確率的な GTFT / Random など）を、市場の軸に沿った
+#     真偽値配列の演算として1ラウンドずつ進め、
+#   - 割引利得は (市場, 割引因子) の配列に一括で足し込み、
+#   - 市場をチャンクに分けてプロセスプールで並列に処理する。
+# 各市場について、吊り上げ（常に裏切り）の累積割引利得が協調の累積割引利得に
+# 追い抜かれるラウンド（ブーメランの到達ラウンド）を実測する。
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from rice import T_RANGE, P_RANGE
+
+STRATEGIES = {}
+NEVER = -1  # 期間内にブーメランが来なかった市場のラウンド番号
+
+
+def register(name):
+    """戦略のクラスを name で登録するデコレーター"""
+    def deco(cls):
+        cls.name = name
+        STRATEGIES[name] = cls
+        return cls
+    return deco
+
+
+class Strategy:
+    """
+    戦略の基底クラス。1試合ごとに作り直し、市場の数 n の真偽値配列（True = 協調）で手を返す。
+    start() が初手、respond(me, opp) が直前の自分と相手の手に応じた次の手。
+    """
+
+    name = None
+
+    def __init__(self, n, rng):
+        self.n, self.rng = n, rng
+
+    def start(self):
+        return np.ones(self.n, dtype=bool)
+
+    def respond(self, me, opp):
+        raise NotImplementedError
+
+
+@register("all_c")
+class AllC(Strategy):
+    """常に協調（適正価格）"""
+
+    def respond(self, me, opp):
+        return np.ones(self.n, dtype=bool)
+
+
+@register("all_d")
+class AllD(Strategy):
+    """常に裏切り（価格吊り上げ）"""
+
+    def start(self):
+        return np.zeros(self.n, dtype=bool)
+
+    def respond(self, me, opp):
+        return np.zeros(self.n, dtype=bool)
+
+
+@register("tft")
+class TitForTat(Strategy):
+    """しっぺ返し：相手の直前の手をまねる"""
+
+    def respond(self, me, opp):
+        return opp.copy()
+
+
+@register("grim")
+class Grim(Strategy):
+    """トリガー戦略：一度でも裏切られたら以後ずっと裏切る"""
+
+    def __init__(self, n, rng):
+        super().__init__(n, rng)
+        self.angry = np.zeros(n, dtype=bool)
+
+    def respond(self, me, opp):
+        self.angry |= ~opp
+        return ~self.angry
+
+
+@register("pavlov")
+class Pavlov(Strategy):
+    """Win-Stay Lose-Shift：相手と同じ手だったら続け、違えば変える"""
+
+    def respond(self, me, opp):
+        return me == opp
+
+
+@register("gtft")
+class GenerousTFT(Strategy):
+    """寛容なしっぺ返し：裏切られても確率 1/3 で許す"""
+
+    forgive = 1.0 / 3.0
+
+    def respond(self, me, opp):
+        return opp | (self.rng.random(self.n) < self.forgive)
+
+
+@register("random")
+class RandomPlay(Strategy):
+    """確率 1/2 で協調"""
+
+    def start(self):
+        return self.rng.random(self.n) < 0.5
+
+    def respond(self, me, opp):
+        return self.rng.random(self.n) < 0.5
+
+
+def sample_markets(n, R=3.0, seed=None):
+    """
+    rice.py と同じ範囲で市場条件を抽出する。騙された側の利得 S は、
+    吊り上げ側の上積みと同じだけ報復後の水準 P から下がるとして S = P - (T - R) とおく（T > R > P > S）。
+
+    Returns:
+        dict: R, T, P, S の配列（形状 (n,)）。
+    """
+    rng = np.random.default_rng(seed)
+    T = rng.uniform(*T_RANGE, n)
+    P = rng.uniform(*P_RANGE, n)
+    return {"R": np.full(n, float(R)), "T": T, "P": P, "S": P - (T - R)}
+
+
+def _payoff(a, b, m):
+    """手 a, b（True = 協調）に対する a 側の利得（市場ごと）"""
+    return np.where(a, np.where(b, m["R"], m["S"]), np.where(b, m["T"], m["P"]))
+
+
+def play(name1, name2, markets, deltas, rounds, rng, cumulative=False):
+    """
+    戦略 name1 と name2 の試合を全市場で rounds ラウンド行い、割引利得の和を返す。
+
+    Returns:
+        tuple: 各プレイヤーの割引利得（形状 (市場, 割引因子)）。cumulative=True なら
+            ラウンドごとの累積値（形状 (rounds, 市場, 割引因子)）。
+    """
+    n = len(markets["R"])
+    deltas = np.asarray(deltas, dtype=float)
+    s1, s2 = STRATEGIES[name1](n, rng), STRATEGIES[name2](n, rng)
+    a, b = s1.start(), s2.start()
+    acc1 = np.zeros((n, len(deltas)))
+    acc2 = np.zeros((n, len(deltas)))
+    hist1 = np.empty((rounds,) + acc1.shape) if cumulative else None
+    hist2 = np.empty((rounds,) + acc2.shape) if cumulative else None
+    disc = np.ones_like(deltas)
+    for t in range(rounds):
+        acc1 += _payoff(a, b, markets)[:, None] * disc
+        acc2 += _payoff(b, a, markets)[:, None] * disc
+        if cumulative:
+            hist1[t], hist2[t] = acc1, acc2
+        a, b = s1.respond(a, b), s2.respond(b, a)
+        disc = disc * deltas
+    return (hist1, hist2) if cumulative else (acc1, acc2)
+
+
+def boomerang_rounds(markets, deltas, rounds, retaliator="tft", rng=None):
+    """
+    報復側 retaliator を相手に「常に吊り上げ」と「常に協調」を比べ、吊り上げの累積割引利得が
+    協調に追い抜かれる最初のラウンドを市場・割引因子ごとに返す（期間内に来なければ NEVER）。
+    """
+    rng = rng or np.random.default_rng()
+    gouge, _ = play("all_d", retaliator, markets, deltas, rounds, rng, cumulative=True)
+    coop, _ = play("all_c", retaliator, markets, deltas, rounds, rng, cumulative=True)
+    hit = coop > gouge
+    first = np.argmax(hit, axis=0)
+    return np.where(hit.any(axis=0), first, NEVER)
+
+
+def _run_chunk(markets, names, deltas, rounds, retaliator, seed):
+    rng = np.random.default_rng(seed)
+    k = len(names)
+    total = np.zeros((k, k, len(deltas)))  # total[i, j]: i が j と対戦した時の割引利得の市場和
+    for i in range(k):
+        for j in range(i, k):
+            p_i, p_j = play(names[i], names[j], markets, deltas, rounds, rng)
+            total[i, j] += p_i.sum(axis=0)
+            if j != i:
+                total[j, i] += p_j.sum(axis=0)
+    return total, boomerang_rounds(markets, deltas, rounds, retaliator, rng)
+
+
+def run_tournament(markets, deltas, names=None, rounds=50, retaliator="tft", processes=None,
+                   chunk=1 << 14, seed=0):
+    """
+    全市場・全割引因子について総当たりのトーナメントを行う。
+
+    Args:
+        markets (dict): sample_markets の出力。
+        deltas (sequence): 割引因子。
+        names (sequence): 出場する戦略（既定は登録済みの全て）。
+        rounds (int): 1試合のラウンド数。
+        retaliator (str): ブーメランの到達ラウンドを測る時の報復側の戦略。
+        processes (int): プロセス数（既定は CPU 数）。
+        chunk (int): 1ジョブあたりの市場数。
+
+    Returns:
+        dict: names、scores（scores[i, j, k]: 割引因子 deltas[k] で i が j と対戦した時の平均割引利得）、
+            boomerang（形状 (市場, 割引因子) の到達ラウンド）。
+    """
+    names = list(names or STRATEGIES)
+    deltas = np.asarray(deltas, dtype=float)
+    n = len(markets["R"])
+    bounds = list(range(0, n, chunk)) + [n]
+    parts = [{key: v[lo:hi] for key, v in markets.items()} for lo, hi in zip(bounds[:-1], bounds[1:])]
+    seeds = np.random.SeedSequence(seed).spawn(len(parts))
+    args = [(p, names, deltas, rounds, retaliator, s) for p, s in zip(parts, seeds)]
+
+    processes = processes or os.cpu_count() or 1
+    if processes > 1 and len(parts) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(parts))) as ex:
+            results = list(ex.map(_run_chunk, *zip(*args)))
+    else:
+        results = [_run_chunk(*a) for a in args]
+
+    return {"names": names, "deltas": deltas,
+            "scores": sum(r[0] for r in results) / n,
+            "boomerang": np.concatenate([r[1] for r in results])}
+
+
+def theoretical_rounds(markets, deltas, rounds):
+    """
+    閉形式による到達ラウンド：TFT 相手に吊り上げると初回 T、以後 P。協調なら毎回 R なので、
+    R (1 + δ + ... + δ^t) > T + P (δ + ... + δ^t) となる最初の t。
+    """
+    deltas = np.asarray(deltas, dtype=float)
+    t = np.arange(rounds)[:, None, None]
+    geo = np.where(deltas == 1.0, t + 1.0, (1 - deltas ** (t + 1)) / (1 - np.where(deltas == 1.0, 0.5, deltas)))
+    R, T, P = (markets[k][None, :, None] for k in "RTP")
+    hit = R * geo > T + P * (geo - 1)
+    return np.where(hit.any(axis=0), np.argmax(hit, axis=0), NEVER)
+
+
+def main(n_markets=100000, deltas=np.linspace(0.5, 0.95, 10), rounds=50):
+    import time
+
+    markets = sample_markets(n_markets, seed=0)
+    t = time.perf_counter()
+    result = run_tournament(markets, deltas, rounds=rounds)
+    elapsed = time.perf_counter() - t
+    names, scores, boom = result["names"], result["scores"], result["boomerang"]
+    print(f"{n_markets} 市場 × {len(names)} 戦略（総当たり {len(names) * (len(names) + 1) // 2} 試合）"
+          f" × 割引因子 {len(deltas)} 通り × {rounds} ラウンド: {elapsed:.1f}s")
+
+    # 割引因子ごとの戦略の順位（全対戦相手に対する平均割引利得）
+    mean = scores.mean(axis=1)
+    for k in (0, len(deltas) // 2, len(deltas) - 1):
+        order = np.argsort(-mean[:, k])
+        print(f"  δ={deltas[k]:.2f}: " + " > ".join(f"{names[i]}({mean[i, k]:.1f})" for i in order))
+
+    agree = np.mean(boom == theoretical_rounds(markets, deltas, rounds))
+    print(f"ブーメラン到達ラウンドの閉形式との一致率: {agree:.4f}")
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    im = ax1.imshow(mean, aspect='auto', cmap='viridis',
+                    extent=(deltas[0], deltas[-1], len(names) - 0.5, -0.5))
+    ax1.set_yticks(range(len(names)))
+    ax1.set_yticklabels(names)
+    ax1.set_xlabel("Discount Factor (δ)")
+    ax1.set_title("Mean Discounted Payoff against All Strategies")
+    fig.colorbar(im, ax=ax1)
+
+    for k in range(0, len(deltas), 3):
+        hit = boom[:, k][boom[:, k] != NEVER]
+        ax2.hist(hit, bins=np.arange(rounds + 1) - 0.5, alpha=0.5,
+                 label=f"δ={deltas[k]:.2f} ({len(hit) / n_markets:.0%} hit)")
+    ax2.set_xlim(-0.5, 20.5)
+    ax2.set_xlabel("Boomerang Round (gouging overtaken by cooperation vs TFT)")
+    ax2.set_ylabel("Markets")
+    ax2.set_title("Empirical Boomerang Round")
+    ax2.legend()
+    plt.tight_layout()
+    plt.show()
+    return result
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
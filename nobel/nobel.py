@@ -6,13 +6,16 @@ Created on Wed Dec 24 16:47:36 2025
 @author: iwamura
 """
 
+import os
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from maxima_bridge import mparse
+
 def run_garbage_collection(file_name):
     try:
-        with open(file_name.strip(), 'r') as f:
-            # データのパース
-            data = eval(f.read())
+        # データのパース（3賞 x [K, U, B, M]）
+        data = mparse.load(file_name.strip(), shape=(3, 4))
         
         award_names = ["Nobel Economics", "Fields Medal", "Practical (Stats)"]
         
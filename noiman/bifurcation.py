@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 10:30:52 2026
+
+@author: iwamura
+"""
+
+# noiman/bifurcation.py
+#
+# アルベド・フィードバックの分岐図とヒステリシス。
+# alpha = 0.3 if T > 5.0 else 0.5 の切り替えにより、同じ放射強制力 dF_total でも
+# 温暖側・寒冷側の2つの平衡が共存しうる（双安定）。ここでは時間積分ではなく、
+# formula.get_dTdt_Q = 0 をアルベドの枝ごとに brentq で解いて平衡を求め、
+# dF_total を上げる向き・下げる向きに掃引してヒステリシス・ループと転移点を出す。
+# 格子はチャンクに分けて全コアで並列に解く。
+
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.optimize import brentq
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(HERE)
+import noiman
+from forcing import orbital_elements
+
+ALBEDO = {"warm": 0.3, "cold": 0.5}
+T_BRACKET = (-250.0, 250.0)  # 平衡を探す気温の範囲 [°C]
+
+_formula = None
+
+
+def _get_formula():
+    # 子プロセスでは最初の呼び出し時に1回だけ読み込む（codecache がプロセス内で保持する）
+    global _formula
+    if _formula is None:
+        _formula = noiman.load_formula()
+    return _formula
+
+
+def insolation(t=0.0):
+    """時刻 t [年] の軌道要素での日射量 Q_orb [W/m^2]"""
+    return float(_get_formula().get_Q_orb(*orbital_elements(t)))
+
+
+def equilibrium(dF, Q, alpha):
+    """アルベドを alpha に固定した時の平衡気温 [°C]（範囲内に根が無ければ NaN）"""
+    formula = _get_formula()
+
+    def g(T):
+        # 偏差 T-15 を入力
+        return formula.get_dTdt_Q(T - 15, Q, dF, alpha)
+
+    lo, hi = T_BRACKET
+    if g(lo) * g(hi) > 0:
+        return np.nan
+    return brentq(g, lo, hi, xtol=1e-10)
+
+
+def _equilibria_chunk(dF_chunk, Q):
+    return [(equilibrium(dF, Q, ALBEDO["warm"]), equilibrium(dF, Q, ALBEDO["cold"])) for dF in dF_chunk]
+
+
+def equilibria(dF_grid, Q, processes=None):
+    """
+    各 dF について、温暖側・寒冷側の枝の平衡を並列に求める。
+
+    Returns:
+        tuple: (T_warm, T_cold, warm_ok, cold_ok)。*_ok はその平衡が枝の条件
+            （温暖側は T > ALBEDO_SWITCH、寒冷側は T <= ALBEDO_SWITCH）を満たすか。
+    """
+    dF_grid = np.asarray(dF_grid, dtype=float)
+    processes = processes or os.cpu_count() or 1
+    chunks = np.array_split(dF_grid, min(processes * 4, len(dF_grid)))
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as ex:
+            parts = list(ex.map(_equilibria_chunk, chunks, [Q] * len(chunks)))
+    else:
+        parts = [_equilibria_chunk(c, Q) for c in chunks]
+    T_warm, T_cold = np.array([p for part in parts for p in part]).reshape(-1, 2).T
+    return T_warm, T_cold, T_warm > noiman.ALBEDO_SWITCH, T_cold <= noiman.ALBEDO_SWITCH
+
+
+def hysteresis(dF_grid, Q, processes=None):
+    """
+    dF を格子に沿って上げる向き・下げる向きに準静的に掃引した時の平衡気温を返す。
+
+    上昇時は寒冷側から出発し、その枝の平衡が無くなった点で温暖側へ跳ぶ。下降時はその逆。
+
+    Returns:
+        dict: dF, T_warm, T_cold, up, down の各配列。
+    """
+    dF_grid = np.sort(np.asarray(dF_grid, dtype=float))
+    T_warm, T_cold, warm_ok, cold_ok = equilibria(dF_grid, Q, processes)
+
+    def sweep(order, start):
+        branch, out = start, np.empty_like(dF_grid)
+        for i in order:
+            ok = {"warm": warm_ok[i], "cold": cold_ok[i]}
+            if not ok[branch]:
+                branch = "warm" if branch == "cold" else "cold"
+            out[i] = T_warm[i] if branch == "warm" and warm_ok[i] else \
+                T_cold[i] if branch == "cold" and cold_ok[i] else np.nan
+        return out
+
+    n = len(dF_grid)
+    return {"dF": dF_grid, "T_warm": np.where(warm_ok, T_warm, np.nan),
+            "T_cold": np.where(cold_ok, T_cold, np.nan),
+            "up": sweep(range(n), "cold"), "down": sweep(range(n - 1, -1, -1), "warm")}
+
+
+def tipping_points(Q, dF_range=(0.0, 1000.0)):
+    """
+    転移点を返す。
+
+    Returns:
+        tuple: (dF_down, dF_up)。dF_down 未満では温暖側の平衡が消えて寒冷側へ落ち、
+            dF_up を超えると寒冷側の平衡が消えて温暖側へ跳ぶ。
+    """
+    def crossing(alpha):
+        return brentq(lambda dF: equilibrium(dF, Q, alpha) - noiman.ALBEDO_SWITCH, *dF_range, xtol=1e-9)
+    return crossing(ALBEDO["warm"]), crossing(ALBEDO["cold"])
+
+
+def _tipping_at(t):
+    return tipping_points(insolation(t))
+
+
+def tipping_map(t_values, processes=None):
+    """軌道要素の時刻ごとの転移点 (dF_down, dF_up) を並列に求める。"""
+    processes = processes or os.cpu_count() or 1
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as ex:
+            return np.array(list(ex.map(_tipping_at, t_values, chunksize=16)))
+    return np.array([_tipping_at(t) for t in t_values])
+
+
+def write_csv(path, loop):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["dF_total", "T_warm", "T_cold", "T_sweep_up", "T_sweep_down"])
+        for row in zip(loop["dF"], loop["T_warm"], loop["T_cold"], loop["up"], loop["down"]):
+            writer.writerow([f"{v:.6f}" for v in row])
+
+
+def run_bifurcation(dF_grid=None, t=0.0, csv_path="bifurcation.csv"):
+    """現在の軌道要素でのヒステリシス・ループと、10万年周期にわたる転移点を計算して描画する"""
+    dF_grid = np.linspace(0.0, 400.0, 2001) if dF_grid is None else dF_grid
+    Q = insolation(t)
+    loop = hysteresis(dF_grid, Q)
+    dF_down, dF_up = tipping_points(Q)
+    write_csv(csv_path, loop)
+    print(f"日射量 Q_orb = {Q:.2f} W/m^2")
+    print(f"転移点: 温暖→寒冷 dF = {dF_down:.3f}, 寒冷→温暖 dF = {dF_up:.3f}（双安定幅 {dF_up - dF_down:.3f}）")
+
+    t_cycle = np.linspace(0.0, 100000.0, 401)
+    tips = tipping_map(t_cycle)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    ax1.plot(loop["dF"], loop["T_warm"], color='orange', lw=1, alpha=0.5, label='Warm branch (alpha=0.3)')
+    ax1.plot(loop["dF"], loop["T_cold"], color='steelblue', lw=1, alpha=0.5, label='Cold branch (alpha=0.5)')
+    ax1.plot(loop["dF"], loop["up"], 'r-', lw=2, label='Sweep up')
+    ax1.plot(loop["dF"], loop["down"], 'b--', lw=2, label='Sweep down')
+    for dF_tip, label in ((dF_down, 'Tipping (warm→cold)'), (dF_up, 'Tipping (cold→warm)')):
+        ax1.axvline(dF_tip, color='gray', linestyle=':')
+        ax1.annotate(label, xy=(dF_tip, noiman.ALBEDO_SWITCH), xytext=(dF_tip + 5, noiman.ALBEDO_SWITCH - 20))
+    ax1.axhline(noiman.GLACIAL_LIMIT, color='red', linestyle='--', alpha=0.5, label='Glacial Limit')
+    ax1.set_title("Hysteresis Loop of the Albedo Feedback")
+    ax1.set_xlabel("Radiative Forcing dF (W/m²)")
+    ax1.set_ylabel("Equilibrium Temperature (°C)")
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2.fill_between(t_cycle, tips[:, 0], tips[:, 1], color='purple', alpha=0.2, label='Bistable')
+    ax2.plot(t_cycle, tips[:, 0], 'b-', label='Tipping (warm→cold)')
+    ax2.plot(t_cycle, tips[:, 1], 'r-', label='Tipping (cold→warm)')
+    ax2.set_title("Tipping Points over an Orbital Cycle")
+    ax2.set_xlabel("Years from Present")
+    ax2.set_ylabel("Radiative Forcing dF (W/m²)")
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.show()
+    return loop, (dF_down, dF_up)
+
+
+if __name__ == "__main__":
+    run_bifurcation()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:31:04 2026
+
+@author: iwamura
+"""
+
+# noiman/check_forcing.py
+#
+# 対数時間軸と日射量テーブル（forcing.py）の回帰確認。
+# 10**log10(t_end) が t_end をわずかに超え、ForcingTable が範囲外として拒否していた
+# （t_end = 7e6 などで run_log_sim(use_table=True) が ValueError になった）不具合を確かめる。
+# python -O でも外れないよう、assert ではなく例外で失敗を知らせる。
+#
+# 使い方: python check_forcing.py [t_end ...]
+
+import sys
+
+import numpy as np
+
+from forcing import ForcingTable
+from noiman import _log_axis, load_formula
+
+
+def _check(ok, message):
+    if not ok:
+        raise AssertionError(message)
+
+
+def check_table_endpoints(t_ends=(7e6, 1.234e7), n=10000):
+    """
+    t_end ごとに、次の4点を確かめる。
+      - 対数軸の終点が t_end ちょうどになる
+      - 2つのブロックに分けて作った対数軸が、一度に作った軸と一致する
+      - 対数軸の全ての時刻と、丸め誤差程度にはみ出した時刻をテーブルが受け付ける
+      - テーブルの範囲から明らかに外れた時刻は ValueError になる
+    """
+    formula = load_formula()
+    for t_end in t_ends:
+        t_axis = _log_axis(t_end, n, 0, n)
+        _check(t_axis[-1] == t_end, f"対数軸の終点 {t_axis[-1]!r} が t_end={t_end!r} と一致しません")
+        split = np.concatenate([_log_axis(t_end, n, 0, n // 2), _log_axis(t_end, n, n // 2, n)])
+        _check(np.array_equal(split, t_axis), "分割して作った対数軸が一度に作った軸と一致しません")
+
+        table = ForcingTable.build(formula, t_span=(0.0, t_end))
+        table(t_axis)
+        table(t_end * (1 + 1e-12))
+        try:
+            table(t_end * 1.01)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("テーブルの範囲外の時刻が拒否されませんでした")
+        print(f"t_end={t_end:g}: 対数軸の終点と日射量テーブルの範囲 OK")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        check_table_endpoints(tuple(float(a) for a in sys.argv[1:]))
+    else:
+        check_table_endpoints()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 10:12:09 2026
+
+@author: iwamura
+"""
+
+# noiman/forcing.py
+#
+# ミランコビッチ・サイクルの日射量テーブル。
+# run_log_sim は1ステップごとに e, eps, omega を3つの正弦波から計算し、Q_orb の多項式を
+# 評価し直していた。ここでは軌道パラメータの組ごとに、等間隔の時間格子上の Q_orb を1回だけ
+# 計算して .npy に保存し、メモリマップで読み込んで線形補間する。
+# 10^7〜10^8 年の積分や、アンサンブルの繰り返し実行でも三角関数を評価し直さない。
+
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 軌道要素の既定値（離心率・地軸傾斜 [度] の平均・振幅・周期 [年]、近日点の歳差周期 [年]）
+ORBIT = {
+    "e0": 0.028, "e_amp": 0.012, "e_period": 100000,
+    "eps0": 23.4, "eps_amp": 0.7, "eps_period": 41000,
+    "omega_period": 23000,
+}
+
+DEFAULT_DT = 50.0       # テーブルの時間刻み [年]（最短周期 23,000 年に対して十分細かい）
+_BUILD_CHUNK = 1 << 20  # テーブル作成時に一度に計算する点数
+_RANGE_RTOL = 1e-9      # 範囲の端での許容誤差（格子の長さに対する相対値）
+
+
+def orbital_elements(t, orbit=None):
+    """時刻 t [年] の離心率・地軸傾斜 [rad]・近日点引数 [rad] を返す（配列可）"""
+    o = ORBIT if orbit is None else {**ORBIT, **orbit}
+    e = o["e0"] + o["e_amp"] * np.sin(2 * np.pi * t / o["e_period"])
+    eps = np.radians(o["eps0"] + o["eps_amp"] * np.sin(2 * np.pi * t / o["eps_period"]))
+    omega = 2 * np.pi * t / o["omega_period"]
+    return e, eps, omega
+
+
+def _formula_digest(formula):
+    """日射量の式のハッシュ（生成モジュールのソース、無ければモジュール名）"""
+    path = getattr(formula, "__file__", None)
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    return formula.__name__
+
+
+class ForcingTable:
+    """
+    等間隔の時間格子上の日射量 Q_orb [W/m^2]。table(t) で線形補間した値を返す（配列可）。
+
+    Args:
+        values (np.ndarray): 格子点の日射量（通常はメモリマップ）。
+        t0 (float): 最初の格子点の時刻 [年]。
+        dt (float): 格子の間隔 [年]。
+    """
+
+    def __init__(self, values, t0, dt):
+        self.values = values
+        self.t0 = float(t0)
+        self.dt = float(dt)
+        self.t1 = self.t0 + (len(values) - 1) * self.dt
+
+    @classmethod
+    def build(cls, formula, t_span=(0.0, 1e6), dt=DEFAULT_DT, orbit=None, cache_dir=None):
+        """
+        日射量テーブルを読み込む。同じ式・軌道パラメータ・格子のテーブルが無ければ作成する。
+
+        Args:
+            formula (module): get_Q_orb を持つ生成モジュール。
+            t_span (tuple): 覆う時間範囲 [年]。
+            dt (float): 格子の間隔 [年]。
+            orbit (dict): ORBIT の一部を上書きする軌道パラメータ。
+            cache_dir (str): 保存先（既定は noiman/__mxcache__）。
+        """
+        t0, t1 = map(float, t_span)
+        n = int(math.ceil((t1 - t0) / dt)) + 1
+        orbit = {**ORBIT, **(orbit or {})}
+        key = json.dumps({"orbit": orbit, "t0": t0, "dt": dt, "n": n,
+                          "formula": _formula_digest(formula)}, sort_keys=True)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        cache_dir = cache_dir or os.path.join(HERE, "__mxcache__")
+        path = os.path.join(cache_dir, f"forcing_{digest}.npy")
+
+        if not os.path.exists(path):
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp.npy"
+            table = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(n,))
+            for lo in range(0, n, _BUILD_CHUNK):
+                t = t0 + dt * np.arange(lo, min(lo + _BUILD_CHUNK, n))
+                table[lo:lo + t.size] = formula.get_Q_orb(*orbital_elements(t, orbit))
+            table.flush()
+            del table
+            os.replace(tmp, path)
+        return cls(np.load(path, mmap_mode="r"), t0, dt)
+
+    def __call__(self, t):
+        x = (np.asarray(t, dtype=float) - self.t0) / self.dt
+        last = len(self.values) - 1
+        # 丸め誤差で端をわずかに越えた時刻（相対 1e-9 まで）は端の値として扱う
+        tol = _RANGE_RTOL * max(last, 1)
+        if np.any(x < -tol) or np.any(x > last + tol):
+            raise ValueError(f"時刻がテーブルの範囲 [{self.t0:g}, {self.t1:g}] 年の外です")
+        x = np.clip(x, 0, last)
+        i = np.minimum(x.astype(np.intp), len(self.values) - 2)
+        frac = x - i
+        lo = self.values[i]
+        return lo + frac * (self.values[i + 1] - lo)
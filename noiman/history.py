@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 09:48:30 2026
+
+@author: iwamura
+"""
+
+# noiman/history.py
+#
+# 長時間積分の履歴をファイルへ逐次書き出すシンク。
+# 気温を Python のリストに append していくと、10^7 ステップ以上では float オブジェクトの
+# ボックス化でデータ本体の数倍のメモリを使い、途中で落ちると全てを失う。
+# ここでは (t, T) を固定長のバッファにため、いっぱいになるたびに float32 の生バイナリとして
+# ファイル末尾へ書き足す。読み出しはメモリマップ（間引き可）で、チェックポイントには
+# 書き出し済みの行数と積分状態を JSON で原子的に保存する。
+
+import json
+import math
+import os
+
+import numpy as np
+
+DEFAULT_CHUNK = 1 << 16  # バッファの行数
+
+
+class HistorySink:
+    """
+    (t, T, ...) の行をチャンク単位でファイルへ書き出す履歴シンク。
+
+    Args:
+        path (str): 履歴ファイルのパス（チェックポイントは path + ".ckpt.json"）。
+        columns (int): 1行あたりの値の数。
+        dtype: 保存する型（既定は float32）。
+        chunk (int): バッファの行数。
+        resume (bool): True かつチェックポイントがあれば、その時点まで巻き戻して続きから書く。
+            積分状態は self.state に入る（再開しない場合は None）。
+    """
+
+    def __init__(self, path, columns=2, dtype=np.float32, chunk=DEFAULT_CHUNK, resume=False):
+        self.path = path
+        self.checkpoint_path = path + ".ckpt.json"
+        self.columns = columns
+        self.dtype = np.dtype(dtype)
+        self.state = None
+        self.rows = 0  # ファイルに書き出し済みの行数
+
+        if resume and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                ckpt = json.load(f)
+            if ckpt["columns"] != columns or ckpt["dtype"] != self.dtype.str:
+                raise ValueError(f"チェックポイントの形式が一致しません: {self.checkpoint_path}")
+            self.rows = ckpt["rows"]
+            self.state = ckpt["state"]
+            # チェックポイントより後に書かれた行は捨てる
+            with open(path, "r+b") as f:
+                f.truncate(self.rows * self._row_bytes)
+        else:
+            open(path, "wb").close()
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+
+        self._file = open(path, "ab")
+        self._buf = np.empty((chunk, columns), dtype=self.dtype)
+        self._n = 0  # バッファ内の行数
+
+    @property
+    def _row_bytes(self):
+        return self.columns * self.dtype.itemsize
+
+    def __len__(self):
+        return self.rows + self._n
+
+    def append(self, *values):
+        """1行を追加する。"""
+        self._buf[self._n] = values
+        self._n += 1
+        if self._n == len(self._buf):
+            self.flush()
+
+    def extend(self, block):
+        """形状 (行数, columns) の配列をまとめて追加する。"""
+        self.flush()
+        block = np.ascontiguousarray(block, dtype=self.dtype).reshape(-1, self.columns)
+        self._file.write(block.tobytes())
+        self.rows += len(block)
+
+    def flush(self):
+        """バッファの内容をファイルへ書き出す。"""
+        if self._n:
+            self._file.write(self._buf[:self._n].tobytes())
+            self.rows += self._n
+            self._n = 0
+        self._file.flush()
+
+    def checkpoint(self, state):
+        """
+        履歴をディスクに確定させ、積分状態 state（JSON 化できる辞書）を原子的に保存する。
+        """
+        self.flush()
+        os.fsync(self._file.fileno())
+        ckpt = {"rows": self.rows, "columns": self.columns, "dtype": self.dtype.str, "state": state}
+        tmp = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(ckpt, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    def view(self, stride=1):
+        """書き出し済みの履歴をメモリマップで返す（stride 行ごとに間引き）。"""
+        self.flush()
+        if self.rows == 0:
+            return np.empty((0, self.columns), dtype=self.dtype)
+        data = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self.rows, self.columns))
+        return data[::stride]
+
+    def decimated(self, max_points=10000):
+        """描画用に、最大 max_points 行程度へ間引いた履歴を返す。"""
+        return self.view(max(1, math.ceil(len(self) / max_points)))
+
+    def close(self, remove=False):
+        """ファイルを閉じる。remove=True なら履歴とチェックポイントを削除する。"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if remove:
+            for p in (self.path, self.checkpoint_path):
+                if os.path.exists(p):
+                    os.remove(p)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -6,44 +6,253 @@ Created on Thu Dec 25 12:55:26 2025
 @author: iwamura
 """
 
+import os
+import shutil
+import sys
+import tempfile
 import numpy as np
 import matplotlib.pyplot as plt
-import formula
-import importlib
 
-def run_log_sim():
-    importlib.reload(formula)
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+from maxima_bridge import codecache, pycodegen
+from forcing import ForcingTable, orbital_elements
+from history import HistorySink
+
+def load_formula():
+    """noiman.mac の導出結果 (formula.py) を読み込む。.mac が変わった時だけ再生成する。"""
+    return codecache.load_generated(os.path.join(HERE, "noiman.mac"), "formula.py",
+                                    postprocess=pycodegen.optimize_source,
+                                    extra=pycodegen.BACKEND_VERSION)
+
+GLACIAL_LIMIT = 10.0  # 氷河期しきい値 [°C]
+ALBEDO_SWITCH = 5.0   # アルベドが切り替わる気温 [°C]
+DF_DEFAULT = 14.5     # 温室効果ガスによる放射強制力 (400ppm) [W/m^2]
+
+class AdaptiveResult:
+    """
+    integrate_adaptive の結果。
+
+    アルベドの切り替えごとに区切った区間の密出力を持ち、result(t) で任意の時刻の気温を返す。
+    glacial_crossings は氷河期しきい値を横切った (時刻, 向き +1/-1) のリスト、
+    albedo_switches はアルベドが切り替わった時刻のリスト、nfev は RHS の評価回数。
+    """
+
+    def __init__(self, segments, glacial_crossings, albedo_switches, nfev):
+        self.segments = segments
+        self.glacial_crossings = glacial_crossings
+        self.albedo_switches = albedo_switches
+        self.nfev = nfev
+
+    def __call__(self, t):
+        t = np.asarray(t, dtype=float)
+        starts = np.array([seg[0] for seg in self.segments])
+        idx = np.clip(np.searchsorted(starts, t, side="right") - 1, 0, len(self.segments) - 1)
+        out = np.empty_like(t)
+        for i, (_, _, dense) in enumerate(self.segments):
+            mask = idx == i
+            if np.any(mask):
+                out[mask] = dense(t[mask])[0]
+        return out
+
+def _rhs(formula, forcing):
+    """(T, t, dF, alpha) → dT/dt。forcing（ForcingTable）があれば日射量はテーブルから補間する"""
+    # どちらも偏差 T-15 を入力
+    if forcing is None:
+        return lambda T, t, dF, alpha: formula.get_dTdt(T - 15, *orbital_elements(t), dF, alpha)
+    return lambda T, t, dF, alpha: formula.get_dTdt_Q(T - 15, forcing(t), dF, alpha)
+
+def integrate_adaptive(formula, T0=15.0, t_span=(1.0, 1e6), dF=DF_DEFAULT, method="LSODA",
+                       rtol=1e-5, atol=1e-6, max_switches=1000, forcing=None):
+    """
+    適応刻みの（硬い系にも対応する）ソルバで気温を積分する。
+
+    アルベドは T = ALBEDO_SWITCH で不連続に変わるので、そこで積分を打ち切って
+    新しいアルベドで再開する。T = GLACIAL_LIMIT の横断は打ち切らずに時刻だけ記録する。
+    forcing に ForcingTable を渡すと、日射量を軌道要素から計算せずテーブルから補間する。
+
+    Returns:
+        AdaptiveResult: 区間ごとの密出力・横断時刻・RHS 評価回数。
+    """
+    from scipy.integrate import solve_ivp
+
+    def glacial(t, y):
+        return y[0] - GLACIAL_LIMIT
+
+    def switch(t, y):
+        return y[0] - ALBEDO_SWITCH
+    switch.terminal = True
+
+    dTdt = _rhs(formula, forcing)
+    t0, t_end = t_span
+    T = T0
+    alpha = 0.3 if T > ALBEDO_SWITCH else 0.5
+    segments, crossings, switches, nfev = [], [], [], 0
+    while True:
+        def rhs(t, y, alpha=alpha):
+            return dTdt(y, t, dF, alpha)
+
+        sol = solve_ivp(rhs, (t0, t_end), [T], method=method, dense_output=True,
+                        events=[glacial, switch], rtol=rtol, atol=atol)
+        if sol.status == -1:
+            raise RuntimeError(sol.message)
+        nfev += sol.nfev
+        segments.append((sol.t[0], sol.t[-1], sol.sol))
+        for t_c, y_c in zip(sol.t_events[0], sol.y_events[0]):
+            crossings.append((t_c, 1 if rhs(t_c, y_c)[0] > 0 else -1))
+        if sol.status != 1:
+            break
+
+        t_sw = sol.t_events[1][-1]
+        if t_sw <= t0 + 1e-9 * max(1.0, abs(t0)):
+            # 切り替え直後に再び閾値へ戻される場合は、閾値上に張り付く（滑り運動）
+            raise RuntimeError(f"t={t_sw:.6g} 年でアルベド閾値上に張り付きました")
+        switches.append(t_sw)
+        if len(switches) > max_switches:
+            raise RuntimeError(f"アルベドの切り替えが {max_switches} 回を超えました")
+        # 閾値を下向きに横切ったら寒冷側（0.5）、上向きなら温暖側（0.3）に切り替え、
+        # 次は逆向きの横断だけを検出する
+        alpha = 0.5 if alpha == 0.3 else 0.3
+        switch.direction = 1 if alpha == 0.5 else -1
+        T, t0 = ALBEDO_SWITCH, t_sw
+    return AdaptiveResult(segments, crossings, switches, nfev)
+
+def run_ensemble(dF=DF_DEFAULT, switch_T=ALBEDO_SWITCH, T0=15.0, t_axis=None, formula=None,
+                 dtype=np.float64, forcing=None):
+    """
+    複数のシナリオを NumPy 配列として同時に（ロックステップで）積分する。
+
+    run_log_sim の "euler" モードと同じ時間軸・リミッターで、メンバーごとに
+    放射強制力・アルベド切り替え温度・初期温度を変えられる。
+
+    Args:
+        dF, switch_T, T0 (float or array): メンバーごとのパラメータ（ブロードキャストして揃える）。
+        t_axis (array): 時間軸 [年]（既定は 1〜10^6 年の対数軸 10,000 点）。
+        formula (module): get_Q_orb / get_dTdt_Q を持つモジュール（既定は load_formula()）。
+        dtype: 履歴配列の型。
+        forcing (ForcingTable): 日射量テーブル（指定すれば軌道要素を計算しない）。
+
+    Returns:
+        np.ndarray: 形状 (メンバー数, 時刻数) の気温の履歴。
+    """
+    formula = formula or load_formula()
+    t_axis = np.logspace(0, 6, 10000) if t_axis is None else np.asarray(t_axis, dtype=float)
+    dF, switch_T, T = (np.array(a, dtype=float) for a in np.broadcast_arrays(dF, switch_T, T0))
+    dF, switch_T, T = dF.ravel(), switch_T.ravel(), T.ravel()
+
+    history = np.empty((T.size, t_axis.size), dtype=dtype)
+    dt = np.diff(t_axis, prepend=t_axis[0])
+    # 日射量は全メンバー共通なので、時間軸全体について先に求めておく
+    Q = forcing(t_axis) if forcing is not None else formula.get_Q_orb(*orbital_elements(t_axis))
+    for k in range(t_axis.size):
+        alpha = np.where(T > switch_T, 0.3, 0.5)
+        dTdt = formula.get_dTdt_Q(T - 15, Q[k], dF, alpha)
+        T += np.clip(dTdt * dt[k], -2.0, 2.0)
+        history[:, k] = T
+    return history
+
+def plot_stability_basin(n_T0=60, n_dF=60):
+    """初期温度 × 放射強制力の格子を一括で積分し、100万年後の気温を地図にする"""
+    T0_grid, dF_grid = np.meshgrid(np.linspace(-60.0, 30.0, n_T0), np.linspace(0.0, 250.0, n_dF))
+    history = run_ensemble(dF=dF_grid, T0=T0_grid)
+    final = history[:, -1].reshape(T0_grid.shape)
+
+    plt.figure(figsize=(10, 7))
+    mesh = plt.pcolormesh(T0_grid, dF_grid, final, cmap='coolwarm', shading='auto')
+    plt.colorbar(mesh, label='Temperature after 1 Myr (°C)')
+    plt.contour(T0_grid, dF_grid, final, levels=[GLACIAL_LIMIT], colors='black', linestyles='--')
+    plt.title("Stability Basin of the Albedo Feedback", fontsize=14)
+    plt.xlabel("Initial Temperature (°C)", fontsize=12)
+    plt.ylabel("Radiative Forcing dF (W/m²)", fontsize=12)
+    plt.show()
+
+def _log_axis(t_end, n, lo, hi):
+    """np.logspace(0, log10(t_end), n)[lo:hi] を、全体の配列を作らずに計算する"""
+    y = np.arange(lo, hi, dtype=float) * (np.log10(t_end) / (n - 1))
+    t = np.power(10.0, y)
+    if hi == n:
+        # 10**log10(t_end) は t_end をわずかに超えることがあるので、終点は t_end そのものにする
+        t[-1] = t_end
+    return t
+
+def run_log_sim(mode="euler", t_end=1e6, use_table=False, n_steps=10000, history_path=None,
+                checkpoint_every=1_000_000):
+    """
+    1年から t_end 年までの気温変化を計算して描画する。
+
+    mode="euler": 対数軸の n_steps 点で陽的オイラー法（1ステップの変化は ±2°C に制限）
+    mode="adaptive": integrate_adaptive による適応刻みの積分（しきい値の横断時刻も表示）
+    use_table=True なら、日射量を forcing.ForcingTable から補間する（10^7 年以上の積分向け）。
+
+    "euler" の履歴は history.HistorySink でファイルへ逐次書き出す。history_path を指定すると
+    checkpoint_every ステップごとにチェックポイントを保存し、次回は同じパスで続きから再開する
+    （指定しなければ一時ファイルを使い、描画後に削除する）。
+    """
+    formula = load_formula()
     
-    # 1年から100万年まで。対数軸で精度を保つため刻みを増やす
-    t_axis = np.logspace(0, 6, 10000) 
     T = 15.0 # 初期温度
-    history = []
+    forcing = ForcingTable.build(formula, t_span=(0.0, t_end)) if use_table else None
+    dTdt_fn = _rhs(formula, forcing)
+
+    if mode == "adaptive":
+        # 1年から t_end 年まで。描画用の点は対数軸で最大 10,000 点
+        t_axis = _log_axis(t_end, min(n_steps, 10000), 0, min(n_steps, 10000))
+        result = integrate_adaptive(formula, T0=T, t_span=(t_axis[0], t_axis[-1]), forcing=forcing)
+        history = result(t_axis)
+        print(f"RHS評価回数: {result.nfev}（オイラー法は {n_steps} 回）")
+        for t_c, direction in result.glacial_crossings:
+            print(f"  氷河期しきい値 {GLACIAL_LIMIT}°C を{'上' if direction > 0 else '下'}向きに横断: {t_c:,.1f} 年")
+        for t_sw in result.albedo_switches:
+            print(f"  アルベド切り替え ({ALBEDO_SWITCH}°C): {t_sw:,.1f} 年")
+    elif mode == "euler":
+        # 履歴はリストにためず、ファイルへチャンクごとに書き出す
+        workdir = None if history_path else tempfile.mkdtemp(prefix="noiman_")
+        sink = HistorySink(history_path or os.path.join(workdir, "history.f32"),
+                           resume=history_path is not None)
+        state = {"k": -1, "T": T, "t_end": t_end, "n_steps": n_steps}
+        if sink.state is not None:
+            if (sink.state["t_end"], sink.state["n_steps"]) != (t_end, n_steps):
+                raise ValueError("チェックポイントと t_end / n_steps が一致しません")
+            state = sink.state
+            print(f"チェックポイントから再開します: {state['k'] + 1:,} / {n_steps:,} ステップ")
+        T = state["T"]
+        k0 = state["k"] + 1
     
-    t_prev = t_axis[0]
-    for t in t_axis:
-        dt = t - t_prev
-        
-        # 軌道要素
-        e = 0.028 + 0.012 * np.sin(2 * np.pi * t / 100000)
-        eps = np.radians(23.4 + 0.7 * np.sin(2 * np.pi * t / 41000))
-        omega = 2 * np.pi * t / 23000
+        # 1年から t_end 年まで。対数軸で精度を保つため刻みを増やす（時刻はブロックごとに生成）
+        t_prev = _log_axis(t_end, n_steps, max(k0 - 1, 0), max(k0, 1))[0]
+        for lo in range(k0, n_steps, 1 << 16):
+            hi = min(lo + (1 << 16), n_steps)
+            for k, t in enumerate(_log_axis(t_end, n_steps, lo, hi), start=lo):
+                dt = t - t_prev
         
-        # 条件: 400ppm + アルベド (極端な発散を防ぐため閾値を調整)
-        dF = 14.5
-        alpha = 0.3 if T > 5.0 else 0.5 
+                # 条件: 400ppm + アルベド (極端な発散を防ぐため閾値を調整)
+                dF = DF_DEFAULT
+                alpha = 0.3 if T > ALBEDO_SWITCH else 0.5 
 
-        # 微分係数取得と更新 (偏差 T-15 を入力)
-        dTdt = formula.get_dTdt(T-15, e, eps, omega, dF, alpha)
+                # 微分係数取得と更新（軌道要素または日射量テーブルから）
+                dTdt = dTdt_fn(T, t, dF, alpha)
         
-        # 安全策: dTdt が大きくなりすぎないようリミッターをかける
-        T += np.clip(dTdt * dt, -2.0, 2.0)
-        history.append(T)
-        t_prev = t
+                # 安全策: dTdt が大きくなりすぎないようリミッターをかける
+                T += np.clip(dTdt * dt, -2.0, 2.0)
+                sink.append(t, T)
+                t_prev = t
+                if history_path and (k + 1) % checkpoint_every == 0:
+                    sink.checkpoint({**state, "k": k, "T": float(T)})
+
+        if history_path:
+            sink.checkpoint({**state, "k": n_steps - 1, "T": float(T)})
+        data = np.array(sink.decimated(10000), dtype=float)
+        t_axis, history = data[:, 0], data[:, 1]
+        sink.close(remove=workdir is not None)
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    else:
+        raise ValueError(f"未知の積分モード: {mode}")
 
     plt.figure(figsize=(12, 6))
     plt.plot(t_axis, history, color='darkgreen', linewidth=2)
     plt.xscale('log')
-    plt.axhline(y=10.0, color='red', linestyle='--', label='Glacial Limit')
+    plt.axhline(y=GLACIAL_LIMIT, color='red', linestyle='--', label='Glacial Limit')
     plt.grid(True, which="both", ls="-", alpha=0.3)
     plt.title("Log-scale Climate Stability Simulation", fontsize=14)
     plt.xlabel("Years from Present (Log Scale)", fontsize=12)
@@ -52,4 +261,13 @@ def run_log_sim():
     plt.show()
 
 if __name__ == "__main__":
-    run_log_sim()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "basin":
+        plot_stability_basin()
+    elif len(sys.argv) > 2:
+        # 例: python noiman.py adaptive 1e8（長期の積分は日射量テーブルを使う）
+        #     python noiman.py euler 1e8 2e7 run.f32（2,000万ステップ、履歴を保存して再開可能に）
+        run_log_sim(sys.argv[1], t_end=float(sys.argv[2]), use_table=True,
+                    n_steps=int(float(sys.argv[3])) if len(sys.argv) > 3 else 10000,
+                    history_path=sys.argv[4] if len(sys.argv) > 4 else None)
+    else:
+        run_log_sim(sys.argv[1] if len(sys.argv) > 1 else "euler")
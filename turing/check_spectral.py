@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:04:52 2026
+
+@author: iwamura
+"""
+
+# turing/check_spectral.py
+#
+# 半陰的スペクトル積分器（spectral.py）が陽的スキームと同じ解を与えることの回帰確認。
+# spectral.compare の相対誤差・相関は表示されるだけなので、ここでは次の2点が外れたら失敗させる。
+#   - 模様が成熟する T_end=200 で、支配的な波数が陽的スキームと一致する
+#   - 模様が育ち始める前（T_end=20）では、dt を半分にするたびに陽的スキームとの差が縮む
+# python -O でも外れないよう、assert ではなく例外で失敗を知らせる。
+#
+# 使い方: python check_spectral.py
+
+from spectral import compare
+
+SCHEMES = ("sbdf2", "imex")
+CONVERGENCE_DTS = (0.5, 0.25, 0.125)
+# dt を半分にしたときの誤差の比の上限（1次でも 0.5 程度、陽的スキーム自身の誤差で頭打ちになる分の余裕を見る）
+MAX_ERROR_RATIO = 0.7
+
+
+def _check(ok, message):
+    if not ok:
+        raise AssertionError(message)
+
+
+def check_wavenumber(T_end=200.0, dt=0.5):
+    """模様が成熟した時刻で、支配的な波数が陽的スキームと一致することを確かめる。"""
+    for scheme in SCHEMES:
+        r = compare(T_end=T_end, dt=dt, scheme=scheme)
+        k_explicit, k_spectral = r["k_peak"]
+        _check(k_explicit == k_spectral,
+               f"{scheme} dt={dt}: 支配的な波数 {k_spectral} が陽的スキームの {k_explicit} と一致しません")
+        print(f"{scheme:>5} T={T_end:g} dt={dt}: 波数 {r['k_peak']} 一致、相関 {r['corr']:.4f}")
+
+
+def check_convergence(T_end=20.0, dts=CONVERGENCE_DTS):
+    """dt を半分にするたびに、陽的スキームとの相対 L2 誤差が MAX_ERROR_RATIO 倍以下に縮むことを確かめる。"""
+    for scheme in SCHEMES:
+        errors = [compare(T_end=T_end, dt=dt, scheme=scheme)["rel_l2"] for dt in dts]
+        for (dt0, e0), (dt1, e1) in zip(zip(dts, errors), zip(dts[1:], errors[1:])):
+            _check(e1 <= MAX_ERROR_RATIO * e0,
+                   f"{scheme}: dt {dt0} → {dt1} で誤差が {e0:.3e} → {e1:.3e} と十分に縮みません")
+        print(f"{scheme:>5} T={T_end:g} dt={dts}: 相対L2誤差 "
+              + " → ".join(f"{e:.3e}" for e in errors))
+
+
+if __name__ == "__main__":
+    check_convergence()
+    check_wavenumber()
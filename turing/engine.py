@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Nov  1 09:52:16 2026
+
+@author: iwamura
+"""
+
+# turing/engine.py
+#
+# 反応項を差し替えられる反応拡散エンジン。
+# simulation.py と grow_pattern.py には Schnakenberg の反応項と時間発展のループがそれぞれ書かれ、
+# import しただけで計算が始まっていた。ここでは
+#   - 反応項（Schnakenberg / Gray-Scott / FitzHugh-Nagumo）を名前で登録し、
+#   - 2次元・3次元の周期格子を kernel.laplacian の同じステンシルで扱い、
+#   - float32 / float64 を選べるようにする（3次元の 256^3 でも float32 なら1場 64MB）。
+# Schnakenberg の定常状態は params.json（turing.mac の出力）から読む。
+# 反応項の更新は各カーネルの react() にまとめてあり、どの格子・精度でも同じループを通る。
+
+import json
+import os
+import sys
+
+import numpy as np
+
+from kernel import SchnakenbergKernel, laplacian
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+KINETICS = {}
+
+
+def register(name):
+    """反応項のクラスを name で登録するデコレーター"""
+    def deco(cls):
+        cls.name = name
+        KINETICS[name] = cls
+        return cls
+    return deco
+
+
+def get_kinetics(name):
+    try:
+        return KINETICS[name]
+    except KeyError:
+        raise ValueError(f"未知の反応項: {name}（登録済み: {', '.join(sorted(KINETICS))}）") from None
+
+
+def load_params(path=None, mac_path=None):
+    """
+    turing.mac が書き出す params.json を読み、定常状態の式を a, b で評価する。
+    params.json が無ければ turing.mac を Maxima で実行して作る。
+
+    Returns:
+        dict: a, b, u_star, v_star（いずれも float）。
+    """
+    path = path or os.path.join(HERE, "params.json")
+    if not os.path.exists(path):
+        sys.path.append(os.path.join(HERE, ".."))
+        from maxima_bridge import sandbox
+        mac_path = mac_path or os.path.join(HERE, "turing.mac")
+        text = sandbox.run_mac(mac_path, ["params.json"])["params.json"]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    a, b = float(data["a"]), float(data["b"])
+    # Maxima から来た "b+a" などの式を、a, b だけを見える名前にして数値に変える
+    env = {"__builtins__": {}}, {"a": a, "b": b}
+    return {"a": a, "b": b,
+            "u_star": float(eval(data["u_star"].replace("^", "**"), *env)),
+            "v_star": float(eval(data["v_star"].replace("^", "**"), *env))}
+
+
+class Kinetics:
+    """
+    反応項の基底クラス。defaults にパラメータ（拡散係数 Du, Dv と既定の時間刻み dt を含む）を持ち、
+    steady_state() と make_kernel() を実装する。make_kernel が返すカーネルは
+    lu, lv, uuv（作業領域）と react()（lu, lv にラプラシアンが入った状態で U, V を1ステップ更新）を持つ。
+    """
+
+    name = None
+    defaults = {}
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"{self.name} に無いパラメータ: {', '.join(sorted(unknown))}")
+        self.params = {**self.defaults, **params}
+
+    def steady_state(self):
+        raise NotImplementedError
+
+    def initial(self, shape, dtype, rng, noise):
+        """定常状態にわずかなムラを加えた初期値"""
+        u, v = self.steady_state()
+        U = (u + rng.standard_normal(shape) * noise).astype(dtype)
+        V = (v + rng.standard_normal(shape) * noise).astype(dtype)
+        return U, V
+
+    def make_kernel(self, U, V, dt):
+        raise NotImplementedError
+
+
+@register("schnakenberg")
+class Schnakenberg(Kinetics):
+    """f = a - u + u^2 v, g = b - u^2 v（更新は kernel.SchnakenbergKernel.react をそのまま使う）"""
+
+    defaults = {"a": 0.1, "b": 0.9, "Du": 0.2, "Dv": 1.0, "dt": 0.1, "u_star": None, "v_star": None}
+
+    @classmethod
+    def from_json(cls, path=None, **params):
+        """params.json（turing.mac の出力）の a, b と定常状態を使う"""
+        return cls(**{**load_params(path), **params})
+
+    def steady_state(self):
+        p = self.params
+        if p["u_star"] is not None and p["v_star"] is not None:
+            return p["u_star"], p["v_star"]
+        return p["a"] + p["b"], p["b"] / (p["a"] + p["b"]) ** 2
+
+    def make_kernel(self, U, V, dt):
+        p = self.params
+        return SchnakenbergKernel(U, V, p["a"], p["b"], p["Du"], p["Dv"], dt)
+
+
+class _Buffers:
+    """react() で使う作業領域（ステップ中に新たな確保をしない）"""
+
+    def __init__(self, U, V, dt):
+        self.U, self.V, self.dt = U, V, dt
+        self.lu = np.empty_like(U)
+        self.lv = np.empty_like(U)
+        self.uuv = np.empty_like(U)
+        self.tmp = np.empty_like(U)
+
+
+@register("gray_scott")
+class GrayScott(Kinetics):
+    """f = -u v^2 + F (1 - u), g = u v^2 - (F + k) v。一様状態 (1, 0) は安定なので、中央に種を置く。"""
+
+    defaults = {"F": 0.037, "k": 0.06, "Du": 0.16, "Dv": 0.08, "dt": 1.0, "seed_size": 0.1}
+
+    def steady_state(self):
+        return 1.0, 0.0
+
+    def initial(self, shape, dtype, rng, noise):
+        U, V = super().initial(shape, dtype, rng, noise * 0.1)
+        center = tuple(slice(int(n * (0.5 - self.params["seed_size"] / 2)),
+                             int(n * (0.5 + self.params["seed_size"] / 2)) + 1) for n in shape)
+        U[center] = 0.5
+        V[center] = 0.25
+        return U, V
+
+    def make_kernel(self, U, V, dt):
+        return _GrayScottKernel(U, V, dt, self.params)
+
+
+class _GrayScottKernel(_Buffers):
+    def __init__(self, U, V, dt, p):
+        super().__init__(U, V, dt)
+        self.F, self.k, self.Du, self.Dv = p["F"], p["k"], p["Du"], p["Dv"]
+
+    def react(self):
+        U, V, lu, lv, uvv, tmp, dt = self.U, self.V, self.lu, self.lv, self.uuv, self.tmp, self.dt
+        np.square(V, out=uvv)
+        uvv *= U
+        # U += (Du lu - u v^2 + F (1 - u)) dt
+        np.subtract(1, U, out=tmp)
+        tmp *= self.F
+        tmp -= uvv
+        lu *= self.Du
+        tmp += lu
+        tmp *= dt
+        U += tmp
+        # V += (Dv lv + u v^2 - (F + k) v) dt
+        np.multiply(V, -(self.F + self.k), out=tmp)
+        tmp += uvv
+        lv *= self.Dv
+        tmp += lv
+        tmp *= dt
+        V += tmp
+
+
+@register("fitzhugh_nagumo")
+class FitzHughNagumo(Kinetics):
+    """
+    f = u - u^3 - v, g = eps (u - a1 v - a0)。
+    既定値は拡散なしで安定、Dv/Du = 20 でチューリング不安定（波長は約6格子）。
+    """
+
+    defaults = {"eps": 3.0, "a0": 0.0, "a1": 0.5, "Du": 0.5, "Dv": 10.0, "dt": 0.01}
+
+    def steady_state(self):
+        # u - u^3 = (u - a0) / a1 の実根のうち、原点に最も近いもの
+        p = self.params
+        roots = np.roots([1.0, 0.0, 1.0 / p["a1"] - 1.0, -p["a0"] / p["a1"]])
+        u = float(min(roots[np.abs(roots.imag) < 1e-12].real, key=abs))
+        return u, u - u ** 3
+
+    def make_kernel(self, U, V, dt):
+        return _FitzHughNagumoKernel(U, V, dt, self.params)
+
+
+class _FitzHughNagumoKernel(_Buffers):
+    def __init__(self, U, V, dt, p):
+        super().__init__(U, V, dt)
+        self.p = p
+
+    def react(self):
+        U, V, lu, lv, cube, tmp, dt = self.U, self.V, self.lu, self.lv, self.uuv, self.tmp, self.dt
+        p = self.p
+        np.square(U, out=cube)
+        cube *= U
+        # U += (Du lu + u - u^3 - v) dt
+        np.subtract(U, cube, out=tmp)
+        tmp -= V
+        lu *= p["Du"]
+        tmp += lu
+        tmp *= dt
+        U += tmp
+        # V += (Dv lv + eps (u - a1 v - a0)) dt
+        np.multiply(V, -p["a1"], out=tmp)
+        tmp += U
+        tmp -= p["a0"]
+        tmp *= p["eps"]
+        lv *= p["Dv"]
+        tmp += lv
+        tmp *= dt
+        V += tmp
+
+
+class ReactionDiffusion:
+    """
+    登録された反応項で、2次元または3次元の周期格子を陽的オイラー法で進める。
+    step(n) と U を持つので、monitor / recorder とそのまま組み合わせられる。
+
+    Args:
+        kinetics (str or Kinetics): 反応項の名前（KINETICS のキー）またはインスタンス。
+        shape (tuple): 格子の形（(N, N) または (N, N, N)）。
+        dt (float): 時間刻み（既定は反応項の既定値）。
+        dtype: 場の型（np.float32 または np.float64）。
+        params (dict): 反応項のパラメータの上書き。
+        noise (float): 初期値のムラの大きさ。
+        seed (int): 乱数の種。
+        U, V (np.ndarray): 初期値（省略すると反応項の initial() で作る）。
+    """
+
+    def __init__(self, kinetics="schnakenberg", shape=(100, 100), dt=None, dtype=np.float64,
+                 params=None, noise=0.05, seed=None, U=None, V=None):
+        if len(shape) not in (2, 3):
+            raise ValueError(f"格子は2次元か3次元にしてください: {shape}")
+        if isinstance(kinetics, Kinetics):
+            self.kinetics = kinetics
+        else:
+            self.kinetics = get_kinetics(kinetics)(**(params or {}))
+        self.dtype = np.dtype(dtype)
+        self.grid_ndim = len(shape)
+        self.dt = dt or self.kinetics.params["dt"]
+        if U is None or V is None:
+            U, V = self.kinetics.initial(tuple(shape), self.dtype, np.random.default_rng(seed), noise)
+        self.U, self.V = U, V
+        self.kernel = self.kinetics.make_kernel(U, V, self.dt)
+        self.steps = 0
+
+    def step(self, n=1):
+        """n ステップ進める。"""
+        k, nd = self.kernel, self.grid_ndim
+        for _ in range(n):
+            laplacian(self.U, k.lu, k.uuv, nd)
+            laplacian(self.V, k.lv, k.uuv, nd)
+            k.react()
+        self.steps += n
+        return self.U, self.V
+
+
+def main(argv=None):
+    """python engine.py [反応項] [N] [次元] [float32|float64] [ステップ数]"""
+    import matplotlib.pyplot as plt
+
+    argv = sys.argv[1:] if argv is None else argv
+    name = argv[0] if len(argv) > 0 else "gray_scott"
+    N = int(argv[1]) if len(argv) > 1 else 128
+    ndim = int(argv[2]) if len(argv) > 2 else 2
+    dtype = argv[3] if len(argv) > 3 else "float32"
+    n_steps = int(argv[4]) if len(argv) > 4 else 5000
+
+    kinetics = Schnakenberg.from_json() if name == "schnakenberg" else get_kinetics(name)()
+    rd = ReactionDiffusion(kinetics, (N,) * ndim, dtype=dtype, seed=0)
+    print(f"{name}: {N}^{ndim} 格子, {dtype}, dt={rd.dt}, {n_steps} ステップ"
+          f"（1場 {rd.U.nbytes / 2**20:.1f} MB）")
+    rd.step(n_steps)
+
+    U = rd.U if ndim == 2 else rd.U[N // 2]
+    plt.figure(figsize=(6, 6))
+    plt.imshow(U, cmap='magma')
+    plt.title(f"{name} ({ndim}D{', mid-plane' if ndim == 3 else ''}, t={n_steps * rd.dt:g})")
+    plt.axis('off')
+    plt.show()
+    return rd
+
+
+if __name__ == "__main__":
+    main()
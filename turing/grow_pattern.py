@@ -6,46 +6,61 @@ Created on Tue Dec 23 13:14:30 2025
 @author: iwamura
 """
 
-import sys, json, numpy as np
+import sys
 import matplotlib.pyplot as plt
+from engine import ReactionDiffusion, Schnakenberg
+from monitor import ConvergenceMonitor, run_until_converged
+from recorder import SnapshotRecorder, FrameStore, render_movie_async
 
-# 1. 設計図の読み込み
-with open('params.json', 'r') as f:
-    data = json.load(f)
-a, b = data['a'], data['b']
-u_star = eval(data['u_star'].replace('^', '**'))
-v_star = eval(data['v_star'].replace('^', '**'))
-
-# 2. 初期設定
-N, dt = 100, 0.1
-Du, Dv = 0.2, 1.0
-U = u_star + np.random.randn(N, N) * 0.05
-V = v_star + np.random.randn(N, N) * 0.05
-
-def laplacian(Z):
-    return (np.roll(Z, 1, 0) + np.roll(Z, -1, 0) + np.roll(Z, 1, 1) + np.roll(Z, -1, 1) - 4 * Z)
-
-# スナップショットを格納するリスト
-history = []
-labels = ["Phase 1: Chaos", "Phase 2: Budding", "Phase 3: Mature", "Phase 4: Final"]
-checkpoints = [0, 500, 2000, 10000] # 各フェーズの計算ステップ数
-
-# 3. 計算実行と記録
-print("Calculating growth stages...")
-for step in range(10001):
-    lu, lv = laplacian(U), laplacian(V)
-    U += (a - U + U**2 * V + Du * lu) * dt
-    V += (b - U**2 * V + Dv * lv) * dt
-    
-    if step in checkpoints:
-        history.append(U.copy())
-
-# 4. 一覧表示（これが「成長の履歴表」になります）
-fig, axes = plt.subplots(1, 4, figsize=(16, 4))
-for i, ax in enumerate(axes):
-    ax.imshow(history[i], cmap='magma')
-    ax.set_title(labels[i])
-    ax.axis('off')
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+TITLES = {"chaos": "Phase 1: Chaos", "budding": "Phase 2: Budding",
+          "mature": "Phase 3: Mature", "final": "Phase 4: Final"}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # 1. 設計図の読み込み（params.json の a, b と定常状態。引数で別の .json も指定できる）
+    params_path = next((arg for arg in argv if arg.endswith('.json')), None)
+    kinetics = Schnakenberg.from_json(params_path, Du=0.2, Dv=1.0)
+
+    # 2. 初期設定（定常状態にわずかなムラを加えた 100x100 の皮膚）
+    rd = ReactionDiffusion(kinetics, (100, 100), dt=0.1)
+    U = rd.U
+
+    # スナップショットはメモリにためず、50 ステップごとにディスクへ書き出す
+    # （段階の区切りは収束モニターが自動で決め、その時点のコマ番号だけを覚えておく）
+    recorder = SnapshotRecorder('grow_pattern_frames', U.shape, every=50)
+    panels = {}
+
+    def snapshot(name, step):
+        panels[name] = recorder.record(U, step, force=True)
+
+    # 3. 計算実行と記録（模様が固まったら 10,000 ステップを待たずに打ち切る）
+    print("Calculating growth stages...")
+    monitor = ConvergenceMonitor(U, rd.dt)
+    steps = run_until_converged(rd, monitor, max_steps=10000, on_event=snapshot,
+                                on_check=lambda step: recorder.record(U, step))
+    if not monitor.converged:
+        snapshot("final", steps)
+    recorder.close()
+    print(f"{steps} ステップで終了（段階: {monitor.events}、{len(recorder)} コマを記録）")
+
+    # `python grow_pattern.py params.json movie` なら、成長の様子を GIF にする（別プロセスで書き出す）
+    if 'movie' in argv:
+        render_movie_async(recorder.path, 'grow_pattern.gif')
+        print("grow_pattern.gif を書き出しています...")
+
+    # 4. 一覧表示（これが「成長の履歴表」になります）
+    store = FrameStore(recorder.path)
+    fig, axes = plt.subplots(1, len(panels), figsize=(4 * len(panels), 4), squeeze=False)
+    for ax, (name, i) in zip(axes[0], panels.items()):
+        ax.imshow(store[i], cmap='magma')
+        ax.set_title(f"{TITLES[name]} (step {store.steps[i]})")
+        ax.axis('off')
+
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
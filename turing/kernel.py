@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 26 09:05:14 2026
+
+@author: iwamura
+"""
+
+# turing/kernel.py
+#
+# 反応拡散の1ステップを、事前に確保したバッファの上で行うカーネル。
+# np.roll を4回使うラプラシアンは、場ごと・ステップごとに格子と同じ大きさの一時配列を
+# 5つ作り、反応項の U**2 * V も式ごとに作り直すため、10,001 ステップの計算では
+# メモリ確保が支配的になる。ここではスライスで周期境界の5点ステンシルを組み、
+# 反応項も out= 指定の ufunc で計算して、ステップ中の新たな確保を無くす。
+#
+# 加算の順序は simulation.py / grow_pattern.py の式と同じにしてあるので、結果はビット単位で一致する。
+# 末尾2軸を格子とみなすので、(n, N, N) のように複数の格子を重ねた配列もそのまま扱える。
+
+import numpy as np
+
+
+def _shift_slices(ndim, axis):
+    """軸 axis に沿った (前, 後) のスライスの組"""
+    def at(s):
+        idx = [slice(None)] * ndim
+        idx[axis] = s
+        return tuple(idx)
+    return at(slice(1, None)), at(slice(None, -1)), at(slice(None, 1)), at(slice(-1, None))
+
+
+def laplacian(Z, out, scratch, grid_ndim=2):
+    """
+    周期境界のラプラシアン（2次元は5点、3次元は7点ステンシル）を out に書き込む
+    （scratch は Z と同じ形の作業領域）。末尾 grid_ndim 軸を格子とみなす。
+    2次元では np.roll(Z, 1, 0) + np.roll(Z, -1, 0) + np.roll(Z, 1, 1) + np.roll(Z, -1, 1) - 4 * Z と
+    同じ順で加算する。
+    """
+    for i, axis in enumerate(range(Z.ndim - grid_ndim, Z.ndim)):
+        tail, head, first, last = _shift_slices(Z.ndim, axis)
+        # 手前の隣接セル（端は反対側から回り込む）。最初の軸は out への代入で初期化を兼ねる
+        if i == 0:
+            out[tail] = Z[head]
+            out[first] = Z[last]
+        else:
+            out[tail] += Z[head]
+            out[first] += Z[last]
+        # 奥の隣接セル
+        out[head] += Z[tail]
+        out[last] += Z[first]
+    np.multiply(Z, 2 * grid_ndim, out=scratch)
+    out -= scratch
+    return out
+
+
+class SchnakenbergKernel:
+    """
+    Schnakenberg 系を陽的オイラー法で進めるカーネル。U, V はその場で更新する。
+
+        U += (a - U + U**2 * V + Du * ∇²U) * dt
+        V += (b - U**2 * V + Dv * ∇²V) * dt
+
+    sequential=True（既定）はスクリプトと同じく、V の更新に更新後の U を使う。
+    sequential=False では U**2 * V を1回だけ計算し、U と V を同じ時刻の値から更新する。
+    a, b, Du, Dv は (n, 1, 1) のように格子ごとの配列でもよい。
+
+    Args:
+        U, V (np.ndarray): 濃度場（末尾2軸が格子）。
+        a, b (float or array): 反応パラメータ。
+        Du, Dv (float or array): 拡散係数。
+        dt (float): 時間刻み。
+    """
+
+    def __init__(self, U, V, a, b, Du, Dv, dt, sequential=True):
+        if U.shape != V.shape:
+            raise ValueError(f"U と V の形が一致しません: {U.shape} と {V.shape}")
+        self.U, self.V = U, V
+        self.a, self.b, self.Du, self.Dv, self.dt = a, b, Du, Dv, dt
+        self.sequential = sequential
+        # ステップ中に使う作業領域（ここで1回だけ確保する）
+        self.lu = np.empty_like(U)
+        self.lv = np.empty_like(U)
+        self.uuv = np.empty_like(U)
+        self.tmp = np.empty_like(U)
+
+    def step(self, n=1):
+        """n ステップ進める。"""
+        for _ in range(n):
+            laplacian(self.U, self.lu, self.uuv)
+            laplacian(self.V, self.lv, self.uuv)
+            self.react()
+        return self.U, self.V
+
+    def react(self):
+        """self.lu, self.lv に入ったラプラシアンを使って U, V を1ステップ更新する（lu, lv は壊れる）。"""
+        U, V, lu, lv, uuv, tmp = self.U, self.V, self.lu, self.lv, self.uuv, self.tmp
+        a, b, Du, Dv, dt = self.a, self.b, self.Du, self.Dv, self.dt
+
+        # U += (a - U + U**2 * V + Du * lu) * dt
+        np.square(U, out=uuv)
+        uuv *= V
+        np.subtract(a, U, out=tmp)
+        tmp += uuv
+        lu *= Du
+        tmp += lu
+        tmp *= dt
+        U += tmp
+
+        # V += (b - U**2 * V + Dv * lv) * dt
+        if self.sequential:
+            np.square(U, out=uuv)
+            uuv *= V
+        np.subtract(b, uuv, out=tmp)
+        lv *= Dv
+        tmp += lv
+        tmp *= dt
+        V += tmp
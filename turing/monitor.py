@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 30 09:27:41 2026
+
+@author: iwamura
+"""
+
+# turing/monitor.py
+#
+# 模様の成長の収束判定と、成長段階の自動検出。
+# grow_pattern.py は模様が固まったかどうかに関係なく 10,001 ステップ、simulation.py は 5,000 ステップ
+# 回し、段階の区切りも固定のステップ番号だった。ここでは every ステップごとに
+#   - dU/dt の RMS（前回の確認時からの差分 / 経過時間）
+#   - U の標準偏差（模様の振幅）と支配的な波数
+# を記録し、dU/dt が tol 未満になったら打ち切る。段階の区切り（芽生え・成熟・完成）もこの記録から決める。
+# 確認は every ステップに1回、格子1枚のコピーと FFT だけなので、ステップ本体に比べて十分軽い。
+
+import numpy as np
+
+from spectral import dominant_wavenumber
+
+PHASES = ("chaos", "budding", "mature", "final")
+
+
+class ConvergenceMonitor:
+    """
+    U の時間変化を見張り、収束と成長段階を判定する。
+
+    段階は次の時点とする。
+        chaos   : 開始時（ステップ 0）
+        budding : 振幅（U の標準偏差）が、それまでの最小値の growth 倍を超えた時点
+        mature  : 芽生えの後、振幅の変化が 1 回の確認あたり saturation 未満で、支配的な波数も
+                  変わらない状態が patience 回続いた時点
+        final   : dU/dt の RMS が tol 未満になった時点（ここで打ち切る）
+
+    Args:
+        U (np.ndarray): 見張る濃度場（カーネルがその場で更新する配列）。
+        dt (float): カーネルの時間刻み。
+        every (int): 確認の間隔 [ステップ]。
+        tol (float): 収束とみなす dU/dt の RMS。
+        patience (int): 波数が変わらない確認の回数。
+        growth (float): 芽生えとみなす振幅の増加率。
+        saturation (float): 振幅が飽和したとみなす相対変化。
+    """
+
+    def __init__(self, U, dt, every=50, tol=1e-5, patience=3, growth=2.0, saturation=0.01):
+        self.U = U
+        self.dt, self.every, self.tol = dt, every, tol
+        self.patience, self.growth, self.saturation = patience, growth, saturation
+        self.step = 0
+        self.records = []  # (step, dU/dt の RMS, 振幅, 支配的な波数)
+        self.events = {"chaos": 0}
+        self._prev = U.copy()
+        self._min_std = float(U.std())
+        self._steady = 0
+
+    @property
+    def converged(self):
+        return "final" in self.events
+
+    def update(self, n_steps):
+        """
+        カーネルが n_steps 進んだ後に呼ぶ。
+
+        Returns:
+            list: この確認で新たに到達した段階の名前。
+
+        Raises:
+            FloatingPointError: U に NaN や無限大が現れた（積分が発散した）場合。
+        """
+        self.step += n_steps
+        rate = float(np.sqrt(np.mean((self.U - self._prev) ** 2))) / (n_steps * self.dt)
+        if not np.isfinite(rate):
+            raise FloatingPointError(f"ステップ {self.step} までに積分が発散しました")
+        std = float(self.U.std())
+        k = int(dominant_wavenumber(self.U))
+        np.copyto(self._prev, self.U)
+        last_std, last_k = self.records[-1][2:] if self.records else (std, None)
+        self.records.append((self.step, rate, std, k))
+
+        new = []
+        if "budding" not in self.events:
+            self._min_std = min(self._min_std, std)
+            if std > self.growth * self._min_std:
+                new.append("budding")
+        elif "mature" not in self.events:
+            steady = k == last_k and abs(std - last_std) < self.saturation * std
+            self._steady = self._steady + 1 if steady else 0
+            if self._steady >= self.patience:
+                new.append("mature")
+        if rate < self.tol:
+            new.append("final")
+        for name in new:
+            self.events[name] = self.step
+        return new
+
+    def history(self):
+        """記録を (step, rate, amplitude, k_peak) の列ごとの配列で返す。"""
+        return dict(zip(("step", "rate", "amplitude", "k_peak"), np.array(self.records).T))
+
+
+def run_until_converged(kernel, monitor, max_steps, on_event=None, on_check=None):
+    """
+    kernel を monitor.every ステップずつ進め、収束するか max_steps に達したら止める。
+
+    Args:
+        kernel: step(n) を持つカーネル（kernel / spectral / tiled のいずれか）。
+        monitor (ConvergenceMonitor): kernel の U を見張るモニター。
+        max_steps (int): 最大ステップ数。
+        on_event (callable): 段階に達するたびに on_event(name, step) を呼ぶ（開始時の chaos を含む）。
+        on_check (callable): 確認のたびに on_check(step) を呼ぶ（スナップショットの記録など）。
+
+    Returns:
+        int: 実際に進めたステップ数。
+    """
+    if on_event:
+        on_event("chaos", 0)
+    while monitor.step < max_steps and not monitor.converged:
+        n = min(monitor.every, max_steps - monitor.step)
+        kernel.step(n)
+        for name in monitor.update(n):
+            if on_event:
+                on_event(name, monitor.step)
+        if on_check:
+            on_check(monitor.step)
+    return monitor.step
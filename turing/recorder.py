@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 31 10:15:08 2026
+
+@author: iwamura
+"""
+
+# turing/recorder.py
+#
+# 反応拡散のスナップショットを、圧縮したチャンク単位でディスクへ書き出すレコーダー。
+# grow_pattern.py は U.copy() を Python のリスト history にためていたので、大きな格子で
+# 1,000 コマも記録するとメモリが際限なく増える。ここでは指定した間隔でコマを取り、
+# 上限付きのキューを介して書き出し用のスレッドへ渡す。スレッドは chunk コマずつ zlib で圧縮して
+# frames.bin の末尾に書き足す（zlib は圧縮中に GIL を手放すので、計算はほとんど止まらない）。
+# 読み出しは FrameStore で、コマ番号を指定して任意の位置から取り出せる。
+# 動画（MP4 / GIF）の書き出しは別プロセスで行う。
+#
+# 保存形式（ディレクトリ）:
+#   frames.bin : 圧縮したチャンクを順に並べたもの
+#   meta.json  : 格子の形・型・チャンクの位置 (offset, length, コマ数)・各コマのステップ番号
+
+import json
+import os
+import queue
+import threading
+import zlib
+import multiprocessing as mp
+
+import numpy as np
+
+DEFAULT_CHUNK = 8    # 1チャンクのコマ数
+DEFAULT_QUEUE = 16   # 書き出し待ちのコマ数の上限（これを超えると計算側が待つ）
+
+
+def _write_meta(path, meta):
+    tmp = os.path.join(path, f"meta.json.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+class SnapshotRecorder:
+    """
+    スナップショットを every ステップごとにディスクへ書き出すレコーダー。
+
+    Args:
+        path (str): 保存先のディレクトリ（既存の記録は上書きする）。
+        shape (tuple): 1コマの形。
+        every (int): 記録の間隔 [ステップ]。
+        dtype: 保存する型（既定は float32）。
+        chunk (int): 1チャンクのコマ数。
+        level (int): zlib の圧縮レベル。
+        max_queue (int): 書き出し待ちのコマ数の上限。
+    """
+
+    def __init__(self, path, shape, every=100, dtype=np.float32, chunk=DEFAULT_CHUNK, level=1,
+                 max_queue=DEFAULT_QUEUE):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.every = every
+        self.chunk, self.level = chunk, level
+        self.meta = {"shape": list(shape), "dtype": np.dtype(dtype).str, "chunk": chunk,
+                     "chunks": [], "steps": []}
+        self._dtype = np.dtype(dtype)
+        self._file = open(os.path.join(path, "frames.bin"), "wb")
+        _write_meta(path, self.meta)
+        self._last = None  # 最後に記録したステップ
+        self._queued = 0   # キューに入れたコマ数（＝次のコマ番号）
+        self._queue = queue.Queue(max_queue)
+        self._error = None
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return self._queued
+
+    def record(self, U, step, force=False):
+        """
+        前回の記録から every ステップ以上進んでいれば（force=True なら必ず）U を記録する。
+
+        Returns:
+            int or None: 記録したコマの番号（記録しなかった場合は None）。
+        """
+        if self._error is not None:
+            raise self._error
+        if not force and self._last is not None and step - self._last < self.every:
+            return None
+        if step == self._last:
+            return self._queued - 1
+        self._queue.put((int(step), np.array(U, dtype=self._dtype, copy=True)))
+        self._last = step
+        self._queued += 1
+        return self._queued - 1
+
+    def _writer(self):
+        frames, steps = [], []
+        try:
+            while True:
+                item = self._queue.get()
+                if item is not None:
+                    steps.append(item[0])
+                    frames.append(item[1])
+                if frames and (item is None or len(frames) == self.chunk):
+                    blob = zlib.compress(np.stack(frames).tobytes(), self.level)
+                    offset = self._file.tell()
+                    self._file.write(blob)
+                    self._file.flush()
+                    self.meta["chunks"].append([offset, len(blob), len(frames)])
+                    self.meta["steps"].extend(steps)
+                    _write_meta(self.path, self.meta)
+                    frames, steps = [], []
+                if item is None:
+                    return
+        except Exception as e:  # 計算側の次の record() / close() で投げ直す
+            self._error = e
+            while self._queue.get() is not None:
+                pass
+
+    def close(self):
+        """書き出し待ちのコマを全て書き終えてからファイルを閉じる。"""
+        if self._file.closed:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameStore:
+    """
+    SnapshotRecorder の記録を読み出す。store[i] で i 番目のコマ、store.steps でステップ番号を返す。
+    直近に展開したチャンクを1つだけ保持するので、順に読む場合も展開はチャンクごとに1回で済む。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.shape = tuple(meta["shape"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.steps = np.array(meta["steps"], dtype=np.int64)
+        self._chunks = meta["chunks"]
+        self._starts = np.cumsum([0] + [c[2] for c in self._chunks])
+        self._cached = (None, None)
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def _chunk(self, j):
+        if self._cached[0] != j:
+            offset, length, n = self._chunks[j]
+            with open(os.path.join(self.path, "frames.bin"), "rb") as f:
+                f.seek(offset)
+                raw = zlib.decompress(f.read(length))
+            self._cached = (j, np.frombuffer(raw, dtype=self.dtype).reshape((n,) + self.shape))
+        return self._cached[1]
+
+    def __getitem__(self, i):
+        n = len(self)
+        i = i + n if i < 0 else i
+        if not 0 <= i < n:
+            raise IndexError(f"コマ番号 {i} は範囲外です（全 {n} コマ）")
+        j = int(np.searchsorted(self._starts, i, side="right")) - 1
+        return self._chunk(j)[i - self._starts[j]]
+
+    def at_step(self, step):
+        """ステップ番号 step 以前で最も新しいコマを返す。"""
+        i = int(np.searchsorted(self.steps, step, side="right")) - 1
+        return self[max(i, 0)]
+
+
+def render_movie(path, out, fps=20, cmap="magma", stride=1):
+    """
+    記録を動画に書き出す（拡張子が .gif なら Pillow、それ以外は ffmpeg を使う）。
+    色の範囲は全コマで固定する。
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib import animation
+
+    store = FrameStore(path)
+    idx = range(0, len(store), stride)
+    lo = min(float(store[i].min()) for i in idx)
+    hi = max(float(store[i].max()) for i in idx)
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    im = ax.imshow(store[0], cmap=cmap, vmin=lo, vmax=hi)
+    title = ax.set_title("")
+    ax.axis('off')
+
+    def update(i):
+        im.set_data(store[i])
+        title.set_text(f"step {store.steps[i]}")
+        return im, title
+
+    writer = animation.PillowWriter(fps=fps) if out.lower().endswith(".gif") else animation.FFMpegWriter(fps=fps)
+    animation.FuncAnimation(fig, update, frames=idx, blit=False).save(out, writer=writer)
+    plt.close(fig)
+    return out
+
+
+def render_movie_async(path, out, **kwargs):
+    """render_movie を別プロセスで実行し、その Process を返す（join() で終了を待てる）。"""
+    proc = mp.get_context().Process(target=render_movie, args=(path, out), kwargs=kwargs, daemon=False)
+    proc.start()
+    return proc
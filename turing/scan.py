@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 28 09:41:26 2026
+
+@author: iwamura
+"""
+
+# turing/scan.py
+#
+# パラメータ空間 (a, b, Du, Dv) の一括走査。
+# simulation.py は params.json の (a, b) 1組につき 100x100 の格子を1つ計算するだけなので、
+# 模様ができる範囲を調べるにはスクリプトを何百回も回すことになる。ここでは全ての組を
+# (n, N, N) の3次元配列に積み、格子ごとのパラメータ（形状 (n, 1, 1)）で一度に時間発展させる。
+# 最終状態は振幅・歪度・支配的な波数という安価な特徴量で 一様 / 斑点 / 縞 に分類し、
+# CSV と相図に書き出す。
+
+import csv
+import itertools
+import sys
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from kernel import SchnakenbergKernel
+from spectral import SpectralKernel, dominant_wavenumber, steady_state
+
+CLASSES = ("uniform", "spots", "stripes", "diverged")
+UNIFORM_TOL = 1e-3  # 相対振幅 std/mean がこれ未満なら一様
+SKEW_SPOTS = 0.5    # |歪度| がこれを超えれば斑点（縞は歪度がほぼ 0）
+
+
+def parameter_grid(a_values, b_values, Du_values, Dv_values):
+    """全ての組 (a, b, Du, Dv) を並べた形状 (n, 4) の配列"""
+    return np.array(list(itertools.product(a_values, b_values, Du_values, Dv_values)), dtype=float)
+
+
+def turing_unstable(a, b, Du, Dv):
+    """
+    一様定常状態がチューリング不安定か（線形安定性解析、配列可）。
+    拡散なしで安定（tr J < 0, det J > 0）かつ Dv fu + Du gv > 2 sqrt(Du Dv det J)。
+    """
+    u, v = steady_state(np.asarray(a, float), np.asarray(b, float))
+    fu, fv, gu, gv = 2 * u * v - 1, u ** 2, -2 * u * v, -u ** 2
+    det = fu * gv - fv * gu
+    return (fu + gv < 0) & (det > 0) & (Dv * fu + Du * gv > 2 * np.sqrt(Du * Dv * np.maximum(det, 0)))
+
+
+def simulate(params, N=100, T_end=200.0, method="spectral", dt=None, noise=0.05, seed=0):
+    """
+    params の全ての組を (n, N, N) の格子に積んで T_end まで一括で進める。
+
+    Args:
+        params (np.ndarray): parameter_grid の出力（形状 (n, 4)）。
+        method (str): "spectral"（SpectralKernel、既定 dt=0.5）または
+            "explicit"（SchnakenbergKernel、既定 dt は最大の拡散係数での安定条件）。
+            "spectral" で発散した組（振幅の大きい振動領域で非線形項の陽的な扱いが不安定になる）は、
+            同じ初期値から "explicit" で計算し直す。
+
+    Returns:
+        np.ndarray: 最終状態の U（形状 (n, N, N)）。
+    """
+    a, b, Du, Dv = (params[:, i].reshape(-1, 1, 1) for i in range(4))
+    u_star, v_star = steady_state(a, b)
+    rng = np.random.default_rng(seed)
+    U = u_star + rng.standard_normal((len(params), N, N)) * noise
+    V = v_star + rng.standard_normal((len(params), N, N)) * noise
+
+    if method == "spectral":
+        U0, V0 = U.copy(), V.copy()
+        dt = dt or 0.5
+        kernel = SpectralKernel(U, V, a, b, Du, Dv, dt)
+    elif method == "explicit":
+        dt = dt or min(0.1, 0.5 / (4 * params[:, 2:].max() + 2))
+        kernel = SchnakenbergKernel(U, V, a, b, Du, Dv, dt)
+    else:
+        raise ValueError(f"未知の積分法: {method}")
+    n_steps = int(round(T_end / dt))
+    with np.errstate(over="ignore", invalid="ignore"):
+        kernel.step(n_steps)
+
+    if method == "spectral":
+        bad = ~np.isfinite(U).all(axis=(-2, -1))
+        if bad.any():
+            print(f"  spectral で発散した {np.count_nonzero(bad)} 組を explicit で計算し直します")
+            U[bad] = _rerun_explicit(params[bad], U0[bad], V0[bad], T_end)
+    return U
+
+
+def _rerun_explicit(params, U, V, T_end):
+    a, b, Du, Dv = (params[:, i].reshape(-1, 1, 1) for i in range(4))
+    dt = min(0.1, 0.5 / (4 * params[:, 2:].max() + 2))
+    n_steps = int(round(T_end / dt))
+    with np.errstate(over="ignore", invalid="ignore"):
+        SchnakenbergKernel(U, V, a, b, Du, Dv, T_end / n_steps).step(n_steps)
+    return U
+
+
+def features(U):
+    """
+    格子ごとの特徴量。
+
+    Returns:
+        dict: amplitude（std/mean）、skewness、k_peak（支配的な波数）、finite の各配列。
+    """
+    finite = np.isfinite(U).all(axis=(-2, -1))
+    Z = np.where(finite[:, None, None], U, 0.0)
+    mean = Z.mean(axis=(-2, -1))
+    std = Z.std(axis=(-2, -1))
+    dev = Z - mean[:, None, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skew = np.where(std > 0, (dev ** 3).mean(axis=(-2, -1)) / std ** 3, 0.0)
+        amplitude = np.where(mean != 0, std / np.abs(mean), 0.0)
+    return {"amplitude": amplitude, "skewness": skew, "k_peak": dominant_wavenumber(Z), "finite": finite}
+
+
+def classify(feat):
+    """特徴量から CLASSES の分類名の配列を返す。"""
+    label = np.where(np.abs(feat["skewness"]) > SKEW_SPOTS, "spots", "stripes").astype(object)
+    label[feat["amplitude"] < UNIFORM_TOL] = "uniform"
+    label[~feat["finite"]] = "diverged"
+    return label
+
+
+def write_csv(path, params, feat, labels):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["a", "b", "Du", "Dv", "class", "amplitude", "skewness", "k_peak", "turing_unstable"])
+        unstable = turing_unstable(*params.T)
+        for p, lab, amp, sk, k, tu in zip(params, labels, feat["amplitude"], feat["skewness"],
+                                          feat["k_peak"], unstable):
+            writer.writerow([*(f"{x:g}" for x in p), lab, f"{amp:.6g}", f"{sk:.4f}", int(k), int(tu)])
+
+
+def plot_phase_diagram(params, labels, path=None):
+    """(Du, Dv) の組ごとに、(a, b) 平面の分類と線形安定性解析のチューリング領域を描く。"""
+    colors = {"uniform": "lightgray", "spots": "tab:red", "stripes": "tab:blue", "diverged": "black"}
+    pairs = sorted({(Du, Dv) for Du, Dv in params[:, 2:]})
+    fig, axes = plt.subplots(1, len(pairs), figsize=(6 * len(pairs), 5), squeeze=False)
+    for ax, (Du, Dv) in zip(axes[0], pairs):
+        sel = (params[:, 2] == Du) & (params[:, 3] == Dv)
+        a, b = params[sel, 0], params[sel, 1]
+        for name in CLASSES:
+            m = labels[sel] == name
+            if m.any():
+                ax.scatter(a[m], b[m], c=colors[name], s=40, marker="s", label=name)
+        aa, bb = np.meshgrid(np.linspace(a.min(), a.max(), 200), np.linspace(b.min(), b.max(), 200))
+        ax.contour(aa, bb, turing_unstable(aa, bb, Du, Dv).astype(float), levels=[0.5],
+                   colors="k", linestyles="--")
+        ax.set_title(f"Turing Phase Diagram (Du={Du:g}, Dv={Dv:g})")
+        ax.set_xlabel("a")
+        ax.set_ylabel("b")
+        ax.legend(loc="upper right")
+    plt.tight_layout()
+    if path:
+        plt.savefig(path, dpi=120)
+    plt.show()
+
+
+def run_scan(a_values=None, b_values=None, Du_values=(1.0,), Dv_values=(20.0,), N=100, T_end=200.0,
+             method="spectral", csv_path="turing_scan.csv", png_path="turing_phase.png"):
+    """既定では (a, b) の 20x20 = 400 組を1回の一括計算で走査する。"""
+    a_values = np.linspace(0.02, 0.4, 20) if a_values is None else a_values
+    b_values = np.linspace(0.4, 2.0, 20) if b_values is None else b_values
+    params = parameter_grid(a_values, b_values, Du_values, Dv_values)
+    print(f"{len(params)} 組を {N}x{N} の格子で一括計算します（{method}, T={T_end:g}）")
+    U = simulate(params, N=N, T_end=T_end, method=method)
+    feat = features(U)
+    labels = classify(feat)
+    write_csv(csv_path, params, feat, labels)
+    for name in CLASSES:
+        print(f"  {name:>8}: {np.count_nonzero(labels == name)}")
+    plot_phase_diagram(params, labels, png_path)
+    return params, feat, labels
+
+
+if __name__ == "__main__":
+    run_scan(method=sys.argv[1] if len(sys.argv) > 1 else "spectral")
@@ -6,43 +6,59 @@ Created on Tue Dec 23 12:17:52 2025
 @author: iwamura
 """
 
-import sys, json, numpy as np
+import sys
 import matplotlib.pyplot as plt
+from engine import ReactionDiffusion, Schnakenberg
+from spectral import SpectralKernel
+from tiled import TiledKernel
+from monitor import ConvergenceMonitor, run_until_converged
 
-# JSONの読み込み
-with open('params.json', 'r') as f:
-    data = json.load(f)
 
-# エラー修正：evalする前に変数 a, b を定義する
-a = data['a']
-b = data['b']
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
 
-# Maximaから来た "a+b" などの数式を、上のa, bを使って数値に変える
-u_star = eval(data['u_star'].replace('^', '**'))
-v_star = eval(data['v_star'].replace('^', '**'))
+    # params.json（turing.mac の出力）の a, b と、Maxima が導いた定常状態を読む
+    # --- マクロな設定：どんな模様になるか（拡散係数） ---
+    Du, Dv = 0.2, 1.0  # この比率が「模様の種」を育てる
+    kinetics = Schnakenberg.from_json(Du=Du, Dv=Dv)
+    p = kinetics.params
+    u_star, v_star = kinetics.steady_state()
+    print(f"Calculated Steady State: u*={u_star}, v*={v_star}")
 
-print(f"Calculated Steady State: u*={u_star}, v*={v_star}")
+    # `python simulation.py tiled 4096` では格子を帯に分け、全コアで並列に計算する
+    mode = argv[0] if argv else ''
+    N = int(argv[1]) if mode == 'tiled' and len(argv) > 1 else 100
+    dt = 0.1
 
-# --- マクロな設定：どんな模様になるか（拡散係数） ---
-N, dt = 100, 0.1
-Du, Dv = 0.2, 1.0  # この比率が「模様の種」を育てる
+    # 初期の皮膚の状態（わずかなムラがある）
+    rd = ReactionDiffusion(kinetics, (N, N), dt=dt)
+    U, V = rd.U, rd.V
 
-# 初期の皮膚の状態（わずかなムラがある）
-U = u_star + np.random.randn(N, N) * 0.05
-V = v_star + np.random.randn(N, N) * 0.05
+    # 生命の自律計算ループ（作業領域を使い回すカーネルで U, V をその場で更新）
+    # `python simulation.py spectral` ではフーリエ空間の半陰的積分器で、同じ時刻 t=500 まで dt=1.0 で進める
+    # どのカーネルでも、模様が定常になったら（dU/dt が十分小さくなったら）打ち切る
+    if mode == 'spectral':
+        kernel, dt, max_steps = SpectralKernel(U, V, p['a'], p['b'], Du, Dv, dt=1.0), 1.0, 500
+    elif mode == 'tiled':
+        kernel, max_steps = TiledKernel(U, V, p['a'], p['b'], Du, Dv, dt), 5000
+    else:
+        kernel, max_steps = rd, 5000
+    monitor = ConvergenceMonitor(U, dt)
+    try:
+        steps = run_until_converged(kernel, monitor, max_steps)
+    finally:
+        # 発散（FloatingPointError）で抜けた場合も、共有メモリとワーカーを必ず片付ける
+        if mode == 'tiled':
+            kernel.close()
+    print(f"{steps} ステップで終了（段階: {monitor.events}）")
 
-def laplacian(Z):
-    return (np.roll(Z, 1, 0) + np.roll(Z, -1, 0) + np.roll(Z, 1, 1) + np.roll(Z, -1, 1) - 4 * Z)
+    # 可視化
+    plt.figure(figsize=(6, 6))
+    plt.imshow(U, cmap='magma')
+    plt.title("Morphogenesis: Chemical Pattern Formation")
+    plt.axis('off')
+    plt.show()
 
-# 生命の自律計算ループ
-for _ in range(5000):
-    lu, lv = laplacian(U), laplacian(V)
-    U += (a - U + U**2 * V + Du * lu) * dt
-    V += (b - U**2 * V + Dv * lv) * dt
 
-# 可視化
-plt.figure(figsize=(6, 6))
-plt.imshow(U, cmap='magma')
-plt.title("Morphogenesis: Chemical Pattern Formation")
-plt.axis('off')
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 27 10:22:47 2026
+
+@author: iwamura
+"""
+
+# turing/spectral.py
+#
+# 拡散項と反応項の線形部分をフーリエ空間で陰的に、残りの非線形項を陽的に扱う半陰的積分器。
+# 陽的オイラー法の刻み幅は、拡散項（dt < 1/(4 Dv)）と反応項のヤコビアンの両方の安定条件で
+# 決まる。周期境界の5点ラプラシアンは離散フーリエ変換で対角化できる（固有値 2cos(kx)+2cos(ky)-4）
+# ので、定常状態 (u*, v*) まわりの線形化 A_k = J + diag(Du λ_k, Dv λ_k) をモードごとの
+# 2x2 連立方程式として陰的に解けば、刻み幅は非線形項の精度だけで選べる。
+# 空間離散化は kernel.py と同じなので、dt → 0 では陽的スキームと同じ解に収束する。
+
+import sys
+
+import numpy as np
+
+try:
+    from scipy import fft as _fft
+    _FFT_KW = {"workers": -1}
+except ImportError:
+    _fft = np.fft
+    _FFT_KW = {}
+
+
+def _rfft2(x):
+    return _fft.rfft2(x, **_FFT_KW)
+
+
+def _irfft2(x, shape):
+    return _fft.irfft2(x, s=shape[-2:], **_FFT_KW)
+
+
+def laplacian_symbol(shape):
+    """周期境界の5点ラプラシアンの固有値（rfft2 の周波数配置、形状 (ny, nx//2+1)）"""
+    ny, nx = shape[-2:]
+    ky = 2 * np.pi * np.fft.fftfreq(ny)
+    kx = 2 * np.pi * np.fft.rfftfreq(nx)
+    return (2 * np.cos(ky)[:, None] - 2) + (2 * np.cos(kx)[None, :] - 2)
+
+
+def steady_state(a, b):
+    """Schnakenberg 系の一様定常状態 (u*, v*)（turing.mac の解 u* = a+b, v* = b/(a+b)^2）"""
+    return a + b, b / (a + b) ** 2
+
+
+def dominant_wavenumber(U):
+    """
+    模様の支配的な波数（格子1周あたりの波の数、方位平均したパワースペクトルの最大）。
+    一様な場では 0 を返す。末尾2軸を格子とみなし、(n, N, N) なら格子ごとに返す。
+    """
+    ny, nx = U.shape[-2:]
+    power = np.abs(np.fft.rfft2(U - U.mean(axis=(-2, -1), keepdims=True))) ** 2
+    k = np.hypot(np.fft.fftfreq(ny)[:, None] * ny, np.fft.rfftfreq(nx)[None, :] * nx)
+    shell = np.rint(k).astype(np.intp).ravel()
+    flat = power.reshape(-1, shell.size)
+    radial = np.array([np.bincount(shell, p) for p in flat])[:, 1:]
+    peak = np.where(radial.max(axis=1) > 1e-20 * ny * nx, np.argmax(radial, axis=1) + 1, 0)
+    return peak.reshape(U.shape[:-2])
+
+
+class _Inverse2x2:
+    """モードごとの 2x2 行列 c I - s A_k の逆行列（A_k = J + diag(Du λ, Dv λ)）"""
+
+    def __init__(self, J, Du, Dv, lam, c, s):
+        (j11, j12), (j21, j22) = J
+        m11 = c - s * (j11 + Du * lam)
+        m12 = -s * j12 + 0 * lam
+        m21 = -s * j21 + 0 * lam
+        m22 = c - s * (j22 + Dv * lam)
+        det = m11 * m22 - m12 * m21
+        self.i11, self.i12, self.i21, self.i22 = m22 / det, -m12 / det, -m21 / det, m11 / det
+
+    def solve(self, ru, rv):
+        return self.i11 * ru + self.i12 * rv, self.i21 * ru + self.i22 * rv
+
+
+class SpectralKernel:
+    """
+    Schnakenberg 系の半陰的スペクトル積分器。kernel.SchnakenbergKernel と同じ使い方で、
+    step() のたびに U, V をその場で更新する。
+
+        d(u, v)/dt = A (u, v) + N(u, v)    （u = U - u*, v = V - v*）
+        A: 拡散 + 反応項のヤコビアン J（陰的）、N: 残りの非線形項（陽的）
+
+    Args:
+        U, V (np.ndarray): 濃度場（末尾2軸が周期境界の格子、(n, N, N) の一括計算も可）。
+        a, b, Du, Dv: パラメータ（格子ごとの配列なら (n, 1, 1) の形）。
+        dt (float): 時間刻み（陽的オイラー法よりはるかに大きく取れる）。
+        scheme (str): "sbdf2"（2次の半陰的BDF、既定）または "imex"（1次の半陰的オイラー）。
+    """
+
+    def __init__(self, U, V, a, b, Du, Dv, dt, scheme="sbdf2"):
+        if U.shape != V.shape:
+            raise ValueError(f"U と V の形が一致しません: {U.shape} と {V.shape}")
+        if scheme not in ("sbdf2", "imex"):
+            raise ValueError(f"未知のスキーム: {scheme}")
+        self.U, self.V = U, V
+        self.a, self.b, self.dt, self.scheme = a, b, dt, scheme
+        self.u_star, self.v_star = steady_state(a, b)
+        uv = self.u_star * self.v_star
+        uu = self.u_star ** 2
+        self.J = ((2 * uv - 1, uu), (-2 * uv, -uu))
+
+        lam = laplacian_symbol(U.shape)
+        self._euler = _Inverse2x2(self.J, Du, Dv, lam, 1.0, dt)
+        self._bdf2 = _Inverse2x2(self.J, Du, Dv, lam, 1.5, dt) if scheme == "sbdf2" else None
+        self._prev = None  # SBDF2 の1ステップ前の (û, v̂, N̂u, N̂v)
+        self.uuv = np.empty_like(U)
+
+    def _nonlinear(self):
+        """N = R(U, V) - J (U - u*, V - v*) のフーリエ変換"""
+        U, V, uuv = self.U, self.V, self.uuv
+        (j11, j12), (j21, j22) = self.J
+        du, dv = U - self.u_star, V - self.v_star
+        np.square(U, out=uuv)
+        uuv *= V
+        Nu = self.a - U + uuv - j11 * du - j12 * dv
+        Nv = self.b - uuv - j21 * du - j22 * dv
+        return _rfft2(Nu), _rfft2(Nv)
+
+    def step(self, n=1):
+        """n ステップ進める（1ステップあたり順変換4回・逆変換2回）。"""
+        U, V, dt = self.U, self.V, self.dt
+        for _ in range(n):
+            # û, v̂ は毎ステップ実数の場から求め直す（係数のまま持ち越すと、irfft2 が捨てる
+            # 非エルミートな成分がチューリング不安定なモードで増幅される）
+            uh, vh = _rfft2(U - self.u_star), _rfft2(V - self.v_star)
+            Nu, Nv = self._nonlinear()
+            if self._bdf2 is None or self._prev is None:
+                # 半陰的オイラー: (I - dt A) w' = w + dt N
+                new = self._euler.solve(uh + dt * Nu, vh + dt * Nv)
+            else:
+                # SBDF2: (3/2 I - dt A) w' = 2w - w_prev/2 + dt (2N - N_prev)
+                uh0, vh0, Nu0, Nv0 = self._prev
+                new = self._bdf2.solve(2 * uh - 0.5 * uh0 + dt * (2 * Nu - Nu0),
+                                       2 * vh - 0.5 * vh0 + dt * (2 * Nv - Nv0))
+            if self._bdf2 is not None:
+                self._prev = (uh, vh, Nu, Nv)
+            U[...] = _irfft2(new[0], U.shape) + self.u_star
+            V[...] = _irfft2(new[1], V.shape) + self.v_star
+        return U, V
+
+
+def compare(T_end=200.0, dt=0.5, scheme="sbdf2", N=100, a=0.1, b=0.9, Du=1.0, Dv=20.0, seed=0):
+    """
+    同じ初期値から陽的オイラー法とスペクトル積分器で T_end まで進め、結果の差を返す。
+    陽的スキームの刻みは安定条件いっぱいの 0.5 / (4 Dv + 2) とする。
+    既定のパラメータ（Dv/Du = 20）はチューリング不安定で、T_end までに模様が成熟する。
+
+    Returns:
+        dict: 相対 L2 誤差・相関係数・支配的な波数（陽的, スペクトル）・ステップ数・計算時間 [s]。
+    """
+    import time
+    from kernel import SchnakenbergKernel
+
+    rng = np.random.default_rng(seed)
+    u_star, v_star = steady_state(a, b)
+    U0 = u_star + rng.standard_normal((N, N)) * 0.05
+    V0 = v_star + rng.standard_normal((N, N)) * 0.05
+
+    dt_explicit = 0.5 / (4 * Dv + 2)
+    n_explicit = int(round(T_end / dt_explicit))
+    U1, V1 = U0.copy(), V0.copy()
+    t = time.perf_counter()
+    SchnakenbergKernel(U1, V1, a, b, Du, Dv, T_end / n_explicit).step(n_explicit)
+    t_explicit = time.perf_counter() - t
+
+    n_spectral = int(round(T_end / dt))
+    U2, V2 = U0.copy(), V0.copy()
+    t = time.perf_counter()
+    SpectralKernel(U2, V2, a, b, Du, Dv, T_end / n_spectral, scheme).step(n_spectral)
+    t_spectral = time.perf_counter() - t
+
+    return {"rel_l2": float(np.linalg.norm(U2 - U1) / np.linalg.norm(U1 - U1.mean())),
+            "corr": float(np.corrcoef(U1.ravel(), U2.ravel())[0, 1]),
+            "k_peak": (int(dominant_wavenumber(U1)), int(dominant_wavenumber(U2))),
+            "n_explicit": n_explicit, "n_spectral": n_spectral,
+            "t_explicit": t_explicit, "t_spectral": t_spectral}
+
+
+if __name__ == "__main__":
+    dt = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    for scheme in ("sbdf2", "imex"):
+        r = compare(dt=dt, scheme=scheme)
+        print(f"{scheme:>5} dt={dt}: 相対L2誤差 {r['rel_l2']:.3e}, 相関 {r['corr']:.5f}, 波数 {r['k_peak']}, "
+              f"陽的 {r['n_explicit']} ステップ {r['t_explicit']:.2f}s → "
+              f"スペクトル {r['n_spectral']} ステップ {r['t_spectral']:.2f}s")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 29 10:03:55 2026
+
+@author: iwamura
+"""
+
+# turing/tiled.py
+#
+# 大きな格子を横長の帯（タイル）に分け、コアごとに1つのワーカープロセスで進める領域分割版。
+# NumPy の演算は1スレッドなので、N = 100 より大きな皮膚は1コアの速さで頭打ちになる。
+# 各タイルは multiprocessing.shared_memory 上に上下1行ずつの袖（ハロー）付きで置き、
+# 毎ステップ、隣のタイルの境界行を共有メモリ経由で受け取ってから kernel.py と同じ更新を行う。
+# 境界行の受け渡し用バッファは偶奇2面あり（ダブルバッファ）、1ステップあたりのバリア同期は1回で済む。
+#
+# ラプラシアンの加算順序も kernel.laplacian と同じなので、結果は逐次版とビット単位で一致する。
+
+import os
+import sys
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from kernel import SchnakenbergKernel
+
+
+def band_laplacian(ext, out, scratch):
+    """
+    上下1行の袖付きの帯 ext（形状 (h+2, N)）の内側 h 行のラプラシアンを out に書き込む。
+    横方向は周期境界。加算順序は kernel.laplacian と同じ。
+    """
+    Z = ext[1:-1]
+    np.add(ext[:-2], ext[2:], out=out)
+    out[:, 1:] += Z[:, :-1]
+    out[:, :1] += Z[:, -1:]
+    out[:, :-1] += Z[:, 1:]
+    out[:, -1:] += Z[:, :1]
+    np.multiply(Z, 4, out=scratch)
+    out -= scratch
+    return out
+
+
+def _layout(shape, workers):
+    """帯の境界と、共有メモリ上の配列の形 (fields, halo)"""
+    rows, cols = shape
+    bounds = np.linspace(0, rows, workers + 1).astype(int)
+    return bounds, (2, rows + 2 * workers, cols), (2, workers, 2, 2, cols)
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker(p, names, shape, workers, dtype, params, start, done, step_barrier):
+    bounds, f_shape, h_shape = _layout(shape, workers)
+    shm_f, fields = _attach(names[0], f_shape, dtype)
+    shm_h, halo = _attach(names[1], h_shape, dtype)
+    shm_c, ctrl = _attach(names[2], (2,), np.int64)
+    try:
+        lo, hi = bounds[p], bounds[p + 1]
+        e0 = lo + 2 * p
+        Uext = fields[0, e0:e0 + hi - lo + 2]
+        Vext = fields[1, e0:e0 + hi - lo + 2]
+        kernel = SchnakenbergKernel(Uext[1:-1], Vext[1:-1], *params)
+        up, down = (p - 1) % workers, (p + 1) % workers
+        while True:
+            start.wait()
+            n, parity = int(ctrl[0]), int(ctrl[1])
+            if n < 0:
+                break
+            for _ in range(n):
+                # ハロー交換：上の帯の最下行と下の帯の最上行（前のステップの値）を袖に写す
+                Uext[0], Vext[0] = halo[parity, up, 1]
+                Uext[-1], Vext[-1] = halo[parity, down, 0]
+                band_laplacian(Uext, kernel.lu, kernel.uuv)
+                band_laplacian(Vext, kernel.lv, kernel.uuv)
+                kernel.react()
+                # 更新後の境界行をもう一方の面に書き出す（読み出し中の面は上書きしない）
+                parity ^= 1
+                halo[parity, p, 0] = Uext[1], Vext[1]
+                halo[parity, p, 1] = Uext[-2], Vext[-2]
+                step_barrier.wait()
+            done.wait()
+    finally:
+        del fields, halo, ctrl
+        for shm in (shm_f, shm_h, shm_c):
+            shm.close()
+
+
+class TiledKernel:
+    """
+    2次元の格子を workers 本の帯に分け、共有メモリ上で並列に進める Schnakenberg カーネル。
+    SchnakenbergKernel と同じ使い方で、step() のたびに U, V をその場で更新する。
+    ワーカーは最初の step() の前に起動し、close() まで使い回す。
+
+    Args:
+        U, V (np.ndarray): 濃度場（形状 (rows, cols) の2次元配列）。
+        a, b, Du, Dv, dt, sequential: SchnakenbergKernel と同じ（スカラー）。
+        workers (int): ワーカー数（既定は CPU コア数、行数を超えない）。
+    """
+
+    def __init__(self, U, V, a, b, Du, Dv, dt, sequential=True, workers=None):
+        if U.shape != V.shape or U.ndim != 2:
+            raise ValueError(f"U, V は同じ形の2次元配列にしてください: {U.shape} と {V.shape}")
+        self.U, self.V = U, V
+        self.workers = max(1, min(workers or os.cpu_count() or 1, U.shape[0]))
+        self.bounds, f_shape, h_shape = _layout(U.shape, self.workers)
+        dtype = U.dtype
+
+        self._shm = [shared_memory.SharedMemory(create=True, size=int(np.prod(s)) * np.dtype(t).itemsize)
+                     for s, t in ((f_shape, dtype), (h_shape, dtype), ((2,), np.int64))]
+        self._fields = np.ndarray(f_shape, dtype=dtype, buffer=self._shm[0].buf)
+        self._halo = np.ndarray(h_shape, dtype=dtype, buffer=self._shm[1].buf)
+        self._ctrl = np.ndarray((2,), dtype=np.int64, buffer=self._shm[2].buf)
+        self._parity = 0
+        self._scatter()
+
+        ctx = mp.get_context()
+        self._start = ctx.Barrier(self.workers + 1)
+        self._done = ctx.Barrier(self.workers + 1)
+        step_barrier = ctx.Barrier(self.workers)
+        names = [s.name for s in self._shm]
+        params = (a, b, Du, Dv, dt, sequential)
+        self._procs = [ctx.Process(target=_worker, daemon=True,
+                                   args=(p, names, U.shape, self.workers, dtype, params,
+                                         self._start, self._done, step_barrier))
+                       for p in range(self.workers)]
+        for proc in self._procs:
+            proc.start()
+
+    def _bands(self):
+        for p in range(self.workers):
+            lo, hi = self.bounds[p], self.bounds[p + 1]
+            yield p, lo, hi, lo + 2 * p + 1
+
+    def _scatter(self):
+        """U, V を共有メモリ上のタイルへ写し、境界行の面を用意する"""
+        for p, lo, hi, e in self._bands():
+            self._fields[0, e:e + hi - lo] = self.U[lo:hi]
+            self._fields[1, e:e + hi - lo] = self.V[lo:hi]
+            self._halo[self._parity, p, 0] = self.U[lo], self.V[lo]
+            self._halo[self._parity, p, 1] = self.U[hi - 1], self.V[hi - 1]
+
+    def _gather(self):
+        for p, lo, hi, e in self._bands():
+            self.U[lo:hi] = self._fields[0, e:e + hi - lo]
+            self.V[lo:hi] = self._fields[1, e:e + hi - lo]
+
+    def step(self, n=1):
+        """n ステップ進める。"""
+        if self._procs is None:
+            raise RuntimeError("TiledKernel は閉じられています")
+        if n > 0:
+            self._ctrl[:] = n, self._parity
+            self._start.wait()
+            self._done.wait()
+            self._parity = (self._parity + n) % 2
+            self._gather()
+        return self.U, self.V
+
+    def close(self):
+        """ワーカーを止めて共有メモリを解放する。"""
+        if self._procs is None:
+            return
+        self._ctrl[0] = -1
+        self._start.wait()
+        for proc in self._procs:
+            proc.join()
+        self._procs = None
+        del self._fields, self._halo, self._ctrl
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(N=1024, n_steps=200, workers=None, serial=True, seed=0):
+    """
+    同じ初期値から逐次版と領域分割版で n_steps 進め、一致と計算時間を確かめる。
+
+    Returns:
+        dict: identical（ビット単位で一致したか、serial=False なら None）と計算時間 [s]。
+    """
+    a, b, Du, Dv, dt = 0.1, 0.9, 0.2, 1.0, 0.1
+    rng = np.random.default_rng(seed)
+    U0 = 1.0 + rng.standard_normal((N, N)) * 0.05
+    V0 = 0.9 + rng.standard_normal((N, N)) * 0.05
+
+    U2, V2 = U0.copy(), V0.copy()
+    with TiledKernel(U2, V2, a, b, Du, Dv, dt, workers=workers) as kernel:
+        t = time.perf_counter()
+        kernel.step(n_steps)
+        t_tiled = time.perf_counter() - t
+        used = kernel.workers
+    result = {"workers": used, "t_tiled": t_tiled, "identical": None, "t_serial": None}
+    if serial:
+        U1, V1 = U0.copy(), V0.copy()
+        t = time.perf_counter()
+        SchnakenbergKernel(U1, V1, a, b, Du, Dv, dt).step(n_steps)
+        result["t_serial"] = time.perf_counter() - t
+        result["identical"] = bool(np.array_equal(U1, U2) and np.array_equal(V1, V2))
+    return result
+
+
+if __name__ == "__main__":
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    n_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    r = benchmark(N, n_steps, workers)
+    print(f"{N}x{N}, {n_steps} ステップ: 逐次 {r['t_serial']:.2f}s, "
+          f"{r['workers']} ワーカー {r['t_tiled']:.2f}s, ビット単位で一致: {r['identical']}")